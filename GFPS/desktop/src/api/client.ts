@@ -1,6 +1,14 @@
 import { useAuthStore } from '@store/auth';
 import { useSettingsStore } from '@store/settings';
-import { Fixture, LiveOddsPayload, ModelInfo, Prediction, ValueBet } from './types';
+import {
+  Fixture,
+  LiveOddsPayload,
+  ModelInfo,
+  MomentumSeries,
+  Prediction,
+  ProbabilityHistory,
+  ValueBet
+} from './types';
 
 const jsonHeaders = { 'Content-Type': 'application/json' };
 
@@ -14,10 +22,22 @@ const authHeaders = () => {
   return token ? { Authorization: `Bearer ${token}` } : {};
 };
 
+// last body per path with its ETag; polls revalidate with If-None-Match and
+// an unchanged snapshot comes back as an empty 304
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
 async function get<T>(path: string): Promise<T> {
-  const res = await fetch(buildUrl(path), { headers: { ...authHeaders() } });
+  const cached = etagCache.get(path);
+  const res = await fetch(buildUrl(path), {
+    headers: { ...authHeaders(), ...(cached ? { 'If-None-Match': cached.etag } : {}) },
+    cache: 'no-store'
+  });
+  if (res.status === 304 && cached) return cached.data as T;
   if (!res.ok) throw new Error(`Request failed: ${res.status}`);
-  return res.json();
+  const data = await res.json();
+  const etag = res.headers.get('ETag');
+  if (etag) etagCache.set(path, { etag, data });
+  return data;
 }
 
 async function post<T>(path: string, body?: unknown): Promise<T> {
@@ -34,6 +54,9 @@ export const api = {
   fixtures: () => get<Fixture[]>('/fixtures'),
   liveOdds: () => get<LiveOddsPayload>('/live-odds'),
   predictions: () => get<Prediction[]>('/predictions'),
+  predictionHistory: (fixtureId: string, points = 200) =>
+    get<ProbabilityHistory>(`/predictions/${fixtureId}/history?points=${points}`),
+  momentum: (fixtureId: string) => get<MomentumSeries>(`/inplay/${fixtureId}/momentum`),
   valueBets: () => get<ValueBet[]>('/value-bets'),
   trainModel: () => post<{ message: string }>('/ml/train'),
   models: () => get<ModelInfo[]>('/ml/models'),
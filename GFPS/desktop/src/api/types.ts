@@ -59,6 +59,29 @@ export interface ModelInfo {
   status: 'active' | 'ready' | 'training';
 }
 
+export interface ProbabilityHistoryPoint {
+  ts: string;
+  home: number;
+  draw: number;
+  away: number;
+}
+
+export interface ProbabilityHistory {
+  fixtureId: string;
+  total: number;
+  points: ProbabilityHistoryPoint[];
+}
+
+export interface MomentumPoint {
+  minute: number;
+  value: number;
+}
+
+export interface MomentumSeries {
+  fixtureId: string;
+  series: MomentumPoint[];
+}
+
 export interface MatchEvent {
   minute: number;
   description: string;
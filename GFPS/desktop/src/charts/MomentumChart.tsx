@@ -1,4 +1,6 @@
 import { Line } from 'react-chartjs-2';
+import { api } from '@api/client';
+import { useQuery } from '@hooks/useQuery';
 import {
   Chart as ChartJS,
   CategoryScale,
@@ -11,9 +13,18 @@ import {
 
 ChartJS.register(CategoryScale, LinearScale, PointElement, LineElement, Tooltip, Filler);
 
-export const MomentumChart = () => {
-  const labels = Array.from({ length: 15 }).map((_, idx) => `${idx * 6}'`);
-  const data = labels.map((_, idx) => Math.sin(idx / 3) * 30 + 50);
+interface MomentumChartProps {
+  fixtureId: string;
+  // changes whenever the fixture has new events, to refetch the series
+  refreshKey?: number;
+}
+
+export const MomentumChart = ({ fixtureId, refreshKey }: MomentumChartProps) => {
+  const momentum = useQuery(() => api.momentum(fixtureId), [fixtureId, refreshKey]);
+  const series = momentum.data?.series ?? [];
+  // -1..1 (home positive) drawn as 0..100 around an even 50
+  const labels = series.map((point) => `${Math.round(point.minute)}'`);
+  const data = series.map((point) => Math.round((point.value + 1) * 50));
 
   return (
     <Line
@@ -34,7 +45,7 @@ export const MomentumChart = () => {
         plugins: { legend: { display: false } },
         scales: {
           x: { ticks: { color: '#9ca3af' }, grid: { color: 'rgba(255,255,255,0.05)' } },
-          y: { ticks: { color: '#9ca3af' }, grid: { color: 'rgba(255,255,255,0.05)' } }
+          y: { min: 0, max: 100, ticks: { color: '#9ca3af' }, grid: { color: 'rgba(255,255,255,0.05)' } }
         }
       }}
     />
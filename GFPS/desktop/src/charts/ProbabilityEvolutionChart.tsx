@@ -1,4 +1,6 @@
 import { Line } from 'react-chartjs-2';
+import { api } from '@api/client';
+import { useQuery } from '@hooks/useQuery';
 import {
   Chart as ChartJS,
   CategoryScale,
@@ -11,9 +13,19 @@ import {
 
 ChartJS.register(CategoryScale, LinearScale, PointElement, LineElement, Tooltip, Legend);
 
-export const ProbabilityEvolutionChart = () => {
-  const labels = Array.from({ length: 10 }).map((_, idx) => `${idx * 10}'`);
-  const random = () => labels.map(() => Math.max(5, Math.min(90, 40 + Math.random() * 20)));
+interface ProbabilityEvolutionChartProps {
+  fixtureId: string;
+  // changes whenever new snapshots may exist, to refetch the history
+  refreshKey?: number;
+}
+
+export const ProbabilityEvolutionChart = ({ fixtureId, refreshKey }: ProbabilityEvolutionChartProps) => {
+  const history = useQuery(() => api.predictionHistory(fixtureId), [fixtureId, refreshKey]);
+  const points = history.data?.points ?? [];
+  const labels = points.map((point) =>
+    new Date(point.ts).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
+  );
+  const percent = (key: 'home' | 'draw' | 'away') => points.map((point) => Math.round(point[key] * 1000) / 10);
 
   return (
     <Line
@@ -22,21 +34,21 @@ export const ProbabilityEvolutionChart = () => {
         datasets: [
           {
             label: 'Home',
-            data: random(),
+            data: percent('home'),
             borderColor: '#0fd7a1',
             backgroundColor: 'rgba(15,215,161,0.18)',
             tension: 0.3
           },
           {
             label: 'Draw',
-            data: random(),
+            data: percent('draw'),
             borderColor: '#f59e0b',
             backgroundColor: 'rgba(245,158,11,0.14)',
             tension: 0.3
           },
           {
             label: 'Away',
-            data: random(),
+            data: percent('away'),
             borderColor: '#1f9ae5',
             backgroundColor: 'rgba(31,154,229,0.18)',
             tension: 0.3
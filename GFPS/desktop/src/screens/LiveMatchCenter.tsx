@@ -194,10 +194,10 @@ export const LiveMatchCenter = () => {
 
             <div style={{ display: 'grid', gridTemplateColumns: '1fr 1fr', gap: 12 }}>
               <ChartCard title="Momentum" subtitle="Live dominance trajectory">
-                <MomentumChart />
+                <MomentumChart fixtureId={selected.id} refreshKey={(events[selected.id] || []).length} />
               </ChartCard>
               <ChartCard title="Probability Evolution" subtitle="Win/Draw/Away over time">
-                <ProbabilityEvolutionChart />
+                <ProbabilityEvolutionChart fixtureId={selected.id} refreshKey={(events[selected.id] || []).length} />
               </ChartCard>
             </div>
 
@@ -1,25 +1,33 @@
 import { api } from '@api/client';
 import { DataTable } from '@components/DataTable';
 import { useQuery } from '@hooks/useQuery';
+import { useAuthStore } from '@store/auth';
 import { palette } from '@theme/palette';
 import { ModelInfo } from '@api/types';
+import { useState } from 'react';
 
 export const ModelsTraining = () => {
   const models = useQuery(api.models, []);
+  // training and activation are admin-only on the backend
+  const { profile } = useAuthStore();
+  const isAdmin = profile?.role === 'admin';
+  const [error, setError] = useState<string | null>(null);
 
   const handleTrain = async () => {
+    setError(null);
     try {
       await api.trainModel();
-    } catch (error) {
-      console.error(error);
+    } catch (err: any) {
+      setError(err.message || 'Training request failed');
     }
   };
 
   const handleActivate = async (version: string) => {
+    setError(null);
     try {
       await api.activateModel(version);
-    } catch (error) {
-      console.error(error);
+    } catch (err: any) {
+      setError(err.message || 'Activation failed');
     }
   };
 
@@ -40,6 +48,8 @@ export const ModelsTraining = () => {
         <div style={{ display: 'flex', gap: 8 }}>
           <button
             onClick={handleTrain}
+            disabled={!isAdmin}
+            title={isAdmin ? undefined : 'Admin role required'}
             style={{
               background: 'linear-gradient(90deg, #1f9ae5, #0fd7a1)',
               color: '#0b0f1a',
@@ -47,13 +57,20 @@ export const ModelsTraining = () => {
               padding: '10px 14px',
               borderRadius: 10,
               fontWeight: 700,
-              cursor: 'pointer'
+              cursor: isAdmin ? 'pointer' : 'not-allowed',
+              opacity: isAdmin ? 1 : 0.5
             }}
           >
             Train new model
           </button>
         </div>
       </div>
+      {!isAdmin && (
+        <div style={{ color: palette.textSecondary, fontSize: 14 }}>
+          Training and activating models requires an admin account.
+        </div>
+      )}
+      {error && <div style={{ color: '#ef4444' }}>{error}</div>}
       <DataTable<ModelInfo>
         columns={[
           { header: 'Version', key: 'version' },
@@ -72,13 +89,16 @@ export const ModelsTraining = () => {
             render: (row) => (
               <button
                 onClick={() => handleActivate(row.version)}
+                disabled={!isAdmin}
+                title={isAdmin ? undefined : 'Admin role required'}
                 style={{
                   background: 'transparent',
                   border: `1px solid ${palette.border}`,
                   color: palette.textPrimary,
                   padding: '8px 12px',
                   borderRadius: 10,
-                  cursor: 'pointer'
+                  cursor: isAdmin ? 'pointer' : 'not-allowed',
+                  opacity: isAdmin ? 1 : 0.5
                 }}
               >
                 Activate
@@ -1,19 +1,30 @@
 import asyncio
 import os
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 import httpx
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from .db import SessionLocal
+from .db import SessionLocal, run_write_async
+from .live_state import live_state
 from .models import AlertRule, AlertEvent, Device
 from .prediction_engine import predict_market
 from .stats_context import build_poisson_context
 from .push_notify import send_fcm_push
+from .streamer.live_streamer import STREAMER_ENABLED
 
 ALERT_ENGINE_ENABLED = os.getenv("ALERT_ENGINE", "false").lower() in ("1", "true", "yes")
 ALERT_ENGINE_INTERVAL_SEC = int(os.getenv("ALERT_ENGINE_INTERVAL_SEC", "120"))
+# "event" reacts to live_state price updates, "poll" queries API-Football on
+# its own, "auto" picks "event" whenever the streamer feeds live_state.
+ALERT_ENGINE_MODE = os.getenv("ALERT_ENGINE_MODE", "auto").lower()
+
+# live_state broadcast types that carry new prices
+PRICE_UPDATE_TYPES = {"odds", "markets"}
+# a rule re-alerts on a selection it already pushed only when the price moved
+# or the EV shifted by at least this much
+ALERT_REPEAT_EV_DELTA = float(os.getenv("ALERT_REPEAT_EV_DELTA", "0.01"))
 
 APIFOOTBALL_KEY = os.getenv("APIFOOTBALL_KEY", "")
 
@@ -139,15 +150,15 @@ def evaluate_rule(rule: AlertRule, cand: dict, db: Session) -> List[AlertEvent]:
     home = cand["home"]
     away = cand["away"]
 
+    # build Poisson context once per fixture (served from the TeamStats cache)
+    ctx = build_poisson_context(db, league_id, home, away)
+
     for m in cand.get("markets", []):
         mname = m["market"]
 
         if rule.market_filter and not match_text_filter(rule.market_filter, mname):
             continue
 
-        # build Poisson context once per fixture
-        ctx = build_poisson_context(db, league_id, home, away)
-
         # map outcome->odds
         sel_map: Dict[str, float] = {
             s["outcome"]: s["odds"] for s in m.get("selections", [])
@@ -194,64 +205,251 @@ def evaluate_rule(rule: AlertRule, cand: dict, db: Session) -> List[AlertEvent]:
     return events
 
 
+def candidates_from_snapshot(snapshot: dict) -> List[dict]:
+    """
+    Convert a live_state snapshot into alert candidates (fixture + markets),
+    using the same shape as `fetch_live_candidates`.
+    """
+    fixtures = snapshot.get("fixtures", []) or []
+    markets_by_fixture: Dict[str, List[dict]] = {}
+
+    for row in snapshot.get("odds", []) or []:
+        # rows are keyed by fixture id; "Home vs Away" labels aren't unique
+        fixture_id = row.get("fixtureId")
+        if fixture_id is None:
+            continue
+        markets_by_fixture.setdefault(str(fixture_id), []).append(
+            {
+                "bookmaker": row.get("source") or "UnknownBook",
+                "market": "Match Winner",
+                "selections": [
+                    {"outcome": label, "odds": row[key]}
+                    for label, key in (("Home", "home"), ("Draw", "draw"), ("Away", "away"))
+                    if row.get(key)
+                ],
+            }
+        )
+
+    for fixture_id, lines in (snapshot.get("markets", {}) or {}).items():
+        for line in lines:
+            if line.get("type") == "total":
+                market = "Goals Over/Under"
+                sides = (("Over", "over"), ("Under", "under"))
+            elif line.get("type") == "handicap":
+                market = "Asian Handicap"
+                sides = (("Home", "home"), ("Away", "away"))
+            else:
+                continue
+            markets_by_fixture.setdefault(str(fixture_id), []).append(
+                {
+                    "bookmaker": line.get("source") or "UnknownBook",
+                    "market": market,
+                    "selections": [
+                        {"outcome": f"{label} {line.get('line')}", "odds": line[key]}
+                        for label, key in sides
+                        if line.get(key)
+                    ],
+                }
+            )
+
+    candidates: List[dict] = []
+    for fx in fixtures:
+        markets = markets_by_fixture.get(str(fx.get("id")))
+        if not markets:
+            continue
+        candidates.append(
+            {
+                "fixture_id": fx.get("id"),
+                "league_id": fx.get("leagueId") or fx.get("league") or "",
+                "league": fx.get("league") or "",
+                "home": fx.get("homeTeam") or "",
+                "away": fx.get("awayTeam") or "",
+                "markets": markets,
+            }
+        )
+    return candidates
+
+
+def _price_fingerprint(cand: dict) -> Tuple:
+    return tuple(
+        sorted(
+            (m["bookmaker"], m["market"], s["outcome"], float(s["odds"]))
+            for m in cand.get("markets", [])
+            for s in m.get("selections", [])
+        )
+    )
+
+
+class PriceChangeTracker:
+    """Remembers the last prices seen per fixture to skip unchanged fixtures.
+
+    `changed` only filters; prices are remembered by `record` once the
+    candidates were processed, so a failed run is retried on the next update.
+    """
+
+    def __init__(self) -> None:
+        self._last: Dict[str, Tuple] = {}
+
+    def changed(self, candidates: List[dict]) -> List[dict]:
+        out: List[dict] = []
+        seen = set()
+        for cand in candidates:
+            key = str(cand["fixture_id"])
+            seen.add(key)
+            if self._last.get(key) != _price_fingerprint(cand):
+                out.append(cand)
+        # forget fixtures that dropped out of the live snapshot
+        for key in list(self._last):
+            if key not in seen:
+                del self._last[key]
+        return out
+
+    def record(self, candidates: List[dict]) -> None:
+        for cand in candidates:
+            self._last[str(cand["fixture_id"])] = _price_fingerprint(cand)
+
+
+class AlertDeduper:
+    """Last odds / EV pushed per (rule, fixture, market, outcome).
+
+    A selection that keeps matching a rule alerts once, and again only when
+    its odds change or its EV moves by `ALERT_REPEAT_EV_DELTA`.
+    """
+
+    def __init__(self, ev_delta: float = ALERT_REPEAT_EV_DELTA) -> None:
+        self.ev_delta = ev_delta
+        self._last: Dict[Tuple, Tuple[float, float]] = {}
+
+    @staticmethod
+    def _key(evt: AlertEvent) -> Tuple:
+        return (evt.rule_id, evt.fixture_id, evt.market, evt.outcome)
+
+    def fresh(self, events: List[AlertEvent]) -> List[AlertEvent]:
+        out: List[AlertEvent] = []
+        for evt in events:
+            last = self._last.get(self._key(evt))
+            if last is not None and last[0] == evt.odds and abs(evt.ev - last[1]) < self.ev_delta:
+                continue
+            out.append(evt)
+        return out
+
+    def record(self, events: List[AlertEvent]) -> None:
+        for evt in events:
+            self._last[self._key(evt)] = (evt.odds, evt.ev)
+
+    def prune(self, fixture_ids) -> None:
+        """Drop selections of fixtures that are no longer live."""
+
+        live = {str(f) for f in fixture_ids}
+        for key in list(self._last):
+            if key[1] not in live:
+                del self._last[key]
+
+
+alert_deduper = AlertDeduper()
+
+
+async def process_candidates(candidates: List[dict]) -> None:
+    """Evaluate all active rules against the candidates and notify users."""
+
+    with SessionLocal() as db:
+        rules = db.scalars(
+            select(AlertRule).where(AlertRule.is_active == True)  # noqa: E712
+        ).all()
+
+        for cand in candidates:
+            for rule in rules:
+                events = alert_deduper.fresh(evaluate_rule(rule, cand, db))
+                if not events:
+                    continue
+
+                for evt in events:
+                    db.add(evt)
+                # commit on the writer thread; this coroutine waits, so the session stays single-user
+                await run_write_async(db.commit)
+                alert_deduper.record(events)
+
+                # push notifications
+                devices = db.scalars(
+                    select(Device).where(Device.user_id == rule.user_id)
+                ).all()
+                tokens = [d.token for d in devices if d.platform in ("android", "ios")]
+
+                if tokens:
+                    # just describe first event in push text
+                    e0 = events[0]
+                    body = (
+                        f"{e0.meta.get('home')}–{e0.meta.get('away')}: "
+                        f"{e0.market} {e0.outcome} @ {e0.odds:.2f} "
+                        f"(EV≈{e0.ev:.2f})"
+                    )
+                    await send_fcm_push(
+                        tokens,
+                        title="GFPS Alert",
+                        body=body,
+                        data={"fixture_id": e0.fixture_id, "rule_id": e0.rule_id},
+                    )
+
+
 async def alert_worker_loop():
     if not ALERT_ENGINE_ENABLED:
         print("[alert_engine] Disabled via ALERT_ENGINE env")
         return
 
-    print("[alert_engine] Started")
+    print("[alert_engine] Started (poll mode)")
     while True:
         try:
             candidates = await fetch_live_candidates()
-            if not candidates:
-                await asyncio.sleep(ALERT_ENGINE_INTERVAL_SEC)
-                continue
-
-            with SessionLocal() as db:
-                rules = db.scalars(
-                    select(AlertRule).where(AlertRule.is_active == True)  # noqa: E712
-                ).all()
-
-                for cand in candidates:
-                    for rule in rules:
-                        events = evaluate_rule(rule, cand, db)
-                        if not events:
-                            continue
-
-                        for evt in events:
-                            db.add(evt)
-                        db.commit()
-
-                        # push notifications
-                        from .models import Device
-
-                        devices = db.scalars(
-                            select(Device).where(Device.user_id == rule.user_id)
-                        ).all()
-                        tokens = [d.token for d in devices if d.platform in ("android", "ios")]
-
-                        if tokens:
-                            # just describe first event in push text
-                            e0 = events[0]
-                            body = (
-                                f"{e0.meta.get('home')}–{e0.meta.get('away')}: "
-                                f"{e0.market} {e0.outcome} @ {e0.odds:.2f} "
-                                f"(EV≈{e0.ev:.2f})"
-                            )
-                            await send_fcm_push(
-                                tokens,
-                                title="GFPS Alert",
-                                body=body,
-                                data={"fixture_id": e0.fixture_id, "rule_id": e0.rule_id},
-                            )
-
+            alert_deduper.prune(c["fixture_id"] for c in candidates)
+            if candidates:
+                await process_candidates(candidates)
         except Exception as e:
             print("[alert_engine] ERROR:", e)
 
         await asyncio.sleep(ALERT_ENGINE_INTERVAL_SEC)
 
 
+async def alert_event_loop():
+    """Evaluate rules as soon as live_state publishes new prices."""
+
+    if not ALERT_ENGINE_ENABLED:
+        print("[alert_engine] Disabled via ALERT_ENGINE env")
+        return
+
+    print("[alert_engine] Started (event mode)")
+    tracker = PriceChangeTracker()
+    queue = await live_state.subscribe()
+    try:
+        while True:
+            payload = await queue.get()
+            # coalesce bursts: only the newest pending price update matters
+            while not queue.empty():
+                newer = queue.get_nowait()
+                if newer.get("type") in PRICE_UPDATE_TYPES:
+                    payload = newer
+            if payload.get("type") not in PRICE_UPDATE_TYPES:
+                continue
+
+            try:
+                candidates = candidates_from_snapshot(payload)
+                alert_deduper.prune(c["fixture_id"] for c in candidates)
+                changed = tracker.changed(candidates)
+                if changed:
+                    await process_candidates(changed)
+                    tracker.record(changed)
+            except Exception as e:
+                print("[alert_engine] ERROR:", e)
+    finally:
+        await live_state.unsubscribe(queue)
+
+
 def start_alert_engine_background(loop: asyncio.AbstractEventLoop):
     if not ALERT_ENGINE_ENABLED:
         return
-    loop.create_task(alert_worker_loop())
+    mode = ALERT_ENGINE_MODE
+    if mode == "auto":
+        mode = "event" if STREAMER_ENABLED else "poll"
+    if mode == "event":
+        loop.create_task(alert_event_loop())
+    else:
+        loop.create_task(alert_worker_loop())
@@ -4,32 +4,12 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from .db import SessionLocal
-from .models import AlertRule, AlertEvent, User
-from .auth_utils import decode_token
+from .models import AlertRule, AlertEvent
+from .auth_dependency import get_db, get_user
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_user(token: str, db: Session) -> User:
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(401, "Invalid token")
-    email = payload.get("sub")
-    u = db.scalar(select(User).where(User.email == email))
-    if not u:
-        raise HTTPException(404, "User not found")
-    return u
-
-
 class AlertRuleIn(BaseModel):
     token: str
     name: str
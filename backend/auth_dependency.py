@@ -1,12 +1,31 @@
-from typing import Generator
+"""
+Shared authentication layer for all routers.
+
+Resolving a token means decoding the JWT and loading the user to check its
+`token_version`. To avoid one DB round-trip per request, resolved principals
+are kept in a short-TTL LRU cache keyed by the raw token. An entry never
+outlives the token's own `exp`, and entries are dropped as soon as a user's
+`token_version` changes (see `invalidate_user`).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generator, Optional, Tuple
 
 from fastapi import Depends, Header, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from .auth_utils import decode_token
 from .db import SessionLocal
 from .models import User
 
+AUTH_CACHE_TTL_SEC = float(os.getenv("AUTH_CACHE_TTL_SEC", "30"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -16,23 +35,114 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def require_user(
-    authorization: str = Header(None), db: Session = Depends(get_db)
-) -> User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(401, "Missing or invalid Authorization header")
+@dataclass(frozen=True)
+class Principal:
+    """Detached view of an authenticated user, safe to share across requests."""
+
+    id: int
+    email: str
+    role: str
+    token_version: int
+
+
+class PrincipalCache:
+    """Thread-safe LRU of token -> Principal with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL_SEC) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, principal: Principal, expires_at: Optional[float] = None) -> None:
+        """Cache `principal` for `ttl` seconds, or until `expires_at` (epoch seconds) if sooner."""
+
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, email: str) -> None:
+        with self._lock:
+            for token in [t for t, (_, p) in self._entries.items() if p.email == email]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_user(email: str) -> None:
+    """Drop cached principals for a user, e.g. after bumping token_version."""
+
+    principal_cache.invalidate_user(email)
+
+
+def get_user(token: str, db: Session) -> Principal:
+    """Resolve a raw JWT into a Principal, using the cache when possible."""
+
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
 
-    token = authorization.split(" ", 1)[1]
     payload = decode_token(token)
     if not payload:
         raise HTTPException(401, "Invalid token")
 
     email = payload.get("sub")
-    user = db.query(User).filter(User.email == email).first()
+    user = db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(404, "User not found")
 
     if user.token_version != payload.get("tv"):
         raise HTTPException(401, "Token expired")
 
-    return user
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        role=user.role,
+        token_version=user.token_version,
+    )
+    exp = payload.get("exp")
+    principal_cache.put(token, principal, float(exp) if isinstance(exp, (int, float)) else None)
+    return principal
+
+
+def require_user(
+    authorization: str = Header(None), db: Session = Depends(get_db)
+) -> Principal:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(401, "Missing or invalid Authorization header")
+
+    token = authorization.split(" ", 1)[1]
+    return get_user(token, db)
+
+
+def require_admin(principal: Principal = Depends(require_user)) -> Principal:
+    if principal.role != "admin":
+        raise HTTPException(403, "Admin role required")
+    return principal
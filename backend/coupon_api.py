@@ -1,36 +1,29 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import insert, select
 
-from .db import SessionLocal
-from .models import User, Coupon, CouponSelection
-from .auth_utils import decode_token
-from .prediction_engine import predict_market
-from .stats_context import build_poisson_context
+from .models import Coupon, CouponSelection
+from .auth_dependency import get_db, get_user
+from .coupon_pricing import price_coupon
 
 router = APIRouter(prefix="/coupon", tags=["coupon"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_user(token: str, db: Session) -> User:
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(401, "Invalid token")
-    email = payload.get("sub")
-    u = db.scalar(select(User).where(User.email == email))
-    if not u:
-        raise HTTPException(404, "User not found")
-    return u
+COUPON_FIELDS = ["id", "name", "status", "total_odds", "total_prob", "total_ev", "created_at"]
+SELECTION_FIELDS = [
+    "fixture_id",
+    "league",
+    "league_id",
+    "home",
+    "away",
+    "market",
+    "outcome",
+    "odds",
+    "prob",
+    "ev",
+]
 
 
 class SelectionIn(BaseModel):
@@ -57,59 +50,39 @@ def create_coupon(p: CouponCreate, db: Session = Depends(get_db)):
     if not p.selections:
         raise HTTPException(400, "No selections")
 
-    total_odds = 1.0
-    total_prob = 1.0
-    selections_data = []
-
-    for s in p.selections:
-        ctx = build_poisson_context(db, s.league_id, s.home, s.away)
-        if s.prob is None or s.prob <= 0 or s.prob >= 1:
-            preds = predict_market(
-                s.market,
-                {s.outcome: s.odds},
-                ctx,
-            )
-            info = preds[s.outcome]
-            prob = info["prob"]
-            ev = info["ev"]
-        else:
-            prob = s.prob
-            ev = prob * s.odds - 1.0
-
-        total_odds *= s.odds
-        total_prob *= prob
-
-        selections_data.append((s, prob, ev))
-
-    total_ev = total_prob * total_odds - 1.0
+    pricing = price_coupon(db, p.selections)
 
     coupon = Coupon(
         user_id=user.id,
         name=p.name,
         status="draft",
-        total_odds=total_odds,
-        total_prob=total_prob,
-        total_ev=total_ev,
+        total_odds=pricing.total_odds,
+        total_prob=pricing.total_prob,
+        total_ev=pricing.total_ev,
     )
     db.add(coupon)
-    db.commit()
-    db.refresh(coupon)
-
-    for s, prob, ev in selections_data:
-        cs = CouponSelection(
-            coupon_id=coupon.id,
-            fixture_id=s.fixture_id,
-            league=s.league,
-            league_id=s.league_id,
-            home=s.home,
-            away=s.away,
-            market=s.market,
-            outcome=s.outcome,
-            odds=s.odds,
-            prob=prob,
-            ev=ev,
-        )
-        db.add(cs)
+    db.flush()
+
+    # single executemany for all legs, committed together with the coupon
+    db.execute(
+        insert(CouponSelection),
+        [
+            {
+                "coupon_id": coupon.id,
+                "fixture_id": s.fixture_id,
+                "league": s.league,
+                "league_id": s.league_id,
+                "home": s.home,
+                "away": s.away,
+                "market": s.market,
+                "outcome": s.outcome,
+                "odds": s.odds,
+                "prob": leg.prob,
+                "ev": leg.ev,
+            }
+            for s, leg in zip(p.selections, pricing.legs)
+        ],
+    )
     db.commit()
 
     return {
@@ -121,68 +94,78 @@ def create_coupon(p: CouponCreate, db: Session = Depends(get_db)):
     }
 
 
+def _coupon_row(c: Coupon) -> list:
+    return [c.id, c.name, c.status, c.total_odds, c.total_prob, c.total_ev, str(c.created_at)]
+
+
+def _selection_row(s: CouponSelection) -> list:
+    return [getattr(s, f) for f in SELECTION_FIELDS]
+
+
 @router.get("/list")
-def list_coupons(token: str, db: Session = Depends(get_db)):
+def list_coupons(
+    token: str,
+    limit: int = Query(50, ge=1, le=500),
+    before_id: Optional[int] = Query(None, description="Keyset cursor: return coupons with id < before_id"),
+    include: Optional[str] = Query(None, description="Use 'selections' to embed coupon legs"),
+    compact: bool = Query(False, description="Return rows as arrays with a shared field list"),
+    db: Session = Depends(get_db),
+):
     user = get_user(token, db)
-    coupons = (
-        db.scalars(
-            select(Coupon)
-            .where(Coupon.user_id == user.id)
-            .order_by(Coupon.id.desc())
-        ).all()
-    )
-    out = []
+    with_selections = include == "selections"
+
+    q = select(Coupon).where(Coupon.user_id == user.id)
+    if before_id is not None:
+        q = q.where(Coupon.id < before_id)
+    q = q.order_by(Coupon.id.desc()).limit(limit)
+    if with_selections:
+        q = q.options(selectinload(Coupon.selections))
+    coupons = db.scalars(q).all()
+
+    next_cursor = coupons[-1].id if len(coupons) == limit else None
+
+    if compact:
+        fields = list(COUPON_FIELDS)
+        rows = []
+        for c in coupons:
+            row = _coupon_row(c)
+            if with_selections:
+                row.append([_selection_row(s) for s in c.selections])
+            rows.append(row)
+        if with_selections:
+            fields.append("selections")
+        out = {"ok": True, "fields": fields, "rows": rows, "next_cursor": next_cursor}
+        if with_selections:
+            out["selection_fields"] = SELECTION_FIELDS
+        return out
+
+    items = []
     for c in coupons:
-        out.append(
-            {
-                "id": c.id,
-                "name": c.name,
-                "status": c.status,
-                "total_odds": c.total_odds,
-                "total_prob": c.total_prob,
-                "total_ev": c.total_ev,
-                "created_at": str(c.created_at),
-            }
-        )
-    return {"ok": True, "items": out}
+        item = dict(zip(COUPON_FIELDS, _coupon_row(c)))
+        if with_selections:
+            item["selections"] = [
+                dict(zip(SELECTION_FIELDS, _selection_row(s))) for s in c.selections
+            ]
+        items.append(item)
+    return {"ok": True, "items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{coupon_id}")
 def get_coupon(coupon_id: int, token: str, db: Session = Depends(get_db)):
     user = get_user(token, db)
     c = db.scalar(
-        select(Coupon).where(Coupon.id == coupon_id, Coupon.user_id == user.id)
+        select(Coupon)
+        .where(Coupon.id == coupon_id, Coupon.user_id == user.id)
+        .options(selectinload(Coupon.selections))
     )
     if not c:
         raise HTTPException(404, "Coupon not found")
 
-    sels = db.scalars(
-        select(CouponSelection).where(CouponSelection.coupon_id == coupon_id)
-    ).all()
-
     return {
         "ok": True,
-        "id": c.id,
-        "name": c.name,
-        "status": c.status,
-        "total_odds": c.total_odds,
-        "total_prob": c.total_prob,
-        "total_ev": c.total_ev,
-        "created_at": str(c.created_at),
+        **dict(zip(COUPON_FIELDS, _coupon_row(c))),
         "selections": [
-            {
-                "fixture_id": s.fixture_id,
-                "league": s.league,
-                "league_id": s.league_id,
-                "home": s.home,
-                "away": s.away,
-                "market": s.market,
-                "outcome": s.outcome,
-                "odds": s.odds,
-                "prob": s.prob,
-                "ev": s.ev,
-            }
-            for s in sels
+            dict(zip(SELECTION_FIELDS, _selection_row(s))) for s in c.selections
         ],
     }
 
@@ -0,0 +1,138 @@
+"""Coupon pricing engine.
+
+Prices all legs of a coupon in one pass:
+
+  - Poisson contexts for every leg are resolved with a single batched lookup
+    (`build_poisson_contexts`).
+  - Legs on the same fixture are priced jointly from one shared score matrix,
+    so correlated selections (e.g. "Home" + "Over 2.5") are not naively
+    multiplied as if they were independent.
+  - Legs that cannot be expressed on a score matrix fall back to the caller's
+    probability or to `predict_market`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .prediction_engine import predict_market
+from .prediction_engine.markets import book_layout, lambdas_from_context, resolve_outcome
+from .prediction_engine.goals.matrix_cache import score_matrix_cache
+from .stats_context import build_poisson_contexts
+
+MAX_GOALS = 10
+
+
+@dataclass(frozen=True)
+class LegPrice:
+    prob: float
+    ev: float
+    source: str  # "model" / "user" / "market"
+
+
+@dataclass(frozen=True)
+class CouponPrice:
+    legs: List[LegPrice]
+    total_odds: float
+    total_prob: float
+    total_ev: float
+
+
+@lru_cache(maxsize=256)
+def _outcome_mask(market: str, outcome: str, max_goals: int = MAX_GOALS) -> Optional[np.ndarray]:
+    """Boolean (home_goals, away_goals) mask of scorelines where the leg wins.
+
+    The leg is resolved through the derived-markets book, so team totals
+    settle on that team's goals. Returns None for markets that can't be
+    settled from the final score alone, or that can push / half-win (whole
+    and quarter lines, draw-no-bet), which `predict_market` prices instead.
+    """
+
+    key = resolve_outcome(market, outcome)
+    if key is None:
+        return None
+    size = max_goals + 1
+    keys, W, L = book_layout(size)
+    try:
+        column = keys.index(key)
+    except ValueError:
+        return None
+    win, lose = W[:, column], L[:, column]
+    if not np.all(win + lose == 1.0) or not np.all((win == 0.0) | (win == 1.0)):
+        return None
+    return (win == 1.0).reshape(size, size)
+
+
+def _score_matrix(lambdas: Tuple[float, float]) -> np.ndarray:
+    # normalized, read-only; shared with every other fixture at the same rates
+    return score_matrix_cache.matrix(*lambdas)
+
+
+def price_coupon(db: Session, selections: Sequence) -> CouponPrice:
+    """Price a coupon's selections.
+
+    `selections` are objects exposing fixture_id, league_id, home, away,
+    market, outcome, odds and an optional prob (see `coupon_api.SelectionIn`).
+    """
+
+    contexts = build_poisson_contexts(
+        db, [(s.league_id, s.home, s.away) for s in selections]
+    )
+
+    matrices: Dict[str, np.ndarray] = {}
+    masks: List[Optional[np.ndarray]] = []
+    legs: List[LegPrice] = []
+
+    for s, ctx in zip(selections, contexts):
+        mask = _outcome_mask(s.market, s.outcome)
+        lambdas = lambdas_from_context(ctx) if mask is not None else None
+        if lambdas is not None and s.fixture_id not in matrices:
+            matrices[s.fixture_id] = _score_matrix(lambdas)
+        masks.append(mask if lambdas is not None else None)
+
+        user_prob = s.prob is not None and 0 < s.prob < 1
+        ev: Optional[float] = None
+        if user_prob:
+            prob, source = s.prob, "user"
+        elif masks[-1] is not None:
+            prob, source = float(matrices[s.fixture_id][masks[-1]].sum()), "model"
+        else:
+            # priced from the fixture's market book (handles pushes / quarter lines)
+            info = predict_market(s.market, {s.outcome: s.odds}, ctx)[s.outcome]
+            prob, source, ev = info["prob"], info["source"], info["ev"]
+        legs.append(LegPrice(prob=prob, ev=prob * s.odds - 1.0 if ev is None else ev, source=source))
+
+    # Group legs by fixture; legs sharing a score matrix are priced jointly.
+    groups: Dict[str, List[int]] = {}
+    for i, s in enumerate(selections):
+        groups.setdefault(s.fixture_id, []).append(i)
+
+    total_prob = 1.0
+    for fixture_id, idx in groups.items():
+        group_prob = float(np.prod([legs[i].prob for i in idx]))
+        joint_idx = [i for i in idx if masks[i] is not None]
+        if len(joint_idx) > 1:
+            matrix = matrices[fixture_id]
+            joint_mask = np.logical_and.reduce([masks[i] for i in joint_idx])
+            joint = float(matrix[joint_mask].sum())
+            independent = float(np.prod([matrix[masks[i]].sum() for i in joint_idx]))
+            # scale the leg probabilities by the model's dependence ratio
+            group_prob = group_prob * (joint / independent) if independent > 0 else 0.0
+            if any(legs[i].source != "model" for i in idx):
+                # the ratio came from the model, not from the supplied probabilities;
+                # a joint can never be likelier than its least likely leg
+                group_prob = min(group_prob, min(legs[i].prob for i in idx))
+        total_prob *= min(group_prob, 1.0)
+
+    total_odds = float(np.prod([s.odds for s in selections]))
+    return CouponPrice(
+        legs=legs,
+        total_odds=total_odds,
+        total_prob=total_prob,
+        total_ev=total_prob * total_odds - 1.0,
+    )
@@ -1,9 +1,116 @@
+import asyncio
 import os
-from sqlalchemy import create_engine
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./gfps.db")
 
+# Connection pool settings (ignored for SQLite, which manages its own pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# SQLite performance profile (applied automatically for sqlite URLs)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SINGLE_WRITER = os.getenv("SQLITE_SINGLE_WRITER", "true").lower() in ("1", "true", "yes")
+
+T = TypeVar("T")
+
+
+def _async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)."""
+
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        u = u.set(drivername="sqlite+aiosqlite")
+    elif u.get_backend_name() == "postgresql":
+        u = u.set(drivername="postgresql+asyncpg")
+    return u.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+
+def _pool_options() -> dict:
+    if IS_SQLITE:
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Per-connection pragmas: WAL journal, relaxed fsync, mmap, busy timeout."""
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+class SQLiteWriter:
+    """Dedicated single-writer queue for SQLite.
+
+    SQLite allows one writer at a time; concurrent writers from the snapshot
+    scheduler, live_state, the alert engine and API threads otherwise end up
+    spinning on "database is locked". Sync write callables run one at a time
+    on a dedicated thread, and async sessions join the same FIFO through
+    `hold()`, so writes are serialized while WAL keeps readers unblocked.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._lock = threading.Lock()
+
+    def _run_locked(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            return fn(*args, **kwargs)
+
+    def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return self._executor.submit(self._run_locked, fn, *args, **kwargs).result()
+
+    async def run_async(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return await asyncio.wrap_future(
+            self._executor.submit(self._run_locked, fn, *args, **kwargs)
+        )
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[None]:
+        # queue behind pending writes, then keep the lock for the async writer
+        acquired = self._executor.submit(self._lock.acquire)
+        try:
+            await asyncio.wrap_future(acquired)
+        except BaseException:
+            # cancelled while waiting: the writer thread may still take the
+            # lock (or already has), so hand it back as soon as it does
+            acquired.add_done_callback(lambda f: f.cancelled() or self._lock.release())
+            raise
+        try:
+            yield
+        finally:
+            self._lock.release()
+
 
 class Base(DeclarativeBase):
     pass
@@ -13,6 +120,7 @@ engine = create_engine(
     DATABASE_URL,
     echo=False,
     future=True,
+    **_pool_options(),
 )
 
 SessionLocal = sessionmaker(
@@ -21,3 +129,67 @@ SessionLocal = sessionmaker(
     autocommit=False,
     future=True,
 )
+
+# Async engine for hot async endpoints and background services
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    **_pool_options(),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+sqlite_writer: Optional[SQLiteWriter] = None
+
+if IS_SQLITE:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    if SQLITE_SINGLE_WRITER:
+        sqlite_writer = SQLiteWriter()
+
+
+def ensure_schema(bind=None) -> None:
+    """Create missing tables, then any index missing on tables that already existed.
+
+    `create_all` only emits an index together with a new table, so indexes
+    added to existing models would never reach an older database. Each one
+    is checked first, so this is idempotent and cheap on every startup (the
+    first run on a large table takes as long as building the index).
+    """
+
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def run_write(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a sync write callable, serialized through the SQLite writer if enabled."""
+
+    if sqlite_writer is None:
+        return fn(*args, **kwargs)
+    return sqlite_writer.run(fn, *args, **kwargs)
+
+
+async def run_write_async(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Await a sync write callable without blocking the event loop."""
+
+    if sqlite_writer is None:
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: fn(*args, **kwargs))
+    return await sqlite_writer.run_async(fn, *args, **kwargs)
+
+
+@asynccontextmanager
+async def serialized_write() -> AsyncIterator[None]:
+    """Wrap an async-session write so it takes its turn in the writer queue."""
+
+    if sqlite_writer is None:
+        yield
+        return
+    async with sqlite_writer.hold():
+        yield
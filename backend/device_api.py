@@ -3,32 +3,12 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from .db import SessionLocal
-from .models import User, Device
-from .auth_utils import decode_token
+from .models import Device
+from .auth_dependency import get_db, get_user
 
 router = APIRouter(prefix="/devices", tags=["devices"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_user(token: str, db: Session) -> User:
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(401, "Invalid token")
-    email = payload.get("sub")
-    u = db.scalar(select(User).where(User.email == email))
-    if not u:
-        raise HTTPException(404, "User not found")
-    return u
-
-
 class DeviceIn(BaseModel):
     token: str
     platform: str  # android / ios / web
@@ -0,0 +1,40 @@
+"""Largest-Triangle-Three-Buckets downsampling for chart series."""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, ys: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points LTTB keeps out of `len(x)`.
+
+    `x` is (N,) increasing and `ys` (N,) or (N, S); with several series the
+    triangle areas are summed, so one set of timestamps serves every line.
+    The first and last points are always kept.
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64).reshape(len(x), -1)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # bucket edges for the N - 2 inner points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # average of the next bucket (the last point for the final bucket)
+        nlo, nhi = (edges[b + 1], edges[b + 2]) if b + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[nlo:nhi].mean(), ys[nlo:nhi].mean(axis=0)
+
+        bx, by = x[lo:hi], ys[lo:hi]
+        area = np.abs(
+            (x[a] - cx) * (by - ys[a]) - (x[a] - bx)[:, None] * (cy - ys[a])
+        ).sum(axis=1)
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
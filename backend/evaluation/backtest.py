@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, Mapping
+from typing import Iterable, Mapping, Optional
 import numpy as np
 
 
@@ -15,25 +15,42 @@ class Bet:
     result: str
 
 
-def run_backtest(bets: Iterable[Bet]) -> Mapping[str, float]:
-    stakes, pnl = [], []
-    for bet in bets:
-        stakes.append(bet.stake)
-        if bet.outcome == bet.result:
-            pnl.append(bet.stake * (bet.odds - 1))
-        else:
-            pnl.append(-bet.stake)
-    total_stake = float(np.sum(stakes)) if stakes else 0.0
-    total_pnl = float(np.sum(pnl)) if pnl else 0.0
-    roi = total_pnl / total_stake if total_stake else 0.0
-    max_drawdown = 0.0
-    equity = 0.0
-    peak = 0.0
-    for change in pnl:
-        equity += change
-        peak = max(peak, equity)
-        drawdown = peak - equity
-        max_drawdown = max(max_drawdown, drawdown)
-    return {"pnl": total_pnl, "roi": roi, "max_drawdown": max_drawdown}
+def max_drawdown(pnl: np.ndarray) -> float:
+    """Largest peak-to-trough fall of the cumulative PnL (starting from 0)."""
+
+    if len(pnl) == 0:
+        return 0.0
+    equity = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+    return float(np.max(peak - equity))
+
 
+def portfolio_metrics(
+    stakes: np.ndarray,
+    pnl: np.ndarray,
+    clv: Optional[np.ndarray] = None,
+) -> Mapping[str, float]:
+    """PnL, ROI, drawdown (and mean CLV per unit staked) of a bet sequence in time order."""
 
+    stakes = np.asarray(stakes, dtype=np.float64)
+    pnl = np.asarray(pnl, dtype=np.float64)
+    total_stake = float(stakes.sum())
+    total_pnl = float(pnl.sum())
+    metrics = {
+        "pnl": total_pnl,
+        "roi": total_pnl / total_stake if total_stake else 0.0,
+        "max_drawdown": max_drawdown(pnl),
+    }
+    if clv is not None:
+        clv = np.asarray(clv, dtype=np.float64)
+        metrics["clv"] = float(np.sum(clv * stakes) / total_stake) if total_stake else 0.0
+    return metrics
+
+
+def run_backtest(bets: Iterable[Bet]) -> Mapping[str, float]:
+    bets = list(bets)
+    stakes = np.fromiter((bet.stake for bet in bets), dtype=np.float64, count=len(bets))
+    odds = np.fromiter((bet.odds for bet in bets), dtype=np.float64, count=len(bets))
+    won = np.fromiter((bet.outcome == bet.result for bet in bets), dtype=bool, count=len(bets))
+    pnl = np.where(won, stakes * (odds - 1), -stakes)
+    return portfolio_metrics(stakes, pnl)
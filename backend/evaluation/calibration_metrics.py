@@ -4,18 +4,18 @@ from __future__ import annotations
 import numpy as np
 
 
+def calibration_bins(confidences: np.ndarray, bins: int = 10) -> np.ndarray:
+    """Equal-width bin index of each confidence; 1.0 falls into the last bin."""
+
+    return np.minimum((np.asarray(confidences) * bins).astype(np.int64), bins - 1)
+
+
 def expected_calibration_error(probs: np.ndarray, labels: np.ndarray, bins: int = 10) -> float:
     confidences = np.max(probs, axis=1)
     predictions = np.argmax(probs, axis=1)
-    bin_edges = np.linspace(0.0, 1.0, bins + 1)
-    ece = 0.0
-    for i in range(bins):
-        mask = (confidences >= bin_edges[i]) & (confidences < bin_edges[i + 1])
-        if not np.any(mask):
-            continue
-        bin_conf = np.mean(confidences[mask])
-        bin_acc = np.mean(predictions[mask] == labels[mask])
-        ece += np.abs(bin_conf - bin_acc) * np.mean(mask)
-    return float(ece)
-
-
+    idx = calibration_bins(confidences, bins)
+    counts = np.bincount(idx, minlength=bins)
+    conf_sum = np.bincount(idx, weights=confidences, minlength=bins)
+    acc_sum = np.bincount(idx, weights=(predictions == labels).astype(np.float64), minlength=bins)
+    # sum over bins of |mean conf - accuracy| * share of samples
+    return float(np.sum(np.abs(conf_sum - acc_sum)) / len(confidences)) if len(confidences) else 0.0
@@ -0,0 +1,135 @@
+"""Batched evaluation of several model versions on the same labelled matches.
+
+Every metric is a weighted mean of a per-match quantity, so point estimates
+and bootstrap resamples share one code path: a resample is a row of
+multinomial counts `w` over the N matches and `metric = w @ q / w.sum()`.
+All versions are scored against the same resamples, and resamples are
+processed in blocks as a single matrix product instead of B Python loops.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .calibration_metrics import calibration_bins
+from .rps import rps_per_row
+
+METRICS = ("logLoss", "brier", "rps", "ece", "clv")
+EPS = 1e-15
+
+
+def dataset_hash(ids: np.ndarray, labels: np.ndarray, odds: Optional[np.ndarray] = None) -> str:
+    """Stable fingerprint of an evaluation set (match ids, labels, odds)."""
+
+    digest = hashlib.sha1()
+    for arr in (ids, labels) + ((odds,) if odds is not None else ()):
+        digest.update(np.ascontiguousarray(arr).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _per_match(
+    probs: np.ndarray, labels: np.ndarray, odds: Optional[np.ndarray], bins: int
+) -> Dict[str, np.ndarray]:
+    """(M, N) per-match terms for each metric, for a stack of (M, N, K) forecasts."""
+
+    m, n, k = probs.shape
+    rows = np.arange(n)
+    one_hot = np.eye(k)[labels]
+
+    terms = {
+        "logLoss": -np.log(np.clip(probs[:, rows, labels], EPS, 1 - EPS)),
+        "brier": np.sum((probs - one_hot) ** 2, axis=-1),
+        "rps": rps_per_row(probs, labels),
+    }
+
+    # ECE: per-bin sums of (confidence - hit); |.| is taken after aggregation
+    conf = probs.max(axis=-1)
+    hit = (probs.argmax(axis=-1) == labels).astype(np.float64)
+    terms["_ece_bin"] = calibration_bins(conf, bins)
+    terms["_ece_gap"] = conf - hit
+
+    if odds is not None:
+        # CLV of the value pick (highest EV outcome at the closing price, if > 0)
+        ev = probs * odds[None, :, :] - 1.0
+        ev = np.where(np.isfinite(ev), ev, -np.inf)
+        best = ev.max(axis=-1)
+        terms["clv"] = np.where(best > 0, best, 0.0)
+        terms["_bets"] = (best > 0).astype(np.float64)
+    return terms
+
+
+def _aggregate(terms: Dict[str, np.ndarray], weights: np.ndarray, bins: int) -> Dict[str, np.ndarray]:
+    """Metrics for each model (M) and weight row (B): arrays of shape (M, B)."""
+
+    weights = np.asarray(weights, dtype=np.float64)
+    total = weights.sum(axis=1)
+    out = {
+        name: (terms[name] @ weights.T) / total
+        for name in ("logLoss", "brier", "rps")
+    }
+
+    bin_idx, gap = terms["_ece_bin"], terms["_ece_gap"]
+    m, n = gap.shape
+    ece = np.zeros((m, len(weights)))
+    for b in range(bins):
+        in_bin = np.where(bin_idx == b, gap, 0.0)
+        ece += np.abs(in_bin @ weights.T)
+    out["ece"] = ece / total
+
+    if "clv" in terms:
+        bets = terms["_bets"] @ weights.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["clv"] = np.where(bets > 0, (terms["clv"] @ weights.T) / bets, 0.0)
+    return out
+
+
+def evaluate_models(
+    probs: Mapping[str, np.ndarray],
+    labels: np.ndarray,
+    odds: Optional[np.ndarray] = None,
+    n_boot: int = 1000,
+    alpha: float = 0.05,
+    bins: int = 10,
+    seed: int = 0,
+    block: int = 200,
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Score every version's (N, K) forecasts against the same labels.
+
+    Returns {version: {metric: {"value", "low", "high"}}} with percentile
+    bootstrap intervals at level 1 - alpha (no interval when n_boot=0).
+    `odds` (N, K) closing odds enable the CLV metric.
+    """
+
+    versions = list(probs)
+    if not versions:
+        return {}
+    stack = np.stack([np.asarray(probs[v], dtype=np.float64) for v in versions])
+    labels = np.asarray(labels, dtype=np.int64)
+    n = len(labels)
+    terms = _per_match(stack, labels, None if odds is None else np.asarray(odds, np.float64), bins)
+
+    point = _aggregate(terms, np.ones((1, n)), bins)
+    names = [name for name in METRICS if name in point]
+
+    boot: Dict[str, list] = {name: [] for name in names}
+    rng = np.random.default_rng(seed)
+    uniform = np.full(n, 1.0 / n)
+    for start in range(0, n_boot, block):
+        weights = rng.multinomial(n, uniform, size=min(block, n_boot - start))
+        for name, values in _aggregate(terms, weights, bins).items():
+            boot[name].append(values)
+
+    report: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for i, version in enumerate(versions):
+        entry = {}
+        for name in names:
+            value = {"value": float(point[name][i, 0])}
+            if n_boot:
+                samples = np.concatenate([b[i] for b in boot[name]])
+                low, high = np.quantile(samples, [alpha / 2, 1 - alpha / 2])
+                value.update(low=float(low), high=float(high))
+            entry[name] = value
+        report[version] = entry
+    return report
@@ -0,0 +1,124 @@
+"""Cached metric reports per (model version, evaluation dataset).
+
+Computing a report loads each version's artifacts, predicts all three
+markets for the dataset and scores them together with
+`metrics.evaluate_models`; the result is stored in `MetricsReport` keyed by
+the dataset hash, so re-running on the same data is a lookup and `/ml/models`
+reads the latest report without touching the models.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..db import SessionLocal, run_write
+from ..ml.historical_loader import ODDS_COLUMNS
+from ..model_registry import artifact_dir, load_model_set
+from ..models import MetricsReport
+from .metrics import dataset_hash, evaluate_models
+
+# market -> (model bundle, label column, odds columns in class order)
+MARKETS = {
+    "1x2": ("model_1x2", "result_1x2", ("odds_1", "odds_x", "odds_2")),
+    "over25": ("model_over25", "is_over25", ("odds_under25", "odds_over25")),
+    "gg": ("model_gg", "is_gg", ("odds_ng", "odds_gg")),
+}
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    labels = np.stack([df[MARKETS[m][1]].to_numpy(np.int8) for m in MARKETS], axis=1)
+    return dataset_hash(df["id"].to_numpy(np.int64), labels, df[list(ODDS_COLUMNS)].to_numpy())
+
+
+def _version_probabilities(version: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    models = load_model_set(version, artifact_dir(version))
+    leagues = df["league"].tolist()
+    odds = df[list(ODDS_COLUMNS)].to_numpy()
+    probs = {}
+    for market, (name, _, _) in MARKETS.items():
+        if name not in models.bundles:
+            continue
+        bundle = models.bundle(name)
+        probs[market] = bundle["predict"](bundle["encoder"].encode(leagues, odds))
+    return probs
+
+
+def cached_reports(versions: Sequence[str], digest: str) -> Dict[str, Dict]:
+    with SessionLocal() as db:
+        rows = (
+            db.query(MetricsReport)
+            .filter(MetricsReport.dataset_hash == digest, MetricsReport.model_version.in_(list(versions)))
+            .all()
+        )
+        return {row.model_version: row.metrics for row in rows}
+
+
+def evaluate_versions(
+    versions: Sequence[str],
+    df: pd.DataFrame,
+    n_boot: int = 1000,
+    refresh: bool = False,
+) -> Dict[str, Dict]:
+    """Reports for `versions` on `df` (labelled HistoricalMatch frame), cached."""
+
+    digest = frame_hash(df)
+    reports = {} if refresh else cached_reports(versions, digest)
+    missing = [v for v in versions if v not in reports]
+    if not missing:
+        return reports
+
+    probs: Dict[str, Dict[str, np.ndarray]] = {}
+    for version in missing:
+        try:
+            probs[version] = _version_probabilities(version, df)
+        except FileNotFoundError as exc:
+            print(f"[GFPS-ML][EVAL] Skipping {version}: {exc}")
+
+    # score each market for all versions in one batch, same bootstrap resamples
+    fresh: Dict[str, Dict] = {v: {} for v in probs}
+    for market, (_, label, odds_cols) in MARKETS.items():
+        have = {v: p[market] for v, p in probs.items() if market in p}
+        scored = evaluate_models(
+            have,
+            df[label].to_numpy(),
+            odds=df[list(odds_cols)].to_numpy(),
+            n_boot=n_boot,
+        )
+        for version, metrics in scored.items():
+            fresh[version][market] = metrics
+
+    def save() -> None:
+        with SessionLocal() as db:
+            for version, metrics in fresh.items():
+                row = (
+                    db.query(MetricsReport)
+                    .filter(MetricsReport.model_version == version, MetricsReport.dataset_hash == digest)
+                    .first()
+                ) or MetricsReport(model_version=version, dataset_hash=digest)
+                row.samples = len(df)
+                row.metrics = metrics
+                db.add(row)
+            db.commit()
+
+    run_write(save)
+    reports.update(fresh)
+    return reports
+
+
+def latest_reports(versions: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Most recent cached report per version (for listing endpoints)."""
+
+    with SessionLocal() as db:
+        q = db.query(MetricsReport)
+        if versions is not None:
+            q = q.filter(MetricsReport.model_version.in_(versions))
+        latest: Dict[str, Dict] = {}
+        for row in q.order_by(MetricsReport.created_at, MetricsReport.id):
+            latest[row.model_version] = {
+                "datasetHash": row.dataset_hash,
+                "samples": row.samples,
+                "metrics": row.metrics,
+            }
+        return latest
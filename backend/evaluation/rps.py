@@ -0,0 +1,22 @@
+"""Ranked probability score for ordered outcomes (e.g. home / draw / away)."""
+from __future__ import annotations
+
+import numpy as np
+
+
+def rps_per_row(probs: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """RPS of each forecast: mean squared distance of the cumulative distributions.
+
+    `probs` is (..., N, K) with classes in their natural order, so a batch of
+    model versions (M, N, K) scores in one call.
+    """
+
+    probs = np.asarray(probs, dtype=np.float64)
+    k = probs.shape[-1]
+    cum_probs = np.cumsum(probs, axis=-1)[..., :-1]
+    cum_obs = (np.asarray(labels)[:, None] <= np.arange(k - 1)).astype(np.float64)
+    return np.sum((cum_probs - cum_obs) ** 2, axis=-1) / (k - 1)
+
+
+def ranked_probability_score(probs: np.ndarray, labels: np.ndarray) -> float:
+    return float(np.mean(rps_per_row(probs, labels)))
@@ -0,0 +1,185 @@
+"""Scoring of full score-matrix forecasts against final scores.
+
+A forecast is a (G, G) matrix of scoreline probabilities indexed
+[home_goals, away_goals] (as built by the goal models); N matches stack to
+(N, G, G) and several models to (M, N, G, G). Ordered markets are scored on
+distributions derived from the matrix:
+
+  - total goals      (0 .. 2G-2)
+  - goal difference  (-(G-1) .. G-1, what Asian handicap lines settle on)
+  - 1X2              (home / draw / away, ordered)
+
+with ranked probability score, pinball loss at quantiles of the derived
+distribution, and the correct-score log score. Derived distributions are a
+single matmul of the flattened matrices with a fixed 0/1 map, and RPS/quantiles
+come from cumulative sums, so nothing loops over matches.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from ..prediction_engine.goals.poisson import poisson_pmf_table
+from .rps import rps_per_row
+
+EPS = 1e-15
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+
+@lru_cache(maxsize=16)
+def _projection(size: int, kind: str) -> np.ndarray:
+    """(G*G, K) 0/1 map from flattened scorelines to an ordered outcome."""
+
+    home, away = np.indices((size, size))
+    if kind == "total":
+        idx, k = home + away, 2 * size - 1
+    elif kind == "diff":
+        idx, k = home - away + size - 1, 2 * size - 1
+    else:  # 1X2 as ordered classes: 0 = home, 1 = draw, 2 = away
+        idx, k = np.sign(away - home) + 1, 3
+    proj = np.zeros((size * size, k))
+    proj[np.arange(size * size), idx.ravel()] = 1.0
+    return proj
+
+
+def _project(matrices: np.ndarray, kind: str) -> np.ndarray:
+    size = matrices.shape[-1]
+    flat = matrices.reshape(matrices.shape[:-2] + (size * size,))
+    return flat @ _projection(size, kind)
+
+
+def total_goals_distribution(matrices: np.ndarray) -> np.ndarray:
+    """P(home + away = t) for t = 0 .. 2G-2, shape (..., 2G-1)."""
+
+    return _project(np.asarray(matrices, dtype=np.float64), "total")
+
+
+def goal_difference_distribution(matrices: np.ndarray) -> np.ndarray:
+    """P(home - away = d) for d = -(G-1) .. G-1, shape (..., 2G-1)."""
+
+    return _project(np.asarray(matrices, dtype=np.float64), "diff")
+
+
+def one_x_two_distribution(matrices: np.ndarray) -> np.ndarray:
+    """(home, draw, away) probabilities, shape (..., 3)."""
+
+    return _project(np.asarray(matrices, dtype=np.float64), "1x2")
+
+
+def _outcome_indices(home_goals: np.ndarray, away_goals: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+    # derived outcomes come from the actual score and are then clipped to the
+    # support of their distribution (the truncated tail sits at its edge);
+    # clamping the goals first could turn e.g. 12-10 into a draw
+    hg = np.asarray(home_goals, dtype=np.int64)
+    ag = np.asarray(away_goals, dtype=np.int64)
+    top = 2 * size - 2
+    return {
+        "home": np.minimum(hg, size - 1),
+        "away": np.minimum(ag, size - 1),
+        "total": np.minimum(hg + ag, top),
+        "diff": np.clip(hg - ag + size - 1, 0, top),
+        "1x2": np.sign(ag - hg) + 1,
+    }
+
+
+def pinball_loss(dist: np.ndarray, outcome: np.ndarray, quantiles: Sequence[float]) -> np.ndarray:
+    """Pinball loss of the distribution's quantiles, shape (..., N, Q).
+
+    `dist` is (..., N, K) over ordered integer support 0..K-1 and `outcome`
+    the realised (N,) index on that support; the q-quantile is the first
+    value whose CDF reaches q.
+    """
+
+    cdf = np.cumsum(dist, axis=-1)
+    q = np.asarray(quantiles, dtype=np.float64)
+    # first index with cdf >= q, for every q at once
+    qhat = (cdf[..., None, :] < q[:, None] - 1e-12).sum(axis=-1)
+    qhat = np.minimum(qhat, dist.shape[-1] - 1)
+    diff = np.asarray(outcome)[:, None] - qhat
+    return np.maximum(q * diff, (q - 1.0) * diff)
+
+
+def correct_score_log_score(matrices: np.ndarray, home_goals: np.ndarray, away_goals: np.ndarray) -> np.ndarray:
+    """-log P(actual scoreline), shape (..., N).
+
+    Scorelines outside the grid are charged the matrix's missing mass.
+    """
+
+    matrices = np.asarray(matrices, dtype=np.float64)
+    size = matrices.shape[-1]
+    hg = np.asarray(home_goals, dtype=np.int64)
+    ag = np.asarray(away_goals, dtype=np.int64)
+    inside = (hg < size) & (ag < size)
+    rows = np.arange(len(hg))
+    prob = matrices[..., rows, np.minimum(hg, size - 1), np.minimum(ag, size - 1)]
+    tail = np.clip(1.0 - matrices.sum(axis=(-2, -1)), 0.0, 1.0)
+    prob = np.where(inside, prob, tail)
+    return -np.log(np.clip(prob, EPS, 1.0))
+
+
+def score_matrix_terms(
+    matrices: np.ndarray,
+    home_goals: np.ndarray,
+    away_goals: np.ndarray,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+) -> Dict[str, np.ndarray]:
+    """Per-match scores (..., N) of every metric for (..., N, G, G) forecasts."""
+
+    matrices = np.asarray(matrices, dtype=np.float64)
+    outcome = _outcome_indices(home_goals, away_goals, matrices.shape[-1])
+
+    total = total_goals_distribution(matrices)
+    diff = goal_difference_distribution(matrices)
+    return {
+        "correctScoreLogScore": correct_score_log_score(matrices, home_goals, away_goals),
+        "totalGoalsRps": rps_per_row(total, outcome["total"]),
+        "goalDiffRps": rps_per_row(diff, outcome["diff"]),
+        "oneXTwoRps": rps_per_row(one_x_two_distribution(matrices), outcome["1x2"]),
+        "totalGoalsPinball": pinball_loss(total, outcome["total"], quantiles).mean(axis=-1),
+        "goalDiffPinball": pinball_loss(diff, outcome["diff"], quantiles).mean(axis=-1),
+    }
+
+
+def score_matrices(
+    forecasts: Mapping[str, np.ndarray],
+    home_goals: np.ndarray,
+    away_goals: np.ndarray,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    chunk: int = 20000,
+) -> Dict[str, Dict[str, float]]:
+    """Mean scores per model for (N, G, G) forecasts of the same matches.
+
+    Models with the same grid size are scored as one (M, N, G, G) stack;
+    matches are processed in chunks to bound memory. Lower is better for
+    every metric.
+    """
+
+    home_goals = np.asarray(home_goals)
+    away_goals = np.asarray(away_goals)
+    n = len(home_goals)
+
+    by_size: Dict[int, list] = {}
+    for name, matrices in forecasts.items():
+        by_size.setdefault(np.shape(matrices)[-1], []).append(name)
+
+    report: Dict[str, Dict[str, float]] = {}
+    for names in by_size.values():
+        sums: Dict[str, np.ndarray] = {}
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            stack = np.stack([np.asarray(forecasts[name][start:stop]) for name in names])
+            terms = score_matrix_terms(stack, home_goals[start:stop], away_goals[start:stop], quantiles)
+            for metric, values in terms.items():
+                sums[metric] = sums.get(metric, 0.0) + values.sum(axis=-1)
+        for i, name in enumerate(names):
+            report[name] = {metric: float(total[i] / n) for metric, total in sums.items()}
+    return report
+
+
+def poisson_score_matrices(lambdas: np.ndarray, max_goals: int = 10) -> np.ndarray:
+    """Independent-Poisson (N, G, G) matrices for (N, 2) [home, away] rates."""
+
+    pmf = poisson_pmf_table(np.asarray(lambdas, dtype=np.float64).reshape(-1, 2), max_goals)
+    return pmf[:, 0, :, None] * pmf[:, 1, None, :]
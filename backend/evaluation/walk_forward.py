@@ -0,0 +1,213 @@
+"""Walk-forward backtesting of the 1X2 model over leagues and seasons.
+
+For every (league, season) window a model is refitted on the preceding
+seasons only, then replayed over the season's matches in kickoff order:
+the best positive-edge outcome of each match is staked (flat, Kelly or
+capped Kelly) at closing odds. Staking, PnL, drawdown and CLV are computed
+with array operations; windows are independent and run in a process pool.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from ..ml.feature_store import implied_probabilities
+from ..ml.historical_loader import ODDS_COLUMNS, load_historical_matches
+from .backtest import portfolio_metrics
+
+STAKING_STRATEGIES = ("flat", "kelly", "capped")
+# 1X2 odds columns in result_1x2 label order (0=1, 1=X, 2=2)
+OUTCOME_ODDS = ("odds_1", "odds_x", "odds_2")
+
+WALK_FORWARD_WORKERS = int(os.getenv("WALK_FORWARD_WORKERS", "0")) or None
+
+
+@dataclass(frozen=True)
+class WalkForwardConfig:
+    strategy: str = "kelly"
+    kelly_fraction: float = 0.25
+    cap: float = 0.05  # max fraction of bankroll per bet ("capped")
+    flat_stake: float = 1.0
+    bankroll: float = 100.0
+    min_edge: float = 0.02
+    train_seasons: int = 3  # 0 = expanding window
+    min_train: int = 300
+    C: float = 1.0
+    season_start_month: int = 7
+
+
+def season_of(kickoff: pd.Series, start_month: int = 7) -> np.ndarray:
+    """Season label = calendar year the season started in (Aug 2023 -> 2023)."""
+
+    ts = pd.to_datetime(kickoff)
+    year = ts.dt.year.to_numpy()
+    return np.where(ts.dt.month.to_numpy() >= start_month, year, year - 1)
+
+
+def stake_sizes(
+    probs: np.ndarray,
+    odds: np.ndarray,
+    won: np.ndarray,
+    config: WalkForwardConfig,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stakes and PnL of a bet sequence in time order.
+
+    Flat staking bets `flat_stake` each time. Kelly staking bets
+    `kelly_fraction` of the Kelly fraction of the running bankroll
+    (capped at `cap` for "capped"), so the bankroll compounds:
+    B_i = B_0 * prod_{j<=i} (1 + f_j * r_j).
+    """
+
+    if config.strategy not in STAKING_STRATEGIES:
+        raise ValueError(f"Unknown staking strategy {config.strategy!r}")
+
+    returns = np.where(won, odds - 1.0, -1.0)
+    if config.strategy == "flat":
+        stakes = np.full(len(odds), config.flat_stake)
+        return stakes, stakes * returns
+
+    fraction = config.kelly_fraction * (probs * odds - 1.0) / (odds - 1.0)
+    fraction = np.clip(fraction, 0.0, config.cap if config.strategy == "capped" else 1.0)
+    bankroll = config.bankroll * np.cumprod(1.0 + fraction * returns)
+    before = np.concatenate([[config.bankroll], bankroll[:-1]])
+    stakes = fraction * before
+    return stakes, stakes * returns
+
+
+def _select_bets(probs: np.ndarray, odds: np.ndarray, min_edge: float):
+    """Per match, the outcome with the highest EV if it clears `min_edge`."""
+
+    ev = probs * odds - 1.0
+    ev = np.where(np.isfinite(ev), ev, -np.inf)
+    pick = ev.argmax(axis=1)
+    rows = np.arange(len(ev))
+    mask = ev[rows, pick] > min_edge
+    return np.nonzero(mask)[0], pick[mask]
+
+
+def run_window(
+    league: str,
+    season: int,
+    train_X: np.ndarray,
+    train_y: np.ndarray,
+    test_X: np.ndarray,
+    test_y: np.ndarray,
+    test_odds: np.ndarray,
+    test_kickoff: np.ndarray,
+    config: WalkForwardConfig,
+) -> Dict:
+    """Fit on the training seasons and replay one test season (rows in kickoff order)."""
+
+    model = LogisticRegression(C=config.C, max_iter=200)
+    model.fit(train_X, train_y)
+    probs = np.zeros((len(test_X), 3))
+    probs[:, model.classes_] = model.predict_proba(test_X)
+
+    rows, pick = _select_bets(probs, test_odds, config.min_edge)
+    p = probs[rows, pick]
+    odds = test_odds[rows, pick]
+    won = test_y[rows] == pick
+    stakes, pnl = stake_sizes(p, odds, won, config)
+    # CLV as in evaluation.clv: expected edge per unit at the closing price
+    clv = p * (odds - 1.0) - (1.0 - p)
+
+    return {
+        "league": league,
+        "season": int(season),
+        "train": int(len(train_X)),
+        "matches": int(len(test_X)),
+        "bets": int(len(rows)),
+        "staked": float(stakes.sum()),
+        "hit_rate": float(won.mean()) if len(won) else 0.0,
+        **portfolio_metrics(stakes, pnl, clv),
+        "_pnl": pnl,
+        "_stakes": stakes,
+        "_clv": clv,
+        "_kickoff": test_kickoff[rows],
+    }
+
+
+def _windows(
+    df: pd.DataFrame, config: WalkForwardConfig, seasons: Optional[Sequence[int]]
+) -> List[Tuple]:
+    implied = implied_probabilities(df[list(ODDS_COLUMNS)].to_numpy())
+    odds = df[list(OUTCOME_ODDS)].to_numpy(dtype=np.float64)
+    labels = df["result_1x2"].to_numpy()
+    kickoff = pd.to_datetime(df["kickoff"]).to_numpy(dtype="datetime64[ns]")
+    season = season_of(df["kickoff"], config.season_start_month)
+    wanted = set(seasons) if seasons else None
+
+    tasks = []
+    for league, idx in df.groupby("league", sort=True).indices.items():
+        league_season = season[idx]
+        for s in np.unique(league_season):
+            if wanted is not None and s not in wanted:
+                continue
+            first = s - config.train_seasons if config.train_seasons else -np.inf
+            train = idx[(league_season < s) & (league_season >= first)]
+            if len(train) < config.min_train or len(np.unique(labels[train])) < 2:
+                continue
+            test = idx[league_season == s]
+            tasks.append(
+                (league, int(s), implied[train], labels[train],
+                 implied[test], labels[test], odds[test], kickoff[test], config)
+            )
+    return tasks
+
+
+def _combine(windows: List[Dict]) -> Dict:
+    if not windows:
+        return {"windows": 0, "bets": 0, "staked": 0.0, **portfolio_metrics([], [], [])}
+    # windows of the same season run side by side: merge their bets by kickoff
+    # so the aggregate equity curve (and its drawdown) follows calendar time
+    kickoff = np.concatenate([w["_kickoff"] for w in windows])
+    order = np.argsort(kickoff, kind="stable")
+    stakes = np.concatenate([w["_stakes"] for w in windows])[order]
+    pnl = np.concatenate([w["_pnl"] for w in windows])[order]
+    clv = np.concatenate([w["_clv"] for w in windows])[order]
+    return {
+        "windows": len(windows),
+        "bets": int(len(pnl)),
+        "staked": float(stakes.sum()),
+        **portfolio_metrics(stakes, pnl, clv),
+    }
+
+
+def walk_forward(
+    df: Optional[pd.DataFrame] = None,
+    config: WalkForwardConfig = WalkForwardConfig(),
+    seasons: Optional[Sequence[int]] = None,
+    workers: Optional[int] = WALK_FORWARD_WORKERS,
+    **loader,
+) -> Dict:
+    """Run every (league, season) window and aggregate the results.
+
+    `df` defaults to `load_historical_matches(**loader)`. `workers=1` runs
+    in-process; otherwise windows are spread over a process pool
+    (None = one worker per core).
+    """
+
+    if df is None:
+        df = load_historical_matches(**loader)
+    df = df.sort_values(["kickoff", "id"], kind="stable").reset_index(drop=True)
+    tasks = _windows(df, config, seasons)
+
+    if workers == 1 or len(tasks) <= 1:
+        windows = [run_window(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # a few windows per round trip keeps pickling overhead low
+            chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+            windows = list(pool.map(run_window, *zip(*tasks), chunksize=chunksize))
+
+    summary = _combine(windows)
+    for w in windows:
+        for key in ("_pnl", "_stakes", "_clv", "_kickoff"):
+            w.pop(key)
+    return {"config": asdict(config), "summary": summary, "windows": windows}
@@ -3,32 +3,12 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from .db import SessionLocal
-from .models import User, FavoriteLeague, FavoriteTeam
-from .auth_utils import decode_token
+from .models import FavoriteLeague, FavoriteTeam
+from .auth_dependency import get_db, get_user
 
 router = APIRouter(prefix="/favorites", tags=["favorites"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_user(token: str, db: Session) -> User:
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(401, "Invalid token")
-    email = payload.get("sub")
-    u = db.scalar(select(User).where(User.email == email))
-    if not u:
-        raise HTTPException(404, "User not found")
-    return u
-
-
 class FavLeagueIn(BaseModel):
     token: str
     league_id: str
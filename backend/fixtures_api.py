@@ -3,9 +3,10 @@ from datetime import date
 from typing import Optional, Tuple
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
 from .auth_dependency import require_user
+from .http_cache import check_snapshot_etag
 from .live_state import live_state
 
 APIFOOTBALL_KEY = os.getenv("APIFOOTBALL_KEY", "")
@@ -87,13 +88,20 @@ def _map_status(short_code: str, elapsed: Optional[int]) -> Tuple[str, Optional[
 
 
 @router.get("", dependencies=[Depends(require_user)])
-async def list_fixtures(league_id: Optional[int] = None, date_str: Optional[str] = None):
+async def list_fixtures(
+    request: Request,
+    response: Response,
+    league_id: Optional[int] = None,
+    date_str: Optional[str] = None,
+):
     if not date_str:
         d = date.today().isoformat()
     else:
         d = date_str
 
     if not APIFOOTBALL_KEY:
+        # only this branch is live_state-backed; upstream results carry no ETag
+        check_snapshot_etag(request, response)
         return live_state.snapshot()["fixtures"]
 
     params = {"date": d}
@@ -17,6 +17,7 @@ import aiosmtplib
 from .db import SessionLocal
 from .models import User
 from .auth_utils import hash_password, verify_password, create_token
+from .auth_dependency import invalidate_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -314,6 +315,7 @@ def confirm_reset(p: ResetConfirm, db: Session = Depends(get_db)):
 
     db.add(u)
     db.commit()
+    invalidate_user(u.email)
 
     return {"ok": True}
 
@@ -5,6 +5,7 @@ from fastapi import APIRouter
 from sqlalchemy import text
 
 from .db import engine
+from .prediction_engine.goals.matrix_cache import score_matrix_cache
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -33,4 +34,5 @@ async def health() -> Dict[str, Any]:
             "api": {"status": "ok"},
             "database": db_status,
         },
+        "caches": {"score_matrix": score_matrix_cache.stats()},
     }
@@ -0,0 +1,74 @@
+"""
+Conditional GET and response compression for polled endpoints.
+
+Snapshot-backed endpoints (`/predictions`, `/value-bets`, and `/fixtures`
+when it serves `live_state` rather than API-Football) only change when
+`live_state` does, so they carry `live_state.etag` as their ETag. A poll that sends it back in `If-None-Match` is answered with an empty
+304 before the endpoint builds its body. The ETag is weak because
+compression changes the bytes but not the content.
+
+Large responses are compressed with brotli when `brotli-asgi` is installed
+(falling back to gzip for clients without `br`), otherwise with gzip.
+"""
+
+from __future__ import annotations
+
+import os
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from starlette.middleware.gzip import GZipMiddleware
+
+from .live_state import live_state
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION = os.getenv("COMPRESSION", "auto").lower()  # auto | gzip | off
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+def check_snapshot_etag(request: Request, response: Response) -> None:
+    """Raise a 304 when the client already has the current snapshot version.
+
+    For endpoints that only serve `live_state` on some code paths; call it
+    on those paths before building the body.
+    """
+
+    # read before the endpoint runs: if state moves meanwhile, the client
+    # just refetches on its next poll
+    etag = live_state.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "X-Snapshot-Version": str(live_state.version),
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+async def snapshot_etag(request: Request, response: Response) -> None:
+    """Dependency form of `check_snapshot_etag` for purely snapshot-backed endpoints."""
+
+    check_snapshot_etag(request, response)
+
+
+def add_compression(app: FastAPI) -> None:
+    if COMPRESSION == "off":
+        return
+    if COMPRESSION == "auto":
+        try:
+            from brotli_asgi import BrotliMiddleware
+
+            app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+            return
+        except ImportError:
+            pass
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
@@ -0,0 +1,25 @@
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from .auth_dependency import require_user
+from .live.inplay_engine import inplay_engine
+
+router = APIRouter(prefix="/inplay", tags=["inplay"])
+
+
+@router.get("", dependencies=[Depends(require_user)])
+async def list_inplay() -> List[dict]:
+    """Latest in-play prices for every live fixture."""
+
+    return list(inplay_engine.latest.values())
+
+
+@router.get("/{fixture_id}/momentum", dependencies=[Depends(require_user)])
+async def fixture_momentum(fixture_id: str) -> Dict:
+    """Momentum series (minute, index in -1..1, home positive) for the MomentumChart."""
+
+    series = inplay_engine.momentum.series(fixture_id)
+    if series is None:
+        raise HTTPException(status_code=404, detail="No momentum for this fixture")
+    return {"fixtureId": fixture_id, "series": series}
@@ -0,0 +1,316 @@
+"""Vectorized in-play probability engine for every live fixture.
+
+The engine keeps one row per live fixture in flat arrays (elapsed minutes,
+score, red cards, pre-match expected goals) and re-prices all of them in a
+single step:
+
+  - time decay: the pre-match rates are scaled by the share of goals still
+    to come under the league's minute-by-minute intensity profile
+    (`time_decay.decay_tables`, stoppage time included),
+  - red cards: each red scales the team's remaining rate down and the
+    opponent's up,
+  - momentum: the rates are tilted towards the side with the recent
+    pressure (`momentum_index.momentum_tracker`),
+  - goals: the remaining-goals score matrices are shifted by the current
+    score, so every market settles on the final result.
+
+Matrices for all fixtures are built as one (N, G, G) stack and priced with
+`prediction_engine.markets.price_matrices`, so a tick costs a few array
+operations regardless of how many matches are live. The engine listens to
+`live_state` and publishes `{"type": "inplay", "prices": [...]}` through the same
+broadcaster as soon as a score, card or clock change arrives.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..live_state import live_state
+from ..prediction_engine.goals.matrix_cache import MAX_GOALS, build_score_matrices
+from ..prediction_engine.markets import lambdas_from_context, price_matrices
+from .momentum_index import MomentumTracker, adjust_lambda, event_team, is_red_card, momentum_tracker
+from .time_decay import DecayTables, decay_tables, parse_clock
+
+INPLAY_ENGINE_ENABLED = os.getenv("INPLAY_ENGINE", "true").lower() in ("1", "true", "yes")
+# re-price at least this often so the clock decays between feed updates
+INPLAY_TICK_SEC = float(os.getenv("INPLAY_TICK_SEC", "15"))
+INPLAY_RHO = float(os.getenv("INPLAY_RHO", "0.0"))
+# remaining-rate multipliers per red card (sent-off team, opponent)
+RED_CARD_OWN = float(os.getenv("INPLAY_RED_CARD_OWN", "0.67"))
+RED_CARD_OPPONENT = float(os.getenv("INPLAY_RED_CARD_OPPONENT", "1.25"))
+# `adjust_lambda` weight of the momentum index (0 disables the tilt)
+MOMENTUM_WEIGHT = float(os.getenv("INPLAY_MOMENTUM_WEIGHT", "0.3"))
+DEFAULT_LAMBDAS = (
+    float(os.getenv("INPLAY_DEFAULT_LAMBDA_HOME", "1.45")),
+    float(os.getenv("INPLAY_DEFAULT_LAMBDA_AWAY", "1.15")),
+)
+
+# floor for exhausted rates (the pmf takes log(lambda)); ~all mass on 0 goals
+MIN_REMAINING = 1e-9
+# outcomes published per fixture: name -> (market, outcome) book key
+PUBLISHED = {
+    "home": ("1x2", "home"),
+    "draw": ("1x2", "draw"),
+    "away": ("1x2", "away"),
+    "over25": ("over_under_2.5", "over"),
+    "under25": ("over_under_2.5", "under"),
+    "btts": ("btts", "yes"),
+}
+
+
+def red_cards(events: Iterable[Dict[str, Any]], home_team: str, away_team: str) -> Tuple[int, int]:
+    """(home, away) red cards among a fixture's events."""
+
+    teams = [event_team(ev, home_team, away_team) for ev in events or [] if is_red_card(ev)]
+    return teams.count("home"), teams.count("away")
+
+
+def remaining_lambdas(
+    base: np.ndarray, remaining: np.ndarray, reds: np.ndarray, momentum: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """(N, 2) expected goals still to come for (N, 2) pre-match rates.
+
+    `remaining` is the (N,) share of full-match goals left to play; the
+    rates are adjusted for the (N, 2) red card counts of each side and, if
+    given, the (N,) home-positive momentum index.
+    """
+
+    own = RED_CARD_OWN ** reds
+    opponent = RED_CARD_OPPONENT ** reds[:, ::-1]
+    rates = base * remaining[:, None] * own * opponent
+    if momentum is not None:
+        rates[:, 0] = adjust_lambda(rates[:, 0], momentum, MOMENTUM_WEIGHT)
+        rates[:, 1] = adjust_lambda(rates[:, 1], -momentum, MOMENTUM_WEIGHT)
+    return rates
+
+
+def inplay_matrices(remaining: np.ndarray, goals: np.ndarray, rho: float = 0.0) -> np.ndarray:
+    """(N, G', G') final-score matrices: remaining goals shifted by the (N, 2) score."""
+
+    n = len(remaining)
+    rest = build_score_matrices(np.maximum(remaining, MIN_REMAINING), rho, MAX_GOALS)
+    size = MAX_GOALS + 1
+    goals = np.asarray(goals, dtype=np.int64)
+    grid = size + int(goals.max(initial=0))
+    final = np.zeros((n, grid, grid))
+    steps = np.arange(size)
+    final[
+        np.arange(n)[:, None, None],
+        goals[:, 0, None, None] + steps[None, :, None],
+        goals[:, 1, None, None] + steps[None, None, :],
+    ] = rest
+    return final
+
+
+def inplay_probabilities(
+    base: np.ndarray,
+    remaining: np.ndarray,
+    goals: np.ndarray,
+    reds: np.ndarray,
+    rho: float = 0.0,
+    momentum: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Remaining rates (N, 2) and {outcome: (N,)} probabilities for all fixtures."""
+
+    remaining = remaining_lambdas(base, remaining, reds, momentum)
+    keys, win, _ = price_matrices(inplay_matrices(remaining, goals, rho))
+    column = {key: i for i, key in enumerate(keys)}
+    return remaining, {name: win[:, column[key]] for name, key in PUBLISHED.items()}
+
+
+class InPlayEngine:
+    """Per-fixture state arrays for the live fixtures and the batched update."""
+
+    def __init__(
+        self,
+        rho: float = INPLAY_RHO,
+        tables: DecayTables = decay_tables,
+        momentum: MomentumTracker = momentum_tracker,
+    ) -> None:
+        self.rho = rho
+        self.tables = tables
+        self.momentum = momentum
+        self.ids: List[str] = []
+        self.profile = np.zeros(0, dtype=np.int64)  # decay table row per fixture
+        self.clock_minute = np.zeros((0, 2))  # (minute, added) as on the feed
+        self.played = np.zeros(0)
+        self.clock = np.zeros(0)  # monotonic time the timer last moved
+        self.goals = np.zeros((0, 2), dtype=np.int64)
+        self.reds = np.zeros((0, 2), dtype=np.int64)
+        self.base = np.zeros((0, 2))
+        self._lambdas: Dict[str, Tuple[float, float]] = {}
+        self.latest: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def missing_lambdas(self, fixtures: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [f for f in fixtures if f.get("status") == "live" and str(f.get("id")) not in self._lambdas]
+
+    def set_lambdas(self, lambdas: Dict[str, Tuple[float, float]]) -> None:
+        self._lambdas.update(lambdas)
+
+    def sync(self, fixtures: Iterable[Dict[str, Any]], events: Dict[str, List[Dict[str, Any]]]) -> bool:
+        """Rebuild the state arrays from a live_state snapshot; True if anything moved."""
+
+        known = dict(zip(self.ids, map(tuple, self.clock_minute)))
+        live, clocks = [], []
+        for f in fixtures or []:
+            if f.get("status") != "live":
+                continue
+            clock = parse_clock(f.get("timer"))
+            if clock is None:
+                # no minute on the feed (half-time, gaps): keep the last known
+                # clock; a fixture never seen with one waits until it has one
+                clock = known.get(str(f.get("id")))
+                if clock is None:
+                    continue
+            live.append(f)
+            clocks.append(clock)
+        ids = [str(f.get("id")) for f in live]
+        profile = self.tables.index(f.get("leagueId") for f in live)
+        clock_minute = np.array(clocks, dtype=np.float64).reshape(-1, 2)
+        played = self.tables.played(profile, clock_minute[:, 0], clock_minute[:, 1])
+        goals = np.array(
+            [[(f.get("score") or {}).get("home") or 0, (f.get("score") or {}).get("away") or 0] for f in live],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        reds = np.array(
+            [red_cards(events.get(i, []), f.get("homeTeam") or "", f.get("awayTeam") or "") for i, f in zip(ids, live)],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        base = np.array([self._lambdas.get(i, DEFAULT_LAMBDAS) for i in ids]).reshape(-1, 2)
+
+        if ids == self.ids:
+            moved = played != self.played
+            changed = bool(
+                moved.any()
+                or (goals != self.goals).any()
+                or (reds != self.reds).any()
+                or (base != self.base).any()
+            )
+            self.clock = np.where(moved, time.monotonic(), self.clock)
+        else:
+            old = dict(zip(self.ids, self.clock))
+            now = time.monotonic()
+            self.clock = np.array([old.get(i, now) for i in ids])
+            changed = True
+
+        self.ids, self.profile, self.clock_minute, self.played = ids, profile, clock_minute, played
+        self.goals, self.reds, self.base = goals, reds, base
+        self.latest = {i: self.latest[i] for i in ids if i in self.latest}
+        return changed
+
+    def step(self) -> List[Dict[str, Any]]:
+        """Re-price every live fixture in one vectorized update."""
+
+        if not self.ids:
+            return []
+        # the feed reports whole minutes; run the clock on for at most one
+        since = np.clip((time.monotonic() - self.clock) / 60.0, 0.0, 1.0)
+        share = self.tables.remaining_fraction(self.profile, self.played + since)
+        momentum = self.momentum.values(self.ids, self.clock_minute.sum(axis=1) + since)
+        remaining, probs = inplay_probabilities(self.base, share, self.goals, self.reds, self.rho, momentum)
+
+        rows = []
+        for n, fixture_id in enumerate(self.ids):
+            row = {
+                "fixtureId": fixture_id,
+                "minute": round(float(self.clock_minute[n].sum() + since[n]), 2),
+                "remainingShare": float(share[n]),
+                "score": {"home": int(self.goals[n, 0]), "away": int(self.goals[n, 1])},
+                "redCards": {"home": int(self.reds[n, 0]), "away": int(self.reds[n, 1])},
+                "momentum": float(momentum[n]),
+                "lambdas": {"home": float(remaining[n, 0]), "away": float(remaining[n, 1])},
+                "probabilities": {name: float(p[n]) for name, p in probs.items()},
+            }
+            self.latest[fixture_id] = row
+            rows.append(row)
+        return rows
+
+
+inplay_engine = InPlayEngine()
+
+
+def _resolve_lambdas(fixtures: List[Dict[str, Any]]) -> Dict[str, Tuple[float, float]]:
+    """Pre-match expected goals from team stats (defaults when unknown)."""
+
+    from ..db import SessionLocal
+    from ..stats_context import build_poisson_contexts
+
+    with SessionLocal() as db:
+        contexts = build_poisson_contexts(
+            db, [(f.get("leagueId") or "", f.get("homeTeam") or "", f.get("awayTeam") or "") for f in fixtures]
+        )
+    return {str(f.get("id")): lambdas_from_context(ctx) or DEFAULT_LAMBDAS for f, ctx in zip(fixtures, contexts)}
+
+
+async def _publish(engine: InPlayEngine) -> None:
+    started = time.perf_counter()
+    rows = engine.step()
+    if rows:
+        await live_state.broadcast(
+            {
+                "type": "inplay",
+                "prices": rows,
+                "computeMs": round((time.perf_counter() - started) * 1000, 3),
+            }
+        )
+
+
+async def _apply(engine: InPlayEngine, snapshot: Dict[str, Any]) -> None:
+    fixtures, events = snapshot.get("fixtures") or [], snapshot.get("events") or {}
+    missing = engine.missing_lambdas(fixtures)
+    if missing:
+        try:
+            engine.set_lambdas(await asyncio.to_thread(_resolve_lambdas, missing))
+        except Exception as e:
+            print("[inplay] Pre-match rates unavailable:", e)
+            engine.set_lambdas({str(f.get("id")): DEFAULT_LAMBDAS for f in missing})
+    moved = engine.momentum.consume(fixtures, events)
+    if engine.sync(fixtures, events) or moved:
+        await _publish(engine)
+
+
+async def inplay_loop(engine: InPlayEngine = inplay_engine) -> None:
+    """Re-price live fixtures on every live_state update and on a clock tick."""
+
+    if not INPLAY_ENGINE_ENABLED:
+        print("[inplay] Disabled via INPLAY_ENGINE env")
+        return
+
+    print("[inplay] Engine started")
+    queue = await live_state.subscribe()
+    try:
+        await _apply(engine, live_state.snapshot())
+        while True:
+            try:
+                payload: Optional[Dict[str, Any]] = await asyncio.wait_for(queue.get(), timeout=INPLAY_TICK_SEC)
+            except asyncio.TimeoutError:
+                payload = None
+            # coalesce bursts: every state payload carries the full snapshot
+            while not queue.empty():
+                newer = queue.get_nowait()
+                if "fixtures" in newer:
+                    payload = newer
+
+            try:
+                if payload is None:
+                    await _publish(engine)  # no feed update, only the clock moved
+                elif "fixtures" in payload:
+                    await _apply(engine, payload)
+            except Exception as e:
+                print("[inplay] ERROR:", e)
+    finally:
+        await live_state.unsubscribe(queue)
+
+
+def start_inplay_background(loop: asyncio.AbstractEventLoop):
+    if not INPLAY_ENGINE_ENABLED:
+        return
+    loop.create_task(inplay_loop())
@@ -1,9 +1,26 @@
 """Momentum index for in-play λ adjustment."""
 from __future__ import annotations
 
-from typing import Iterable
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
 import numpy as np
 
+from .time_decay import parse_clock
+
+MOMENTUM_HALF_LIFE = float(os.getenv("MOMENTUM_HALF_LIFE_MIN", "8"))
+# pressure that maps to an index of tanh(1) ~ 0.76
+MOMENTUM_SCALE = float(os.getenv("MOMENTUM_SCALE", "2.5"))
+MOMENTUM_SERIES_POINTS = int(os.getenv("MOMENTUM_SERIES_POINTS", "240"))
+
+# pressure credited to the team named in the event, by event type. The
+# streamer relays API-Football's fixture events, which only carry goals,
+# cards, substitutions and VAR decisions (shots and corners are match
+# statistics, not events), so only goals and cards move the index.
+EVENT_WEIGHTS = {"goal": 2.0, "card": -0.2}
+RED_CARD_WEIGHT = -1.0
+
 
 def momentum_index(events: Iterable[str]) -> float:
     """Compute a simple momentum indicator based on recent events.
@@ -25,7 +42,153 @@ def momentum_index(events: Iterable[str]) -> float:
     return float(np.clip(score / 5.0, -1.0, 1.0))
 
 
-def adjust_lambda(base_lambda: float, momentum: float) -> float:
-    return base_lambda * (1 + 0.3 * momentum)
+def adjust_lambda(base_lambda, momentum, weight: float = 0.3):
+    """Scale a rate by momentum; works on floats and numpy arrays alike."""
+
+    return base_lambda * (1 + weight * momentum)
+
+
+# ---------------------------------------------------------------------------
+# streaming momentum over live_state events
+# ---------------------------------------------------------------------------
+def event_team(event: Dict[str, Any], home_team: str, away_team: str) -> Optional[str]:
+    """"home" / "away" for the team an event belongs to, None if unknown."""
+
+    team = event.get("team")
+    if team in ("home", "away"):
+        return team
+    # streamer descriptions read "<team name>: <detail>"
+    name = (event.get("description") or "").split(":", 1)[0].strip().lower()
+    if home_team and name == home_team.lower():
+        return "home"
+    if away_team and name == away_team.lower():
+        return "away"
+    return None
+
+
+def event_detail(event: Dict[str, Any]) -> str:
+    """Lower-cased detail of an event ("<team name>: <detail>" -> "<detail>")."""
+
+    return (event.get("description") or "").split(":", 1)[-1].strip().lower()
+
+
+def is_red_card(event: Dict[str, Any]) -> bool:
+    # only the detail: team names like "Red Bull Salzburg" must not match
+    detail = event_detail(event)
+    return event.get("type") == "card" and ("red card" in detail or "second yellow" in detail)
+
+
+def event_weight(event: Dict[str, Any]) -> float:
+    if is_red_card(event):
+        return RED_CARD_WEIGHT
+    if event.get("type") == "goal" and "missed" in event_detail(event):
+        return 0.0  # "Missed Penalty" is reported as a goal event
+    return EVENT_WEIGHTS.get(event.get("type") or "", 0.0)
+
+
+class _FixtureMomentum:
+    """Exponentially time-weighted pressure (home positive) as of `minute`."""
+
+    __slots__ = ("pressure", "minute", "seen", "series")
+
+    def __init__(self, points: int) -> None:
+        self.pressure = 0.0
+        self.minute = 0.0
+        self.seen = 0  # events already consumed from the fixture's list
+        self.series: Deque[Tuple[float, float]] = deque(maxlen=points)
+
+
+class MomentumTracker:
+    """Per-fixture momentum updated in O(1) per event.
+
+    The window is an exponential one: pressure decays with half-life
+    `half_life` match minutes, so moving the clock or adding an event (even
+    one that arrives late) is a single multiply-add and no event list is
+    ever rescanned. The index is `tanh(pressure / scale)` in (-1, 1).
+    """
+
+    def __init__(
+        self,
+        half_life: float = MOMENTUM_HALF_LIFE,
+        scale: float = MOMENTUM_SCALE,
+        points: int = MOMENTUM_SERIES_POINTS,
+    ) -> None:
+        self.half_life = half_life
+        self.scale = scale
+        self.points = points
+        self._fixtures: Dict[str, _FixtureMomentum] = {}
+
+    def _decay(self, minutes):
+        return 0.5 ** (np.maximum(minutes, 0.0) / self.half_life)
+
+    def _index(self, pressure):
+        return np.tanh(np.asarray(pressure) / self.scale)
+
+    def _record(self, state: _FixtureMomentum) -> None:
+        point = (state.minute, float(self._index(state.pressure)))
+        if state.series and state.series[-1][0] == state.minute:
+            state.series[-1] = point
+        else:
+            state.series.append(point)
+
+    def consume(self, fixtures: Iterable[Dict[str, Any]], events: Dict[str, List[Dict[str, Any]]]) -> bool:
+        """Fold new events and clock moves of a live_state snapshot; True if any index moved."""
+
+        changed = False
+        present = set()
+        for fixture in fixtures or []:
+            fixture_id = str(fixture.get("id"))
+            present.add(fixture_id)
+            fixture_events = events.get(fixture_id) or []
+            state = self._fixtures.get(fixture_id)
+            if state is None or len(fixture_events) < state.seen:
+                # new fixture, or the feed replaced the list with a shorter one
+                state = self._fixtures[fixture_id] = _FixtureMomentum(self.points)
+
+            home, away = fixture.get("homeTeam") or "", fixture.get("awayTeam") or ""
+            for event in fixture_events[state.seen:]:
+                weight = event_weight(event)
+                team = event_team(event, home, away)
+                if not weight or team is None:
+                    continue
+                minute = float(event.get("minute") or 0)
+                if minute > state.minute:
+                    state.pressure *= float(self._decay(minute - state.minute))
+                    state.minute = minute
+                else:
+                    weight *= float(self._decay(state.minute - minute))  # late arrival
+                state.pressure += weight if team == "home" else -weight
+                self._record(state)
+                changed = True
+            state.seen = len(fixture_events)
+
+            clock = parse_clock(fixture.get("timer"))
+            if fixture.get("status") == "live" and clock is not None:
+                minute = sum(clock)
+                if minute > state.minute:
+                    state.pressure *= float(self._decay(minute - state.minute))
+                    state.minute = minute
+                    self._record(state)
+                    changed = changed or state.pressure != 0.0
+
+        for fixture_id in list(self._fixtures):
+            if fixture_id not in present:
+                del self._fixtures[fixture_id]
+        return changed
+
+    def values(self, fixture_ids: List[str], minutes: np.ndarray) -> np.ndarray:
+        """Momentum index per fixture at the given match minutes (0 when unknown)."""
+
+        states = [self._fixtures.get(i) for i in fixture_ids]
+        pressure = np.array([s.pressure if s else 0.0 for s in states])
+        since = np.asarray(minutes, dtype=np.float64) - np.array([s.minute if s else 0.0 for s in states])
+        return self._index(pressure * self._decay(since))
+
+    def series(self, fixture_id: str) -> Optional[List[Dict[str, float]]]:
+        state = self._fixtures.get(str(fixture_id))
+        if state is None:
+            return None
+        return [{"minute": minute, "value": value} for minute, value in state.series]
 
 
+momentum_tracker = MomentumTracker()
@@ -1,7 +1,14 @@
 """Time decay functions for in-play updates."""
 from __future__ import annotations
 
+import json
 import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
 
 
 def exponential_decay(elapsed_minutes: float, half_life: float = 30.0) -> float:
@@ -15,3 +22,141 @@ def linear_decay(elapsed_minutes: float, total_minutes: float = 90.0) -> float:
     return remaining / total_minutes
 
 
+# ---------------------------------------------------------------------------
+# minute-by-minute goal intensity profiles
+# ---------------------------------------------------------------------------
+# Goals are not spread evenly over a match: the scoring rate climbs through
+# each half and stoppage time is played on top of the 90 minutes. A profile
+# gives the relative intensity of every played minute; its cumulative sum,
+# precomputed once, turns "where is the match" into "what share of the
+# full-match expected goals is still to come" with a table lookup.
+
+HALF_MINUTES = 45
+PROFILES_PATH = os.getenv("INPLAY_PROFILES", "")
+
+_CLOCK = re.compile(r"(\d+)(?:\+(\d+))?")
+
+
+def parse_clock(timer: Any) -> Optional[Tuple[float, float]]:
+    """(clock minute, added minutes) from a fixture timer ("67'", "90+3'").
+
+    None when the timer carries no minute (missing, "HT"): that is not kick-off.
+    """
+
+    match = _CLOCK.search(str(timer or ""))
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2) or 0)
+
+
+@dataclass(frozen=True)
+class IntensityProfile:
+    """Relative goal intensity per played minute for one league.
+
+    `late_ratio` is the intensity at 90' relative to kick-off (linear in
+    between) unless `minute_weights` gives all 90 regular minutes; stoppage
+    minutes take the intensity of the end of their half.
+    """
+
+    first_stoppage: float = 2.0
+    second_stoppage: float = 5.0
+    late_ratio: float = 1.35
+    minute_weights: Optional[Tuple[float, ...]] = None
+
+    def regular_intensity(self) -> np.ndarray:
+        if self.minute_weights is not None:
+            weights = np.asarray(self.minute_weights, dtype=np.float64)
+            if weights.shape != (2 * HALF_MINUTES,):
+                raise ValueError("minute_weights must cover 90 minutes")
+            return weights
+        return np.linspace(1.0, self.late_ratio, 2 * HALF_MINUTES)
+
+    def played_intensity(self) -> np.ndarray:
+        """Intensity per played minute: first half, its stoppage, second half, its stoppage."""
+
+        regular = self.regular_intensity()
+        parts = []
+        halves = (
+            (regular[:HALF_MINUTES], self.first_stoppage),
+            (regular[HALF_MINUTES:], self.second_stoppage),
+        )
+        for half, stoppage in halves:
+            whole = int(stoppage)
+            extra = np.full(whole + (1 if stoppage > whole else 0), half[-1])
+            if stoppage > whole:
+                extra[-1] *= stoppage - whole  # partial last minute
+            parts += [half, extra]
+        return np.concatenate(parts)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IntensityProfile":
+        stoppage = data.get("stoppage") or (cls.first_stoppage, cls.second_stoppage)
+        weights = data.get("minuteWeights")
+        return cls(
+            first_stoppage=float(stoppage[0]),
+            second_stoppage=float(stoppage[1]),
+            late_ratio=float(data.get("lateRatio", cls.late_ratio)),
+            minute_weights=tuple(weights) if weights else None,
+        )
+
+
+class DecayTables:
+    """Precomputed remaining-goal shares for a set of league profiles.
+
+    Row p of `remaining` is the share of full-match expected goals left
+    after each whole played minute under profile p; rows are padded with 0
+    past full time so every fixture is looked up in one gather.
+    """
+
+    def __init__(self, profiles: Dict[str, IntensityProfile], default: IntensityProfile = IntensityProfile()):
+        self.keys = ["default", *[k for k in profiles if k != "default"]]
+        self.profiles = [profiles.get("default", default), *[profiles[k] for k in self.keys[1:]]]
+        self._index = {k: i for i, k in enumerate(self.keys)}
+
+        intensity = [p.played_intensity() for p in self.profiles]
+        length = max(len(x) for x in intensity) + 1
+        self.remaining = np.zeros((len(intensity), length))
+        for i, x in enumerate(intensity):
+            cum = np.concatenate([[0.0], np.cumsum(x)])
+            self.remaining[i, : len(cum)] = 1.0 - cum / cum[-1]
+        self.first_stoppage = np.array([p.first_stoppage for p in self.profiles])
+
+    def index(self, league_ids: Iterable) -> np.ndarray:
+        """Profile row per league id (the default row for unknown leagues)."""
+
+        return np.array([self._index.get(str(lg), 0) for lg in league_ids], dtype=np.int64)
+
+    def played(self, rows: np.ndarray, minute: np.ndarray, added: np.ndarray) -> np.ndarray:
+        """Played minutes for a feed clock: `minute` regular time plus `added` stoppage.
+
+        Second-half clock minutes come after the first-half stoppage of the
+        fixture's profile.
+        """
+
+        minute = np.asarray(minute, dtype=np.float64)
+        second_half = minute > HALF_MINUTES
+        return minute + np.asarray(added, dtype=np.float64) + np.where(second_half, self.first_stoppage[rows], 0.0)
+
+    def remaining_fraction(self, rows: np.ndarray, played: np.ndarray) -> np.ndarray:
+        """Share of expected goals still to come after `played` minutes (linear within a minute)."""
+
+        played = np.clip(np.asarray(played, dtype=np.float64), 0.0, self.remaining.shape[1] - 1)
+        lo = np.minimum(played.astype(np.int64), self.remaining.shape[1] - 2)
+        frac = played - lo
+        return (1.0 - frac) * self.remaining[rows, lo] + frac * self.remaining[rows, lo + 1]
+
+
+def load_decay_tables(path: str = PROFILES_PATH) -> DecayTables:
+    """Tables from a JSON file of {league_id | "default": {"stoppage", "lateRatio", "minuteWeights"}}."""
+
+    if path:
+        try:
+            with open(path) as fh:
+                profiles = {str(k): IntensityProfile.from_dict(v) for k, v in json.load(fh).items()}
+            return DecayTables(profiles)
+        except (OSError, ValueError, TypeError) as exc:
+            print(f"[time_decay] Ignoring intensity profiles {path}: {exc}")
+    return DecayTables({})
+
+
+decay_tables = load_decay_tables()
@@ -106,9 +106,12 @@ def _collect_market_lines(
     return lines
 
 
-@router.get("", dependencies=[Depends(require_user)])
-async def list_live_odds():
-    """Return simplified live odds rows + alternative markets."""
+async def refresh_live_odds() -> Dict:
+    """Fetch live odds upstream and push them into the shared live state.
+
+    Used by the `/live-odds` endpoint and by the live streamer so that the
+    alert engine can react to price changes without polling upstream itself.
+    """
 
     markets: Dict[str, List[Dict]] = {}
     rows: List[Dict] = []
@@ -132,6 +135,7 @@ async def list_live_odds():
                     if {"home", "draw", "away"} <= set(prices):
                         rows.append(
                             {
+                                "fixtureId": fixture_id,
                                 "market": match_label,
                                 "home": prices["home"],
                                 "draw": prices["draw"],
@@ -150,3 +154,10 @@ async def list_live_odds():
         await live_state.set_markets(markets)
 
     return {"outrights": rows, "markets": markets}
+
+
+@router.get("", dependencies=[Depends(require_user)])
+async def list_live_odds():
+    """Return simplified live odds rows + alternative markets."""
+
+    return await refresh_live_odds()
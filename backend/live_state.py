@@ -8,6 +8,7 @@ without requiring a real cache or database.
 from __future__ import annotations
 
 import asyncio
+import os
 from copy import deepcopy
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
@@ -41,6 +42,17 @@ class LiveState:
         self.market_lines: Dict[str, List[Dict[str, Any]]] = {}
         self._subscribers: List[asyncio.Queue] = []
         self._lock = asyncio.Lock()
+        # bumped on every change (and once more when it has been persisted);
+        # HTTP endpoints serve it as their ETag, see http_cache.py
+        self.version = 0
+        self.epoch = os.urandom(4).hex()
+
+    def touch(self) -> None:
+        self.version += 1
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.epoch}-{self.version}"'
 
     def snapshot(self) -> Dict[str, Any]:
         return {
@@ -74,21 +86,25 @@ class LiveState:
 
     async def set_fixtures(self, fixtures: List[Dict[str, Any]]) -> None:
         self.fixtures = deepcopy(fixtures)
+        self.touch()
         await self.broadcast({"type": "fixtures", **self.snapshot()})
         await self._persist_snapshot("fixtures_update")
 
     async def set_odds(self, odds: List[Dict[str, Any]]) -> None:
         self.odds = deepcopy(odds)
+        self.touch()
         await self.broadcast({"type": "odds", **self.snapshot()})
         await self._persist_snapshot("odds_update")
 
     async def set_markets(self, markets: Dict[str, List[Dict[str, Any]]]) -> None:
         self.market_lines = deepcopy(markets)
+        self.touch()
         await self.broadcast({"type": "markets", **self.snapshot()})
         await self._persist_snapshot("markets_update")
 
     async def set_events(self, events: Dict[str, List[Dict[str, Any]]]) -> None:
         self.events = deepcopy(events)
+        self.touch()
         await self.broadcast({"type": "events", **self.snapshot()})
         await self._persist_snapshot("events_update")
 
@@ -96,6 +112,7 @@ class LiveState:
         if fixture_id not in self.events:
             self.events[fixture_id] = []
         self.events[fixture_id].append(event)
+        self.touch()
         await self.broadcast(
             {"type": "event", "fixtureId": fixture_id, "event": deepcopy(event), **self.snapshot()}
         )
@@ -110,6 +127,7 @@ class LiveState:
             f["status"] = "live"
             f["timer"] = "1'"
             f["score"] = {"home": 0, "away": 0}
+            self.touch()
             await self.add_event(
                 f.get("id", "demo"),
                 {"minute": 1, "description": "Kick-off", "type": "info"},
@@ -127,6 +145,7 @@ class LiveState:
                 except ValueError:
                     current_minute = 1
             new_minute = current_minute + 1
+            self.touch()
             if new_minute >= 90:
                 f["status"] = "finished"
                 f["timer"] = None
@@ -140,6 +159,8 @@ class LiveState:
             from .snapshot_service import capture_snapshot
 
             await capture_snapshot(reason=reason)
+            # endpoints that read the persisted snapshot change only now
+            self.touch()
         except Exception as exc:  # pragma: no cover - best effort
             print(f"[live_state] persist failed: {exc}")
 
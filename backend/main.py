@@ -8,7 +8,7 @@ import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import Base, engine
+from .db import SessionLocal, async_engine, ensure_schema
 from . import models  # noqa: F401  # ensure models are imported
 from .alert_engine import start_alert_engine_background
 from .alerts_api import router as alerts_router
@@ -17,14 +17,22 @@ from .device_api import router as device_router
 from .favorites_api import router as favorites_router
 from .fixtures_api import router as fixtures_router
 from .google_auth import router as auth_router
+from .live.inplay_engine import start_inplay_background
 from .health_api import router as health_router
+from .http_cache import add_compression
+from .inplay_api import router as inplay_router
 from .live_odds_api import router as live_odds_router
 from .live_ws import router as live_ws_router
 from .markets_api import router as markets_router
 from .ml_api import router as ml_router
+from .ml_trainer import shutdown_training
+from .model_registry import start_model_registry_background
 from .predictions_api import router as predictions_router
+from .replay_api import router as replay_router
+from .retention import ensure_partitions, start_retention_background
 from .snapshot_service import backfill_demo_if_empty, start_snapshot_scheduler
 from .stats_api import router as stats_router
+from .stats_context import team_stats_cache
 from .streamer import start_streamer_background
 from .value_bets_api import router as value_bets_router
 
@@ -43,25 +51,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Snapshot-Version"],
 )
 
+# gzip / brotli for large responses (snapshot lists, histories)
+add_compression(app)
+
 
 # -------------------------------------------------------------------
 # Startup
 # -------------------------------------------------------------------
 @app.on_event("startup")
 async def startup_event() -> None:
-    # Create all DB tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    # Create missing tables, and indexes added to existing ones since
+    ensure_schema()
+
+    # Snapshot partitions (Postgres only) must exist before the first insert
+    await ensure_partitions()
 
     # Ensure demo seeds are persisted for offline use
-    backfill_demo_if_empty()
+    await backfill_demo_if_empty()
+
+    # Warm the TeamStats cache used by coupon pricing and the alert engine
+    with SessionLocal() as db:
+        team_stats_cache.load_season(db)
 
-    # Start background workers (alerts + live streamer)
+    # Start background workers (alerts, live streamer, in-play engine,
+    # snapshots, retention, model registry)
     loop = asyncio.get_event_loop()
     start_alert_engine_background(loop)
     start_streamer_background(loop)
+    start_inplay_background(loop)
     start_snapshot_scheduler(loop)
+    start_retention_background(loop)
+    start_model_registry_background(loop)
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    shutdown_training()
+    await async_engine.dispose()
 
 
 # -------------------------------------------------------------------
@@ -71,7 +100,9 @@ app.include_router(auth_router)
 app.include_router(fixtures_router)
 app.include_router(live_odds_router)
 app.include_router(live_ws_router)
+app.include_router(replay_router)
 app.include_router(predictions_router)
+app.include_router(inplay_router)
 app.include_router(value_bets_router)
 app.include_router(ml_router)
 app.include_router(health_router)
@@ -0,0 +1,84 @@
+"""Precompiled feature encoder for the odds-based ML models.
+
+Built once from a model's `feature_columns` (and saved in the model bundle at
+training time), it maps each implied-probability column and each league to a
+fixed column index, so encoding a fixture is a handful of array writes into a
+preallocated float32 buffer instead of building and aligning a DataFrame.
+The layout matches `feature_store.design_matrix`.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .feature_store import IMPLIED_COLUMNS, LEAGUE_PREFIX, OTHER_LEAGUE, implied_probabilities
+
+
+class FeatureEncoder:
+    def __init__(self, feature_columns: Sequence[str]):
+        self.feature_columns: List[str] = list(feature_columns)
+        index = {col: i for i, col in enumerate(self.feature_columns)}
+
+        # (implied position, column) pairs for implied features the model uses
+        self.implied_slots = [
+            (j, index[col]) for j, col in enumerate(IMPLIED_COLUMNS) if col in index
+        ]
+        self.league_index: Dict[str, int] = {
+            col[len(LEAGUE_PREFIX):]: i
+            for i, col in enumerate(self.feature_columns)
+            if col.startswith(LEAGUE_PREFIX)
+        }
+        self.other_index: int = self.league_index.get(OTHER_LEAGUE, -1)
+        self._local = threading.local()
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_columns)
+
+    def league_column(self, league: Optional[str]) -> int:
+        return self.league_index.get(league or "Unknown", self.other_index)
+
+    def _row_buffer(self) -> np.ndarray:
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros((1, self.n_features), dtype=np.float32)
+        return row
+
+    def encode_row(self, league: Optional[str], odds: Sequence[Optional[float]]) -> np.ndarray:
+        """Encode one fixture into this thread's (1, n_features) buffer.
+
+        The buffer is reused by the next call on the same thread; copy it if
+        it has to outlive that.
+        """
+
+        row = self._row_buffer()
+        row.fill(0.0)
+        out = row[0]
+        for j, col in self.implied_slots:
+            o = odds[j]
+            out[col] = 1.0 / o if o is not None and o > 0 else math.nan
+        league_col = self.league_column(league)
+        if league_col >= 0:
+            out[league_col] = 1.0
+        return row
+
+    def encode(self, leagues: Sequence[Optional[str]], odds) -> np.ndarray:
+        """Encode N fixtures into a new (N, n_features) float32 matrix."""
+
+        implied = implied_probabilities(odds)
+        X = np.zeros((len(implied), self.n_features), dtype=np.float32)
+        for j, col in self.implied_slots:
+            X[:, col] = implied[:, j]
+        cols = np.fromiter((self.league_column(lg) for lg in leagues), dtype=np.int64, count=len(X))
+        hit = cols >= 0
+        X[np.nonzero(hit)[0], cols[hit]] = 1.0
+        return X
+
+    def __getstate__(self):
+        return {"feature_columns": self.feature_columns}
+
+    def __setstate__(self, state):
+        self.__init__(state["feature_columns"])
@@ -0,0 +1,338 @@
+"""Versioned, memory-mapped feature store for the odds-based ML models.
+
+Features are computed once per HistoricalMatch (keyed by its id) and kept as
+append-only raw column files under `ML_FEATURE_STORE_DIR/<version>/`:
+
+  ids.bin      int64    match ids, in append order
+  implied.bin  float32  (rows, len(ODDS_COLUMNS)) implied probabilities
+  league.bin   int32    league codes into the vocabulary in meta.json
+
+Columns are opened with `np.memmap`, so training reads them without copying
+and lookups by id only touch the rows they need. Appends take an exclusive
+lock on `.lock` in the store directory, so training / evaluation workers in
+other processes can `sync()` the same store. The same helpers build the
+design matrix for training, evaluation and live inference, so the three
+agree on column names and league encoding.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Engine
+
+from .historical_loader import ODDS_COLUMNS, completed_match_ids, load_historical_matches
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within the process
+    fcntl = None
+
+FEATURE_SET_VERSION = "v1"
+IMPLIED_COLUMNS = [f"imp_{col}" for col in ODDS_COLUMNS]
+LEAGUE_PREFIX = "lg_"
+OTHER_LEAGUE = "Other"
+TOP_LEAGUES = 10
+
+ML_FEATURE_STORE_DIR = Path(
+    os.getenv("ML_FEATURE_STORE_DIR", Path(__file__).resolve().parent.parent / "ml_features")
+)
+
+# column file -> (dtype, values per row)
+_COLUMNS: Dict[str, Tuple[str, int]] = {
+    "ids": ("int64", 1),
+    "implied": ("float32", len(ODDS_COLUMNS)),
+    "league": ("int32", 1),
+}
+
+
+def implied_probabilities(odds) -> np.ndarray:
+    """1/odds element-wise; missing or non-positive odds become NaN."""
+
+    odds = np.asarray(odds, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied = np.where(odds > 0, 1.0 / odds, np.nan)
+    return implied.astype(np.float32)
+
+
+def _default_columns(codes: np.ndarray, vocab: Sequence[str], top_n: int) -> List[str]:
+    """Implied columns + dummies for the top-N leagues of these rows (+ Other)."""
+
+    counts = np.bincount(codes, minlength=len(vocab))
+    order = np.argsort(-counts, kind="stable")[:top_n]
+    top = [vocab[i] for i in order if counts[i] > 0]
+    buckets = set(top)
+    if counts.sum() > counts[order].sum():
+        buckets.add(OTHER_LEAGUE)
+    return IMPLIED_COLUMNS + [f"{LEAGUE_PREFIX}{name}" for name in sorted(buckets)]
+
+
+def _design_from_codes(
+    implied: np.ndarray,
+    codes: np.ndarray,
+    vocab: Sequence[str],
+    feature_columns: Optional[Sequence[str]],
+    top_n: int,
+) -> Tuple[np.ndarray, List[str]]:
+    if feature_columns is None:
+        feature_columns = _default_columns(codes, vocab, top_n)
+    feature_columns = list(feature_columns)
+    index = {col: i for i, col in enumerate(feature_columns)}
+
+    X = np.zeros((len(codes), len(feature_columns)), dtype=np.float32)
+    for j, col in enumerate(IMPLIED_COLUMNS):
+        if col in index:
+            X[:, index[col]] = implied[:, j]
+
+    # a league without its own dummy falls into "Other" when the model has one
+    other = index.get(f"{LEAGUE_PREFIX}{OTHER_LEAGUE}", -1)
+    target = np.array(
+        [index.get(f"{LEAGUE_PREFIX}{name}", other) for name in vocab] or [-1],
+        dtype=np.int64,
+    )
+    rows_target = target[codes] if len(codes) else np.empty(0, dtype=np.int64)
+    hit = rows_target >= 0
+    X[np.nonzero(hit)[0], rows_target[hit]] = 1.0
+    return X, feature_columns
+
+
+def design_matrix(
+    implied: np.ndarray,
+    leagues: Sequence[str],
+    feature_columns: Optional[Sequence[str]] = None,
+    top_n: int = TOP_LEAGUES,
+) -> Tuple[np.ndarray, List[str]]:
+    """Feature matrix aligned to `feature_columns` (or the default layout)."""
+
+    vocab, codes = np.unique(np.asarray(leagues, dtype=object).astype(str), return_inverse=True)
+    return _design_from_codes(
+        np.asarray(implied, dtype=np.float32), codes, list(vocab), feature_columns, top_n
+    )
+
+
+class FeatureStore:
+    """Append-only columnar store of per-match features for one feature-set version."""
+
+    def __init__(self, root: Path = ML_FEATURE_STORE_DIR, version: str = FEATURE_SET_VERSION):
+        self.version = version
+        self.path = Path(root) / version
+        self._lock = threading.Lock()
+        self._maps: Dict[str, np.ndarray] = {}
+        self._meta = self._read_meta()
+
+    # ---------------------------------------------------------------
+    # metadata / columns
+    # ---------------------------------------------------------------
+    def _read_meta(self) -> Dict:
+        meta_file = self.path / "meta.json"
+        if meta_file.exists():
+            meta = json.loads(meta_file.read_text())
+            if meta.get("odds_columns") != list(ODDS_COLUMNS):
+                raise RuntimeError(
+                    f"Feature store {self.path} was built for different odds columns; "
+                    "bump FEATURE_SET_VERSION instead of reusing it."
+                )
+            return meta
+        return {
+            "version": self.version,
+            "rows": 0,
+            "max_id": None,
+            "leagues": [],
+            "odds_columns": list(ODDS_COLUMNS),
+        }
+
+    def _refresh(self) -> None:
+        """Pick up rows appended by other processes."""
+
+        meta = self._read_meta()
+        if meta["rows"] != self._meta["rows"]:
+            self._meta = meta
+            self._maps.clear()
+
+    @contextmanager
+    def _file_lock(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / ".lock", "a") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _write_meta(self) -> None:
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(self._meta, indent=2))
+        os.replace(tmp, self.path / "meta.json")
+
+    @property
+    def rows(self) -> int:
+        return self._meta["rows"]
+
+    @property
+    def leagues(self) -> List[str]:
+        return self._meta["leagues"]
+
+    def _column(self, name: str) -> np.ndarray:
+        arr = self._maps.get(name)
+        if arr is None:
+            dtype, width = _COLUMNS[name]
+            shape = (self.rows, width) if width > 1 else (self.rows,)
+            if self.rows == 0:
+                arr = np.empty(shape, dtype=dtype)
+            else:
+                arr = np.memmap(self.path / f"{name}.bin", dtype=dtype, mode="r", shape=shape)
+            self._maps[name] = arr
+        return arr
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._column("ids")
+
+    @property
+    def implied(self) -> np.ndarray:
+        return self._column("implied")
+
+    @property
+    def league_codes(self) -> np.ndarray:
+        return self._column("league")
+
+    def _sorted_ids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(argsort of ids, ids in ascending order), cached until the next append."""
+
+        order = self._maps.get("_order")
+        if order is None:
+            order = self._maps["_order"] = np.argsort(self.ids, kind="stable")
+            self._maps["_sorted"] = np.asarray(self.ids)[order]
+        return order, self._maps["_sorted"]
+
+    # ---------------------------------------------------------------
+    # writes
+    # ---------------------------------------------------------------
+    def append(self, ids, odds, leagues: Sequence[str]) -> int:
+        """Append matches not stored yet; returns rows added."""
+
+        ids = np.asarray(ids, dtype=np.int64)
+        odds = np.asarray(odds, dtype=np.float64).reshape(len(ids), len(ODDS_COLUMNS))
+        leagues = np.asarray(leagues, dtype=object)
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            order = np.argsort(ids, kind="stable")
+            ids, odds, leagues = ids[order], odds[order], leagues[order]
+            keep = np.ones(len(ids), dtype=bool)
+            keep[1:] = ids[1:] != ids[:-1]
+            if self.rows:
+                keep &= ~np.isin(ids, self._sorted_ids()[1])
+            ids, odds, leagues = ids[keep], odds[keep], leagues[keep]
+            if len(ids) == 0:
+                return 0
+
+            vocab = self._meta["leagues"]
+            lookup = {name: i for i, name in enumerate(vocab)}
+            codes = np.empty(len(ids), dtype=np.int32)
+            for i, name in enumerate(leagues):
+                name = str(name)
+                code = lookup.get(name)
+                if code is None:
+                    code = lookup[name] = len(vocab)
+                    vocab.append(name)
+                codes[i] = code
+
+            columns = {"ids": ids, "implied": implied_probabilities(odds), "league": codes}
+            self.path.mkdir(parents=True, exist_ok=True)
+            for name, values in columns.items():
+                dtype, width = _COLUMNS[name]
+                path = self.path / f"{name}.bin"
+                committed = self.rows * width * np.dtype(dtype).itemsize
+                with open(path, "ab") as fh:
+                    # drop bytes from an append that never reached meta.json
+                    fh.truncate(committed)
+                    fh.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+            self._meta["rows"] += len(ids)
+            last = int(ids[-1])
+            self._meta["max_id"] = last if self._meta["max_id"] is None else max(self._meta["max_id"], last)
+            self._write_meta()
+            self._maps.clear()
+            return len(ids)
+
+    def append_frame(self, df: pd.DataFrame) -> int:
+        return self.append(df["id"].to_numpy(), df[list(ODDS_COLUMNS)].to_numpy(), df["league"])
+
+    def sync(self, bind: Optional[Engine] = None) -> int:
+        """Append completed HistoricalMatch rows that aren't stored yet.
+
+        This includes older rows whose score or odds were filled in after a
+        newer match was already stored.
+        """
+
+        self._refresh()
+        missing = completed_match_ids(bind)
+        if self.rows:
+            missing = np.setdiff1d(missing, self._sorted_ids()[1], assume_unique=True)
+        if len(missing) == 0:
+            return 0
+        df = load_historical_matches(after_id=int(missing[0]) - 1, use_cache=False, bind=bind)
+        df = df[df["id"].isin(missing)]
+        if df.empty:
+            return 0
+        return self.append_frame(df)
+
+    # ---------------------------------------------------------------
+    # reads
+    # ---------------------------------------------------------------
+    def positions(self, ids) -> np.ndarray:
+        """Row positions of `ids`; KeyError if any id isn't stored."""
+
+        ids = np.asarray(ids, dtype=np.int64).ravel()
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        if self.rows == 0:
+            raise KeyError(f"{len(ids)} match ids not in feature store, e.g. {ids[:5].tolist()}")
+        order, stored = self._sorted_ids()
+        pos = np.minimum(np.searchsorted(stored, ids), len(stored) - 1)
+        found = stored[pos] == ids
+        if not found.all():
+            missing = ids[~found]
+            raise KeyError(f"{len(missing)} match ids not in feature store, e.g. {missing[:5].tolist()}")
+        return order[pos]
+
+    def lookup(self, ids) -> Tuple[np.ndarray, List[str]]:
+        """Implied features and league names for the given match ids."""
+
+        pos = self.positions(ids)
+        vocab = self.leagues
+        return np.asarray(self.implied[pos]), [vocab[c] for c in self.league_codes[pos]]
+
+    def matrix(
+        self,
+        ids=None,
+        feature_columns: Optional[Sequence[str]] = None,
+        top_n: int = TOP_LEAGUES,
+    ) -> Tuple[np.ndarray, List[str]]:
+        """Design matrix for `ids` (all rows if None), see `design_matrix`."""
+
+        if ids is None:
+            implied, codes = self.implied, self.league_codes
+        else:
+            pos = self.positions(ids)
+            implied, codes = self.implied[pos], self.league_codes[pos]
+        return _design_from_codes(implied, codes, self.leagues, feature_columns, top_n)
+
+
+_store: Optional[FeatureStore] = None
+
+
+def get_feature_store() -> FeatureStore:
+    global _store
+    if _store is None:
+        _store = FeatureStore()
+    return _store
@@ -0,0 +1,203 @@
+"""Columnar loader for HistoricalMatch rows.
+
+Streams `(column...)` tuples from a server-side cursor in chunks straight
+into typed NumPy arrays, without materializing ORM objects or per-row dicts.
+Filters and the "complete odds + score" cleaning step are pushed down into
+the SQL query. Results can be cached as Parquet (when pyarrow or fastparquet
+is installed), keyed by a hash of the query and a cheap fingerprint of the table.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from ..db import engine as default_engine
+from ..models import HistoricalMatch
+
+ODDS_COLUMNS = (
+    "odds_1",
+    "odds_x",
+    "odds_2",
+    "odds_over25",
+    "odds_under25",
+    "odds_gg",
+    "odds_ng",
+)
+
+# column -> numpy dtype of the loaded array
+HISTORICAL_COLUMNS: Dict[str, str] = {
+    "id": "int64",
+    "league": "object",
+    "league_id": "float64",  # nullable
+    "home": "object",
+    "away": "object",
+    "goals_home": "int16",
+    "goals_away": "int16",
+    **{col: "float64" for col in ODDS_COLUMNS},
+    "kickoff": "datetime64[ns]",
+}
+
+REQUIRED_COLUMNS = ("goals_home", "goals_away") + ODDS_COLUMNS
+
+ML_CACHE_DIR = Path(
+    os.getenv("ML_CACHE_DIR", Path(__file__).resolve().parent.parent / "ml_cache")
+)
+LOADER_CHUNK_SIZE = int(os.getenv("ML_LOADER_CHUNK_SIZE", "50000"))
+
+
+def _parquet_available() -> bool:
+    for module in ("pyarrow", "fastparquet"):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def _complete():
+    return [getattr(HistoricalMatch, name).isnot(None) for name in REQUIRED_COLUMNS]
+
+
+def _build_query(
+    leagues: Optional[Sequence[str]],
+    league_ids: Optional[Sequence[int]],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    after_id: Optional[int] = None,
+):
+    columns = [getattr(HistoricalMatch, name) for name in HISTORICAL_COLUMNS]
+    q = select(*columns).where(*_complete())
+    if leagues:
+        q = q.where(HistoricalMatch.league.in_(list(leagues)))
+    if league_ids:
+        q = q.where(HistoricalMatch.league_id.in_(list(league_ids)))
+    if start is not None:
+        q = q.where(HistoricalMatch.kickoff >= start)
+    if end is not None:
+        q = q.where(HistoricalMatch.kickoff < end)
+    if after_id is not None:
+        q = q.where(HistoricalMatch.id > after_id)
+    return q.order_by(HistoricalMatch.kickoff, HistoricalMatch.id)
+
+
+def _cache_path(bind: Engine, query) -> Path:
+    """Cache key: compiled query + bound params + (row count, max id) of the table."""
+
+    compiled = query.compile(bind=bind)
+    with bind.connect() as conn:
+        count, max_id = conn.execute(
+            select(func.count(HistoricalMatch.id), func.max(HistoricalMatch.id))
+        ).one()
+    params = sorted(compiled.params.items(), key=str)
+    key = f"{bind.url.render_as_string(hide_password=True)}|{compiled}|{params}|{count}|{max_id}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return ML_CACHE_DIR / f"historical_{digest}.parquet"
+
+
+def _stream_columns(bind: Engine, query, chunk_size: int) -> Dict[str, np.ndarray]:
+    names = list(HISTORICAL_COLUMNS)
+    chunks: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            query
+        )
+        for part in result.partitions():
+            for name, values in zip(names, zip(*part)):
+                chunks[name].append(np.asarray(values, dtype=HISTORICAL_COLUMNS[name]))
+
+    return {
+        name: (
+            np.concatenate(parts)
+            if parts
+            else np.empty(0, dtype=HISTORICAL_COLUMNS[name])
+        )
+        for name, parts in chunks.items()
+    }
+
+
+def completed_match_ids(bind: Optional[Engine] = None) -> np.ndarray:
+    """Ascending ids of the rows `load_historical_matches` would return."""
+
+    bind = bind or default_engine
+    query = select(HistoricalMatch.id).where(*_complete()).order_by(HistoricalMatch.id)
+    with bind.connect() as conn:
+        return np.fromiter(conn.execute(query).scalars(), dtype=np.int64)
+
+
+def add_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """Derive the 1X2 / O2.5 / GG targets from the final score."""
+
+    gh = df["goals_home"].to_numpy()
+    ga = df["goals_away"].to_numpy()
+    df["result_1x2"] = np.where(gh > ga, 0, np.where(gh == ga, 1, 2))  # 0=1,1=X,2=2
+    df["total_goals"] = gh + ga
+    df["is_over25"] = (df["total_goals"] > 2.5).astype(int)
+    df["is_gg"] = ((gh >= 1) & (ga >= 1)).astype(int)
+    return df
+
+
+def load_historical_matches(
+    leagues: Optional[Sequence[str]] = None,
+    league_ids: Optional[Sequence[int]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    use_cache: bool = True,
+    chunk_size: int = LOADER_CHUNK_SIZE,
+    bind: Optional[Engine] = None,
+    after_id: Optional[int] = None,
+) -> pd.DataFrame:
+    """Load cleaned, labelled historical matches as a DataFrame.
+
+    Only rows with a final score and all closing odds are returned, ordered
+    by kickoff. `start`/`end` bound the kickoff as a half-open range and
+    `after_id` restricts to rows newer than an already-loaded id.
+    """
+
+    bind = bind or default_engine
+    query = _build_query(leagues, league_ids, start, end, after_id)
+
+    cache_file: Optional[Path] = None
+    if use_cache and _parquet_available():
+        cache_file = _cache_path(bind, query)
+        if cache_file.exists():
+            print(f"[GFPS-ML] Loading historical matches from cache {cache_file.name}")
+            return add_labels(pd.read_parquet(cache_file))
+
+    df = pd.DataFrame(_stream_columns(bind, query, chunk_size), copy=False)
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cache_file)
+
+    return add_labels(df)
+
+
+def add_loader_arguments(parser: argparse.ArgumentParser) -> None:
+    """CLI filters shared by the training and evaluation scripts."""
+
+    parser.add_argument("--league", action="append", dest="leagues", default=None)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+
+
+def loader_kwargs(args: argparse.Namespace) -> dict:
+    return {
+        "leagues": args.leagues,
+        "start": args.since,
+        "end": args.until,
+        "use_cache": not args.no_cache,
+    }
@@ -1,15 +1,21 @@
-import asyncio
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
 
+from .auth_dependency import require_admin
 from .db import SessionLocal
-from .models import ModelVersion
-from .ml_trainer import queue_training
+from .evaluation.reports import latest_reports
+from .models import ModelVersion, TrainingRun
+from .ml_trainer import TrainingQueueFull, cancel_training, new_version_name, queue_training
+from .model_registry import model_registry
 
 router = APIRouter(prefix="/ml", tags=["ml"])
 
+# upper bound on the regularization grid of one training request
+MAX_C_CANDIDATES = 20
+
 
 def _ensure_seed_model() -> None:
     with SessionLocal() as db:
@@ -24,17 +30,65 @@ def _ensure_seed_model() -> None:
             db.commit()
 
 
-@router.post("/train")
-async def train_model():
-    """Kick off a background training job and return its run id."""
+@router.post("/train", dependencies=[Depends(require_admin)])
+async def train_model(
+    c: Optional[List[float]] = Query(None, description="Regularization candidates"),
+    league: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Queue a training job in the process pool and return its run id."""
+
+    if c is not None and (len(c) > MAX_C_CANDIDATES or any(not 0 < x < float("inf") for x in c)):
+        raise HTTPException(422, f"c takes up to {MAX_C_CANDIDATES} positive values")
 
     _ensure_seed_model()
+    params = {
+        "Cs": c,
+        "loader": {"leagues": league, "start": since, "end": until},
+    }
+    for _ in range(3):
+        next_version = new_version_name()
+        try:
+            run_id = queue_training(next_version, params)
+            break
+        except IntegrityError:
+            continue  # version name taken (unique constraint); draw another
+        except TrainingQueueFull as exc:
+            raise HTTPException(429, str(exc))
+    else:
+        raise HTTPException(503, "Could not reserve a model version name")
+    return {"message": f"Training queued for {next_version}", "runId": run_id}
+
+
+def _run_payload(run: TrainingRun) -> dict:
+    return {
+        "runId": run.id,
+        "version": run.version,
+        "status": run.status,
+        "metrics": run.metrics or {},
+        "createdAt": run.created_at.isoformat() if run.created_at else None,
+        "completedAt": run.completed_at.isoformat() if run.completed_at else None,
+    }
+
+
+@router.get("/train/{run_id}")
+async def training_status(run_id: int) -> dict:
+    """Stage/progress while running, final metrics once completed."""
+
     with SessionLocal() as db:
-        latest = db.query(ModelVersion).order_by(ModelVersion.created_at.desc()).first()
-        next_version = f"v{latest.id + 1}" if latest else "v1"
+        run = db.get(TrainingRun, run_id)
+        if not run:
+            raise HTTPException(404, f"Training run {run_id} not found")
+        return _run_payload(run)
+
 
-    run_id = queue_training(asyncio.get_event_loop(), next_version)
-    return {"message": f"Training started for {next_version}", "runId": run_id}
+@router.post("/train/{run_id}/cancel", dependencies=[Depends(require_admin)])
+async def cancel_training_run(run_id: int) -> dict:
+    status = cancel_training(run_id)
+    if status is None:
+        raise HTTPException(404, f"Training run {run_id} not found")
+    return {"runId": run_id, "status": status}
 
 
 @router.get("/models")
@@ -42,6 +96,8 @@ async def list_models() -> List[dict]:
     """Return persisted model metadata for desktop diagnostics."""
 
     _ensure_seed_model()
+    serving = model_registry.stats()["activeVersion"]
+    reports = latest_reports()
     with SessionLocal() as db:
         models = db.query(ModelVersion).order_by(ModelVersion.created_at.desc()).all()
         return [
@@ -50,12 +106,22 @@ async def list_models() -> List[dict]:
                 "roi": (m.metrics or {}).get("roi", 0.0),
                 "logLoss": (m.metrics or {}).get("logLoss", 1.0),
                 "status": m.status,
+                "loaded": m.version == serving,
+                # cached evaluation (scripts/ml_eval.py --all-versions), if any
+                "report": reports.get(m.version),
             }
             for m in models
         ]
 
 
-@router.post("/activate/{version}")
+@router.get("/registry")
+async def registry_status() -> dict:
+    """Which model artifacts this worker is serving, with load time and size."""
+
+    return model_registry.stats()
+
+
+@router.post("/activate/{version}", dependencies=[Depends(require_admin)])
 async def activate_model(version: str):
     """Activate a model version and demote any previously active entries."""
 
@@ -64,6 +130,8 @@ async def activate_model(version: str):
         target = db.query(ModelVersion).filter(ModelVersion.version == version).first()
         if not target:
             raise HTTPException(404, f"Model {version} not found")
+        if target.status == "training":
+            raise HTTPException(409, f"Model {version} is still training")
 
         now = datetime.utcnow()
         target.status = "active"
@@ -76,4 +144,7 @@ async def activate_model(version: str):
 
         db.commit()
 
-    return {"message": f"Activated model {version}"}
+    # preload + warm in the background; requests keep using the current
+    # model until the new one is swapped in
+    model_registry.activate(version)
+    return {"message": f"Activated model {version}", "loading": True}
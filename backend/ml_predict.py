@@ -3,7 +3,7 @@ backend/ml_predict.py
 
 Helper για χρήση των ML μοντέλων του GFPS από το backend.
 
-Χρησιμοποιεί τα joblib αρχεία από backend/ml_models:
+Χρησιμοποιεί τα joblib αρχεία του ενεργού model version (backend/model_registry):
   - model_1x2.joblib
   - model_over25.joblib
   - model_gg.joblib
@@ -12,103 +12,80 @@ Helper για χρήση των ML μοντέλων του GFPS από το back
   - predict_1x2_proba(...)
   - predict_over25_proba(...)
   - predict_gg_proba(...)
+  - predict_batch(leagues, odds)  (όλα τα μοντέλα για N γραμμές μαζί)
 
 Κοινή λογική features με τα scripts ml_retrain/ml_eval.
 """
 
-from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
 import numpy as np
-import pandas as pd
-from joblib import load
 
-BASE_DIR = Path(__file__).resolve().parent
-MODELS_DIR = BASE_DIR / "ml_models"
+from .model_registry import LoadedModelSet, model_registry
 
-_model_cache: Dict[str, Dict] = {}
 
-
-def _load_model(name: str) -> Dict:
+def _load_model(name: str, models: Optional[LoadedModelSet] = None) -> Dict:
     """
-    Lazy-load model bundle από joblib.
+    Bundle του ενεργού model version από το model registry.
     Επιστρέφει:
-      {"model": sklearn_model, "feature_columns": [..]}
+      {"model": sklearn_model, "feature_columns": [..],
+       "encoder": FeatureEncoder, "predict": callable(X) -> probs}
     """
-    if name in _model_cache:
-        return _model_cache[name]
+    return (models or model_registry.current()).bundle(name)
 
-    path = MODELS_DIR / f"{name}.joblib"
-    if not path.exists():
-        raise FileNotFoundError(f"ML model file not found: {path}")
 
-    bundle = load(path)
-    _model_cache[name] = bundle
-    return bundle
+def _predict_row(name: str, league: str, odds: Sequence[float]) -> np.ndarray:
+    bundle = _load_model(name)
+    X = bundle["encoder"].encode_row(league, odds)
+    if not np.isfinite(X).all():
+        raise ValueError(f"Invalid odds for ML prediction: {list(odds)}")
+    return bundle["predict"](X)[0]
 
 
-def _build_feature_row(
-    league: str,
-    odds_1: float,
-    odds_x: float,
-    odds_2: float,
-    odds_over25: float,
-    odds_under25: float,
-    odds_gg: float,
-    odds_ng: float,
-    feature_columns: list,
-) -> pd.DataFrame:
+def _predict_matrix(
+    models: LoadedModelSet, name: str, leagues: Sequence[str], odds: np.ndarray
+) -> np.ndarray:
     """
-    Κατασκευάζει ένα single-row DataFrame με τα features που περιμένει το μοντέλο.
-    Χρησιμοποιεί implied probabilities + one-hot league bucket.
+    predict_proba ενός μοντέλου για N γραμμές, με ένα feature matrix (NumPy).
+    Γραμμές με άκυρες/ελλιπείς odds επιστρέφουν NaN αντί να ρίξουν όλο το batch.
     """
-    data = {
-        "odds_1": odds_1,
-        "odds_x": odds_x,
-        "odds_2": odds_2,
-        "odds_over25": odds_over25,
-        "odds_under25": odds_under25,
-        "odds_gg": odds_gg,
-        "odds_ng": odds_ng,
-        "league": league or "Unknown",
+    bundle = _load_model(name, models)
+    X = bundle["encoder"].encode(leagues, odds)
+    predict = bundle["predict"]
+
+    valid = np.isfinite(X).all(axis=1)
+    if valid.all():
+        return predict(X)
+
+    probs = np.full((len(X), len(bundle["model"].classes_)), np.nan)
+    if valid.any():
+        probs[valid] = predict(X[valid])
+    return probs
+
+
+def predict_batch(leagues: Sequence[str], odds) -> Dict[str, np.ndarray]:
+    """
+    Batch inference: leagues (N,) και odds (N, 7) με σειρά
+    odds_1, odds_x, odds_2, odds_over25, odds_under25, odds_gg, odds_ng.
+
+    Τρέχει κάθε μοντέλο μία φορά για όλες τις γραμμές και επιστρέφει arrays
+    μήκους N: p1, px, p2, over25, gg (NaN όπου οι odds είναι άκυρες).
+    """
+    odds = np.asarray(odds, dtype=np.float64)
+    # ίδιο model set για όλα τα μοντέλα, ακόμα κι αν γίνει swap στο μεταξύ
+    models = model_registry.current()
+
+    p_1x2 = _predict_matrix(models, "model_1x2", leagues, odds)
+    p_over = _predict_matrix(models, "model_over25", leagues, odds)
+    p_gg = _predict_matrix(models, "model_gg", leagues, odds)
+
+    return {
+        "p1": p_1x2[:, 0],
+        "px": p_1x2[:, 1],
+        "p2": p_1x2[:, 2],
+        "over25": p_over[:, 1],
+        "gg": p_gg[:, 1],
     }
-    df = pd.DataFrame([data])
-
-    # Implied probabilities (απλή μεταφορά από retrain logic)
-    for col in [
-        "odds_1",
-        "odds_x",
-        "odds_2",
-        "odds_over25",
-        "odds_under25",
-        "odds_gg",
-        "odds_ng",
-    ]:
-        df[f"imp_{col}"] = 1.0 / df[col].replace(0, np.nan)
-
-    # League bucket – εδώ απλό: αυτή η λίγκα είναι το δικό της bucket
-    # και όλα τα άλλα θα γίνουν zero όταν align-άρουμε τα columns.
-    df["league_bucket"] = df["league"]
-    league_dummies = pd.get_dummies(df["league_bucket"], prefix="lg")
-
-    feature_cols_base = [
-        "imp_odds_1",
-        "imp_odds_x",
-        "imp_odds_2",
-        "imp_odds_over25",
-        "imp_odds_under25",
-        "imp_odds_gg",
-        "imp_odds_ng",
-    ]
-    X = pd.concat([df[feature_cols_base], league_dummies], axis=1)
-
-    # align columns με αυτά που έχει το μοντέλο
-    for col in feature_columns:
-        if col not in X.columns:
-            X[col] = 0.0
-    X = X[feature_columns]
-
-    return X
 
 
 def predict_1x2_proba(
@@ -124,22 +101,11 @@ def predict_1x2_proba(
     """
     Επιστρέφει probabilities (p1, px, p2) με βάση το ML 1X2 model.
     """
-    bundle = _load_model("model_1x2")
-    model = bundle["model"]
-    feature_columns = bundle["feature_columns"]
-
-    X = _build_feature_row(
+    probs = _predict_row(
+        "model_1x2",
         league,
-        odds_1,
-        odds_x,
-        odds_2,
-        odds_over25,
-        odds_under25,
-        odds_gg,
-        odds_ng,
-        feature_columns,
+        (odds_1, odds_x, odds_2, odds_over25, odds_under25, odds_gg, odds_ng),
     )
-    probs = model.predict_proba(X)[0]
     # order: class 0=1, 1=X, 2=2
     return float(probs[0]), float(probs[1]), float(probs[2])
 
@@ -157,22 +123,11 @@ def predict_over25_proba(
     """
     Επιστρέφει probability P(Over 2.5 goals).
     """
-    bundle = _load_model("model_over25")
-    model = bundle["model"]
-    feature_columns = bundle["feature_columns"]
-
-    X = _build_feature_row(
+    probs = _predict_row(
+        "model_over25",
         league,
-        odds_1,
-        odds_x,
-        odds_2,
-        odds_over25,
-        odds_under25,
-        odds_gg,
-        odds_ng,
-        feature_columns,
+        (odds_1, odds_x, odds_2, odds_over25, odds_under25, odds_gg, odds_ng),
     )
-    probs = model.predict_proba(X)[0]
     # binary: probs[1] = P(Over)
     return float(probs[1])
 
@@ -190,21 +145,10 @@ def predict_gg_proba(
     """
     Επιστρέφει probability P(GG - Both Teams To Score).
     """
-    bundle = _load_model("model_gg")
-    model = bundle["model"]
-    feature_columns = bundle["feature_columns"]
-
-    X = _build_feature_row(
+    probs = _predict_row(
+        "model_gg",
         league,
-        odds_1,
-        odds_x,
-        odds_2,
-        odds_over25,
-        odds_under25,
-        odds_gg,
-        odds_ng,
-        feature_columns,
+        (odds_1, odds_x, odds_2, odds_over25, odds_under25, odds_gg, odds_ng),
     )
-    probs = model.predict_proba(X)[0]
     # binary: probs[1] = P(GG)
     return float(probs[1])
@@ -1,48 +1,200 @@
-"""Toy training scheduler that persists model versions and metrics."""
+"""Training job runner: executes the ml_retrain pipeline in a process pool.
+
+Jobs run in separate (spawned) processes so fitting never blocks the API
+event loop or holds its GIL. Each job reports its stage and progress into
+`TrainingRun.metrics`, and checks between stages whether the run was asked
+to cancel; cancelled or failed jobs leave no artifacts behind.
+"""
 
 from __future__ import annotations
 
-import asyncio
-import random
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from typing import Dict, Optional
 
 from .db import SessionLocal
 from .models import ModelVersion, TrainingRun
 
+ML_TRAIN_WORKERS = int(os.getenv("ML_TRAIN_WORKERS", "1"))
+# joblib workers per job for hyperparameter candidates (-1 = all cores)
+ML_TRAIN_JOBS = int(os.getenv("ML_TRAIN_JOBS", "-1"))
+# queued + running jobs allowed at once; further requests are rejected
+ML_TRAIN_MAX_PENDING = int(os.getenv("ML_TRAIN_MAX_PENDING", "2"))
+
+PENDING_STATUSES = ("queued", "running", "cancelling")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_futures: Dict[int, Future] = {}
+_queue_lock = threading.Lock()
+
+
+class TrainingQueueFull(RuntimeError):
+    """Raised by `queue_training` when ML_TRAIN_MAX_PENDING jobs are pending."""
+
+
+def new_version_name() -> str:
+    """Unique model version name, e.g. v20260101-120000-3f2a9c."""
+
+    return f"v{datetime.utcnow():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
 
-async def _simulate_training(run_id: int, version: str) -> None:
-    await asyncio.sleep(1)  # placeholder for real training workload
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: children must not inherit the API's sockets, threads or DB pool
+            _executor = ProcessPoolExecutor(
+                max_workers=ML_TRAIN_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
 
-    metrics = {
-        "logLoss": round(random.uniform(0.45, 0.65), 3),
-        "roi": round(random.uniform(0.02, 0.08), 3),
-        "samples": random.randint(5000, 10000),
-    }
+
+def _update_run(run_id: int, **fields) -> Optional[str]:
+    """Apply `fields` to the run and return its (possibly updated) status."""
 
+    with SessionLocal() as db:
+        run = db.get(TrainingRun, run_id)
+        if run is None:
+            return None
+        for key, value in fields.items():
+            setattr(run, key, value)
+        db.commit()
+        return run.status
+
+
+def _finish(run_id: int, version: str, status: str, metrics: Dict) -> None:
     with SessionLocal() as db:
         run = db.get(TrainingRun, run_id)
         if run:
-            run.status = "completed"
+            run.status = status
             run.metrics = metrics
             run.completed_at = datetime.utcnow()
-            db.add(run)
 
         model = db.query(ModelVersion).filter(ModelVersion.version == version).first()
-        if not model:
-            model = ModelVersion(version=version, status="ready", metrics=metrics)
-        else:
-            model.metrics = metrics
-            model.status = "ready"
-        db.add(model)
+        if model and model.status == "training":
+            if status == "completed":
+                model.status = "ready"
+                model.metrics = metrics
+            else:
+                # free the version name for the next run
+                db.delete(model)
         db.commit()
 
 
-def queue_training(loop: asyncio.AbstractEventLoop, version: str) -> int:
+def _run_training_job(run_id: int, version: str, params: Dict) -> Dict:
+    """Child-process entry point."""
+
+    from scripts.ml_retrain import TrainingCancelled, run_pipeline
+
+    def progress(stage: str, fraction: float) -> None:
+        status = _update_run(
+            run_id, metrics={"stage": stage, "progress": round(fraction, 3)}
+        )
+        if status == "cancelling":
+            raise TrainingCancelled(stage)
+
     with SessionLocal() as db:
-        run = TrainingRun(version=version, status="running")
+        run = db.get(TrainingRun, run_id)
+        cancelled = run is not None and run.status == "cancelling"
+        if run is not None and not cancelled:
+            run.status = "running"
+        db.commit()
+    if cancelled:
+        _finish(run_id, version, "cancelled", {"stage": "queued"})
+        return {"status": "cancelled"}
+
+    try:
+        metrics = run_pipeline(
+            version=version,
+            Cs=params.get("Cs"),
+            n_jobs=params.get("n_jobs", ML_TRAIN_JOBS),
+            progress=progress,
+            **params.get("loader", {}),
+        )
+    except TrainingCancelled as exc:
+        print(f"[ml_trainer] run {run_id} ({version}) cancelled during {exc}")
+        _finish(run_id, version, "cancelled", {"stage": str(exc)})
+        return {"status": "cancelled"}
+    except Exception as exc:
+        print(f"[ml_trainer] run {run_id} ({version}) failed: {exc}")
+        _finish(run_id, version, "failed", {"error": str(exc)})
+        return {"status": "failed"}
+
+    metrics.update(stage="done", progress=1.0)
+    _finish(run_id, version, "completed", metrics)
+    print(f"[ml_trainer] run {run_id} ({version}) completed")
+    return {"status": "completed"}
+
+
+def _on_done(run_id: int, version: str, future: Future) -> None:
+    global _executor
+    _futures.pop(run_id, None)
+    if future.cancelled():
+        _finish(run_id, version, "cancelled", {"stage": "queued"})
+        return
+    exc = future.exception()
+    if exc is not None:
+        # the worker died (e.g. OOM-killed) before it could record anything
+        print(f"[ml_trainer] run {run_id} ({version}) crashed: {exc}")
+        _finish(run_id, version, "failed", {"error": repr(exc)})
+        if isinstance(exc, BrokenProcessPool):
+            # a broken pool rejects all further jobs; start a fresh one next time
+            with _executor_lock:
+                _executor = None
+
+
+def queue_training(version: str, params: Optional[Dict] = None) -> int:
+    """Reserve `version`, record a queued run and submit it to the pool."""
+
+    params = params or {}
+    with _queue_lock, SessionLocal() as db:
+        pending = (
+            db.query(TrainingRun).filter(TrainingRun.status.in_(PENDING_STATUSES)).count()
+        )
+        if pending >= ML_TRAIN_MAX_PENDING:
+            raise TrainingQueueFull(f"{pending} training runs already pending")
+        run = TrainingRun(version=version, status="queued")
         db.add(run)
+        db.add(ModelVersion(version=version, status="training"))
         db.commit()
         db.refresh(run)
+        run_id = run.id
+
+    try:
+        future = _get_executor().submit(_run_training_job, run_id, version, params)
+    except Exception as exc:
+        _finish(run_id, version, "failed", {"error": repr(exc)})
+        raise
+    _futures[run_id] = future
+    future.add_done_callback(lambda f: _on_done(run_id, version, f))
+    return run_id
+
+
+def cancel_training(run_id: int) -> Optional[str]:
+    """Cancel a queued run outright, or ask a running one to stop."""
+
+    future = _futures.get(run_id)
+    if future is not None and future.cancel():
+        return "cancelled"
+
+    with SessionLocal() as db:
+        run = db.get(TrainingRun, run_id)
+        if run is None:
+            return None
+        if run.status in ("queued", "running"):
+            run.status = "cancelling"
+            db.commit()
+        return run.status
+
 
-    loop.create_task(_simulate_training(run.id, version))
-    return run.id
+def shutdown_training() -> None:
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,298 @@
+"""
+Registry of loaded ML model artifacts, tied to `ModelVersion` rows.
+
+A model version's artifacts are the model_1x2 / model_over25 / model_gg
+joblib bundles in `ML_MODELS_DIR/<ModelVersion.version>/`, falling back to
+the flat legacy `ML_MODELS_DIR/` layout for versions without a directory.
+Bundles are loaded with `joblib.load(mmap_mode=...)` so the numpy arrays
+inside are mapped from the page cache and shared between worker processes.
+
+Activating a version loads and warms the new set on a background thread and
+then swaps a single reference, so in-flight predictions finish on the set
+they started with and no request sees a half-loaded model. A version whose
+artifacts fail to load is retried with exponential backoff and given up
+after ML_REGISTRY_MAX_FAILURES attempts, until it is activated again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from joblib import load
+
+from .db import SessionLocal
+from .ml.feature_encoder import FeatureEncoder
+from .models import ModelVersion
+
+BASE_DIR = Path(__file__).resolve().parent
+MODELS_DIR = Path(os.getenv("ML_MODELS_DIR") or BASE_DIR / "ml_models")
+MODEL_NAMES = ("model_1x2", "model_over25", "model_gg")
+
+# "" disables memory mapping (e.g. for compressed bundles)
+ML_MMAP_MODE = os.getenv("ML_MMAP_MODE", "r") or None
+ML_REGISTRY_POLL_SEC = int(os.getenv("ML_REGISTRY_POLL_SEC", "30"))
+ML_REGISTRY_MAX_FAILURES = int(os.getenv("ML_REGISTRY_MAX_FAILURES", "5"))
+
+# models are fitted on DataFrames but served plain ndarrays
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+@dataclass
+class LoadedModelSet:
+    version: str
+    path: Path
+    bundles: Dict[str, Dict]
+    load_seconds: float
+    size_bytes: int
+    loaded_at: datetime = field(default_factory=datetime.utcnow)
+
+    def bundle(self, name: str) -> Dict:
+        try:
+            return self.bundles[name]
+        except KeyError:
+            raise FileNotFoundError(f"ML model {name} missing from version {self.version}")
+
+
+def compile_predictor(model, n_features: int) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    For linear models (LogisticRegression), predict_proba as
+    softmax/sigmoid(X @ coef.T + intercept), without sklearn's per-call
+    validation overhead. Checked once against model.predict_proba and falls
+    back to it on any mismatch.
+    """
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    if coef is None or intercept is None:
+        return model.predict_proba
+
+    W = np.ascontiguousarray(np.asarray(coef, dtype=np.float64).T)
+    b = np.asarray(intercept, dtype=np.float64)
+
+    if W.shape[1] == 1:
+        w, b0 = W[:, 0], float(b[0])
+
+        def predict(X: np.ndarray) -> np.ndarray:
+            p = 1.0 / (1.0 + np.exp(-(X @ w + b0)))
+            return np.column_stack([1.0 - p, p])
+
+    else:
+
+        def predict(X: np.ndarray) -> np.ndarray:
+            z = X @ W + b
+            z -= z.max(axis=1, keepdims=True)
+            e = np.exp(z)
+            return e / e.sum(axis=1, keepdims=True)
+
+    probe = np.random.default_rng(0).random((8, n_features)).astype(np.float32)
+    try:
+        if np.allclose(predict(probe), model.predict_proba(probe), atol=1e-6):
+            return predict
+    except Exception:
+        pass
+    return model.predict_proba
+
+
+_legacy_fallbacks: set = set()
+
+
+def artifact_dir(version: Optional[str]) -> Path:
+    if version and (MODELS_DIR / version).is_dir():
+        return MODELS_DIR / version
+    if version and version != "legacy" and version not in _legacy_fallbacks:
+        _legacy_fallbacks.add(version)
+        print(f"[model_registry] no artifacts dir for {version} in {MODELS_DIR}; using the legacy layout")
+    return MODELS_DIR
+
+
+def load_model_set(version: str, path: Path) -> LoadedModelSet:
+    """Load, prepare and warm all bundles of a version (blocking)."""
+
+    start = time.perf_counter()
+    bundles: Dict[str, Dict] = {}
+    encoders: Dict[Tuple[str, ...], FeatureEncoder] = {}
+    size = 0
+
+    for name in MODEL_NAMES:
+        file = path / f"{name}.joblib"
+        if not file.exists():
+            continue
+        bundle = load(file, mmap_mode=ML_MMAP_MODE)
+        size += file.stat().st_size
+
+        # one encoder per column set, shared by 1X2 / O2.5 / GG;
+        # older bundles without "encoder" get one from feature_columns
+        encoder = bundle.get("encoder") or FeatureEncoder(bundle["feature_columns"])
+        encoder = encoders.setdefault(tuple(encoder.feature_columns), encoder)
+        bundle["encoder"] = encoder
+        bundle["predict"] = compile_predictor(bundle["model"], encoder.n_features)
+
+        # warm-up: first call pays for lazy imports / page faults, not a request
+        bundle["predict"](encoder.encode(["Unknown"], np.full((1, 7), 2.0)))
+        bundles[name] = bundle
+
+    if not bundles:
+        raise FileNotFoundError(f"No ML model files found in {path}")
+
+    return LoadedModelSet(
+        version=version,
+        path=path,
+        bundles=bundles,
+        load_seconds=time.perf_counter() - start,
+        size_bytes=size,
+    )
+
+
+class ModelRegistry:
+    def __init__(self) -> None:
+        self._active: Optional[LoadedModelSet] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+        self._pending: Optional[Tuple[str, Future]] = None
+        self.swaps = 0
+        self.last_error: Optional[str] = None
+        # version -> (consecutive load failures, monotonic time of next retry)
+        self._failures: Dict[str, Tuple[int, float]] = {}
+
+    def _backing_off(self, version: str) -> bool:
+        count, retry_at = self._failures.get(version, (0, 0.0))
+        return count >= ML_REGISTRY_MAX_FAILURES or time.monotonic() < retry_at
+
+    def _failed(self, version: str, path: Path, exc: Exception) -> None:
+        count = self._failures.get(version, (0, 0.0))[0] + 1
+        self._failures[version] = (count, time.monotonic() + ML_REGISTRY_POLL_SEC * 2 ** (count - 1))
+        self.last_error = f"{version}: {exc}"
+        print(f"[model_registry] failed to load {version} from {path} (attempt {count}): {exc}")
+        if count >= ML_REGISTRY_MAX_FAILURES:
+            print(f"[model_registry] giving up on {version} until it is activated again")
+
+    # ---------------------------------------------------------------
+    # serving
+    # ---------------------------------------------------------------
+    def current(self) -> LoadedModelSet:
+        """The active model set; loads the DB-active version on first use."""
+
+        active = self._active
+        if active is not None:
+            return active
+        with self._lock:
+            if self._active is None:
+                version = self._db_active_version()
+                if self._backing_off(version):
+                    raise FileNotFoundError(f"ML model {version} unavailable ({self.last_error})")
+                path = artifact_dir(version)
+                try:
+                    self._active = load_model_set(version, path)
+                except Exception as exc:
+                    self._failed(version, path, exc)
+                    raise
+                self._failures.pop(version, None)
+            return self._active
+
+    @staticmethod
+    def _db_active_version() -> str:
+        try:
+            with SessionLocal() as db:
+                version = (
+                    db.query(ModelVersion.version)
+                    .filter(ModelVersion.status == "active")
+                    .order_by(ModelVersion.activated_at.desc())
+                    .limit(1)
+                    .scalar()
+                )
+        except Exception:  # no DB / table (e.g. offline scripts): legacy layout
+            version = None
+        return version or "legacy"
+
+    # ---------------------------------------------------------------
+    # activation
+    # ---------------------------------------------------------------
+    def _load_and_swap(self, version: str, path: Path) -> LoadedModelSet:
+        try:
+            loaded = load_model_set(version, path)
+        except Exception as exc:
+            self._failed(version, path, exc)
+            raise
+        with self._lock:
+            self._active = loaded
+            self.swaps += 1
+            self.last_error = None
+            self._failures.pop(version, None)
+        print(
+            f"[model_registry] active model {version} "
+            f"({loaded.size_bytes / 1e6:.1f} MB, loaded in {loaded.load_seconds:.2f}s)"
+        )
+        return loaded
+
+    def activate(self, version: str) -> Future:
+        """Preload `version` in the background and swap it in when warm.
+
+        An explicit activation retries a version the registry gave up on.
+        """
+
+        self._failures.pop(version, None)
+        return self._submit(version)
+
+    def _submit(self, version: str) -> Future:
+        with self._lock:
+            if self._pending and self._pending[0] == version and not self._pending[1].done():
+                return self._pending[1]
+            future = self._executor.submit(self._load_and_swap, version, artifact_dir(version))
+            self._pending = (version, future)
+            return future
+
+    def sync_with_db(self) -> Optional[Future]:
+        """Activate the DB-active version if this process serves another one."""
+
+        version = self._db_active_version()
+        active = self._active
+        if active is not None and (active.version == version or version == "legacy"):
+            return None
+        if self._backing_off(version):
+            return None
+        return self._submit(version)
+
+    def stats(self) -> Dict:
+        active = self._active
+        pending = self._pending
+        return {
+            "activeVersion": active.version if active else None,
+            "artifactPath": str(active.path) if active else None,
+            "models": sorted(active.bundles) if active else [],
+            "loadSeconds": round(active.load_seconds, 4) if active else None,
+            "sizeBytes": active.size_bytes if active else 0,
+            "loadedAt": active.loaded_at.isoformat() if active else None,
+            "mmapMode": ML_MMAP_MODE,
+            "loading": pending[0] if pending and not pending[1].done() else None,
+            "swaps": self.swaps,
+            "lastError": self.last_error,
+            "failures": {v: count for v, (count, _) in self._failures.items()},
+        }
+
+
+model_registry = ModelRegistry()
+
+
+async def registry_watch_loop() -> None:
+    """Pick up activations made through other worker processes."""
+
+    while True:
+        await asyncio.sleep(ML_REGISTRY_POLL_SEC)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, model_registry.sync_with_db)
+        except Exception as exc:  # pragma: no cover - observability only
+            print(f"[model_registry] sync failed: {exc}")
+
+
+def start_model_registry_background(loop: asyncio.AbstractEventLoop) -> None:
+    model_registry.sync_with_db()
+    loop.create_task(registry_watch_loop())
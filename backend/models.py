@@ -7,6 +7,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     JSON,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -107,7 +108,7 @@ class Coupon(Base):
     __tablename__ = "coupons"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
 
     name: Mapped[str] = mapped_column(String(255), default="")
     status: Mapped[str] = mapped_column(String(32), default="draft")  # draft / open / won / lost / canceled
@@ -126,7 +127,7 @@ class CouponSelection(Base):
     __tablename__ = "coupon_selections"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    coupon_id: Mapped[int] = mapped_column(ForeignKey("coupons.id"))
+    coupon_id: Mapped[int] = mapped_column(ForeignKey("coupons.id"), index=True)
 
     fixture_id: Mapped[str] = mapped_column(String(64))
     league: Mapped[str] = mapped_column(String(128), default="")
@@ -171,6 +172,9 @@ class FavoriteTeam(Base):
 
 class TeamStats(Base):
     __tablename__ = "team_stats"
+    __table_args__ = (
+        Index("ix_team_stats_league_team_season", "league_id", "team_name", "season"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     league_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -194,7 +198,9 @@ class LiveSnapshotRecord(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     reason: Mapped[str] = mapped_column(String(64), default="manual")
     payload: Mapped[dict] = mapped_column(JSON)
-    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime, server_default=func.now(), index=True
+    )
 
     predictions: Mapped[list["PredictionSnapshotRecord"]] = relationship(back_populates="snapshot")
     value_bets: Mapped[list["ValueBetSnapshotRecord"]] = relationship(back_populates="snapshot")
@@ -204,7 +210,7 @@ class PredictionSnapshotRecord(Base):
     __tablename__ = "prediction_snapshots"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    snapshot_id: Mapped[int] = mapped_column(ForeignKey("live_snapshots.id"))
+    snapshot_id: Mapped[int] = mapped_column(ForeignKey("live_snapshots.id"), index=True)
     model_version: Mapped[str] = mapped_column(String(64), default="demo")
     payload: Mapped[list[dict]] = mapped_column(JSON)
     created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
@@ -216,7 +222,7 @@ class ValueBetSnapshotRecord(Base):
     __tablename__ = "value_bet_snapshots"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    snapshot_id: Mapped[int] = mapped_column(ForeignKey("live_snapshots.id"))
+    snapshot_id: Mapped[int] = mapped_column(ForeignKey("live_snapshots.id"), index=True)
     model_version: Mapped[str] = mapped_column(String(64), default="demo")
     payload: Mapped[list[dict]] = mapped_column(JSON)
     created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
@@ -245,3 +251,64 @@ class TrainingRun(Base):
     metrics: Mapped[Optional[dict]] = mapped_column(JSON, default=None)
     created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
     completed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime, default=None)
+
+
+class HistoricalMatch(Base):
+    """Finished match with closing odds, used to train and evaluate ML models."""
+
+    __tablename__ = "historical_matches"
+    __table_args__ = (
+        Index("ix_historical_matches_league_kickoff", "league", "kickoff"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    league: Mapped[str] = mapped_column(String(128))
+    league_id: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    home: Mapped[str] = mapped_column(String(128))
+    away: Mapped[str] = mapped_column(String(128))
+    goals_home: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    goals_away: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    odds_1: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    odds_x: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    odds_2: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    odds_over25: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    odds_under25: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    odds_gg: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    odds_ng: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    kickoff: Mapped[DateTime] = mapped_column(DateTime, index=True)
+
+
+class MetricsReport(Base):
+    """Cached evaluation of a model version on one dataset (see evaluation.reports)."""
+
+    __tablename__ = "metrics_reports"
+    __table_args__ = (
+        Index("ix_metrics_reports_version_dataset", "model_version", "dataset_hash", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    model_version: Mapped[str] = mapped_column(String(64))
+    dataset_hash: Mapped[str] = mapped_column(String(32))
+    samples: Mapped[int] = mapped_column(Integer, default=0)
+    metrics: Mapped[dict] = mapped_column(JSON, default=dict)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), index=True)
+
+
+class ProbabilityPoint(Base):
+    """One fixture's 1X2 probabilities at one snapshot, for probability-path charts.
+
+    Written by `snapshot_service.capture_snapshot` only when a fixture's
+    probabilities move, so a flat stretch costs one row.
+    """
+
+    __tablename__ = "probability_points"
+    __table_args__ = (
+        Index("ix_probability_points_fixture_ts", "fixture_id", "ts"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    fixture_id: Mapped[str] = mapped_column(String(64))
+    ts: Mapped[DateTime] = mapped_column(DateTime, index=True)
+    home: Mapped[float] = mapped_column(Float)
+    draw: Mapped[float] = mapped_column(Float)
+    away: Mapped[float] = mapped_column(Float)
@@ -0,0 +1,2 @@
+from .markets import market_book, predict_market, price_fixtures  # noqa
+from .snapshot import compute_value_bets, generate_predictions, implied_probabilities  # noqa
@@ -36,6 +36,20 @@ def score_probabilities_dc(params: PoissonParams, rho: float = 0.0, max_goals: i
     return PoissonPrediction(score_matrix=matrix, one_x_two=one_x_two)
 
 
+def apply_dixon_coles(matrices: np.ndarray, lambdas: np.ndarray, rho: float) -> np.ndarray:
+    """Batched DC adjustment of (N, G, G) matrices for (N, 2) rates, renormalized."""
+
+    matrices = np.array(matrices, dtype=np.float64)
+    if rho == 0.0:
+        return matrices / matrices.sum(axis=(-2, -1), keepdims=True)
+    lh, la = lambdas[:, 0], lambdas[:, 1]
+    matrices[:, 0, 0] *= 1 - lh * la * rho
+    matrices[:, 0, 1] *= 1 + lh * rho
+    matrices[:, 1, 0] *= 1 + la * rho
+    matrices[:, 1, 1] *= 1 - rho
+    return matrices / matrices.sum(axis=(-2, -1), keepdims=True)
+
+
 def log_likelihood_dc(home_goals: int, away_goals: int, params: PoissonParams, rho: float) -> float:
     """Log-likelihood of a single outcome under the Dixon-Coles model."""
 
@@ -0,0 +1,179 @@
+"""Cache of score matrices and their market books keyed by quantized rates.
+
+Many fixtures share nearly the same (lambda_home, lambda_away, rho), so
+matrices are keyed on the rates rounded to `step` (0.01 by default, which
+moves market probabilities by well under half a percentage point) and kept
+in a bounded LRU. With the dense grid enabled, a miss inside the grid is
+served by bilinear interpolation between the four surrounding precomputed
+matrices instead of being recomputed; the mix of four distributions is
+still a distribution, so derived markets stay consistent.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .dixon_coles import apply_dixon_coles
+from .poisson import poisson_pmf_table
+
+MATRIX_CACHE_SIZE = int(os.getenv("MATRIX_CACHE_SIZE", "4096"))
+MATRIX_CACHE_STEP = float(os.getenv("MATRIX_CACHE_STEP", "0.01"))
+MATRIX_CACHE_GRID = os.getenv("MATRIX_CACHE_GRID", "0") == "1"
+MATRIX_GRID_STEP = float(os.getenv("MATRIX_GRID_STEP", "0.05"))
+MATRIX_GRID_MAX = float(os.getenv("MATRIX_GRID_MAX", "5.0"))
+
+MAX_GOALS = 10
+MIN_LAMBDA = 0.05
+
+
+def build_score_matrices(lambdas: np.ndarray, rho: float = 0.0, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """Normalized (N, G, G) [home, away] matrices for (N, 2) rates (Dixon-Coles if rho)."""
+
+    lambdas = np.asarray(lambdas, dtype=np.float64).reshape(-1, 2)
+    pmf = poisson_pmf_table(lambdas, max_goals)
+    return apply_dixon_coles(pmf[:, 0, :, None] * pmf[:, 1, None, :], lambdas, rho)
+
+
+class CachedMatrix:
+    """A read-only score matrix; derived markets are computed on first access."""
+
+    def __init__(self, matrix: np.ndarray):
+        matrix.setflags(write=False)
+        self.matrix = matrix
+
+    @cached_property
+    def markets(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Full market book, see `prediction_engine.markets.market_book`."""
+
+        from ..markets import market_book  # markets imports this module
+
+        return market_book(self.matrix)
+
+
+class _DenseGrid:
+    """Precomputed matrices on a regular (lambda_home, lambda_away) grid for one rho."""
+
+    def __init__(self, rho: float, step: float, max_lambda: float, max_goals: int):
+        self.step = step
+        self.axis = np.arange(step, max_lambda + step / 2, step)
+        lh, la = np.meshgrid(self.axis, self.axis, indexing="ij")
+        n = len(self.axis)
+        self.values = build_score_matrices(
+            np.column_stack([lh.ravel(), la.ravel()]), rho, max_goals
+        ).reshape(n, n, max_goals + 1, max_goals + 1)
+
+    def interpolate(self, lambda_home: float, lambda_away: float) -> Optional[np.ndarray]:
+        lo, hi = self.axis[0], self.axis[-1]
+        if not (lo <= lambda_home <= hi and lo <= lambda_away <= hi):
+            return None
+        x = (lambda_home - lo) / self.step
+        y = (lambda_away - lo) / self.step
+        i = min(int(x), len(self.axis) - 2)
+        j = min(int(y), len(self.axis) - 2)
+        tx, ty = x - i, y - j
+        v = self.values
+        return (
+            (1 - tx) * (1 - ty) * v[i, j]
+            + tx * (1 - ty) * v[i + 1, j]
+            + (1 - tx) * ty * v[i, j + 1]
+            + tx * ty * v[i + 1, j + 1]
+        )
+
+
+class ScoreMatrixCache:
+    def __init__(
+        self,
+        maxsize: int = MATRIX_CACHE_SIZE,
+        step: float = MATRIX_CACHE_STEP,
+        grid: bool = MATRIX_CACHE_GRID,
+        grid_step: float = MATRIX_GRID_STEP,
+        grid_max: float = MATRIX_GRID_MAX,
+        max_goals: int = MAX_GOALS,
+    ) -> None:
+        self.maxsize = maxsize
+        self.step = step
+        self.max_goals = max_goals
+        self.grid = grid
+        self.grid_step = grid_step
+        self.grid_max = grid_max
+        self._entries: "OrderedDict[Tuple[int, int, int], CachedMatrix]" = OrderedDict()
+        self._grids: Dict[int, _DenseGrid] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.interpolated = 0
+        self.evictions = 0
+
+    def _key(self, lambda_home: float, lambda_away: float, rho: float) -> Tuple[int, int, int]:
+        return (
+            int(round(max(lambda_home, MIN_LAMBDA) / self.step)),
+            int(round(max(lambda_away, MIN_LAMBDA) / self.step)),
+            int(round(rho / self.step)),
+        )
+
+    def _grid(self, rho_key: int) -> _DenseGrid:
+        grid = self._grids.get(rho_key)
+        if grid is None:
+            grid = self._grids[rho_key] = _DenseGrid(
+                rho_key * self.step, self.grid_step, self.grid_max, self.max_goals
+            )
+        return grid
+
+    def _compute(self, key: Tuple[int, int, int]) -> CachedMatrix:
+        lambda_home, lambda_away, rho = (k * self.step for k in key)
+        if self.grid:
+            matrix = self._grid(key[2]).interpolate(lambda_home, lambda_away)
+            if matrix is not None:
+                self.interpolated += 1
+                return CachedMatrix(matrix)
+        matrix = build_score_matrices(np.array([[lambda_home, lambda_away]]), rho, self.max_goals)[0]
+        return CachedMatrix(matrix)
+
+    def get(self, lambda_home: float, lambda_away: float, rho: float = 0.0) -> CachedMatrix:
+        key = self._key(lambda_home, lambda_away, rho)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            entry = self._compute(key)
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return entry
+
+    def matrix(self, lambda_home: float, lambda_away: float, rho: float = 0.0) -> np.ndarray:
+        return self.get(lambda_home, lambda_away, rho).matrix
+
+    def markets(self, lambda_home: float, lambda_away: float, rho: float = 0.0) -> Dict[str, Dict[str, Dict]]:
+        return self.get(lambda_home, lambda_away, rho).markets
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._grids.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "step": self.step,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "interpolated": self.interpolated,
+            "evictions": self.evictions,
+            "grids": len(self._grids),
+        }
+
+
+score_matrix_cache = ScoreMatrixCache()
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Dict, Tuple
+import math
 import numpy as np
 
 
@@ -19,7 +20,16 @@ class PoissonPrediction:
 
 
 def poisson_pmf(lmbda: float, k: int) -> float:
-    return float(np.exp(-lmbda) * (lmbda ** k) / np.math.factorial(k))
+    return float(np.exp(-lmbda) * (lmbda ** k) / math.factorial(k))
+
+
+def poisson_pmf_table(lambdas: np.ndarray, max_goals: int = 10) -> np.ndarray:
+    """P(k goals) for k = 0..max_goals and every rate, shape lambdas.shape + (max_goals + 1,)."""
+
+    lambdas = np.asarray(lambdas, dtype=np.float64)[..., None]
+    k = np.arange(max_goals + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(k[1:]))])
+    return np.exp(k * np.log(lambdas) - lambdas - log_fact)
 
 
 def score_probabilities(params: PoissonParams, max_goals: int = 10) -> PoissonPrediction:
@@ -0,0 +1,292 @@
+"""Derived-markets engine: every supported market from one score matrix.
+
+Each outcome of each market settles as a fixed function of the final score,
+so pricing is linear in the [home, away] score matrix. For a grid size G the
+engine builds (once) two (G*G, K) weight matrices over all K outcomes:
+
+  W[s, k]  share of the stake won on scoreline s (1, 0.5 for a half win)
+  L[s, k]  share of the stake lost on scoreline s (1, 0.5 for a half loss)
+
+and prices the full book as `matrix.ravel() @ W` and `@ L`: two matmuls for
+1X2, double chance, draw-no-bet, BTTS, total goals and team totals at every
+half / whole / quarter line, Asian handicaps and correct score, for one
+fixture or a stack of N. Pushes and quarter lines fall out of the weights:
+the expected return at decimal odds o is `win * (o - 1) - lose`.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .goals.matrix_cache import score_matrix_cache
+
+TOTAL_LINES = tuple(np.arange(0.5, 6.5 + 1e-9, 0.25).round(2))
+TEAM_TOTAL_LINES = tuple(np.arange(0.5, 3.5 + 1e-9, 0.25).round(2))
+HANDICAP_LINES = tuple(np.arange(-3.0, 3.0 + 1e-9, 0.25).round(2))
+CORRECT_SCORE_MAX = 5
+
+OutcomeKey = Tuple[str, str]  # (market, outcome)
+
+
+def _line(value: float) -> str:
+    return f"{value:g}"
+
+
+def _settle(margin: np.ndarray, line: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Win / loss weights of a bet that needs `margin + line > 0`, quarter lines split."""
+
+    quarter = abs(line * 4) % 2 == 1
+    halves = (line - 0.25, line + 0.25) if quarter else (line, line)
+    win = sum((margin + h > 0).astype(np.float64) for h in halves) / 2
+    lose = sum((margin + h < 0).astype(np.float64) for h in halves) / 2
+    return win, lose
+
+
+@lru_cache(maxsize=8)
+def book_layout(size: int) -> Tuple[List[OutcomeKey], np.ndarray, np.ndarray]:
+    """Outcome keys and (G*G, K) win / loss weights for a G x G score grid."""
+
+    home, away = (x.ravel() for x in np.indices((size, size)))
+    total, diff = home + away, home - away
+    keys: List[OutcomeKey] = []
+    wins: List[np.ndarray] = []
+    losses: List[np.ndarray] = []
+
+    def add(market: str, outcome: str, win, lose=None) -> None:
+        win = np.asarray(win, dtype=np.float64)
+        keys.append((market, outcome))
+        wins.append(win)
+        losses.append(1.0 - win if lose is None else np.asarray(lose, dtype=np.float64))
+
+    add("1x2", "home", diff > 0)
+    add("1x2", "draw", diff == 0)
+    add("1x2", "away", diff < 0)
+    add("double_chance", "1x", diff >= 0)
+    add("double_chance", "x2", diff <= 0)
+    add("double_chance", "12", diff != 0)
+    add("draw_no_bet", "home", diff > 0, diff < 0)
+    add("draw_no_bet", "away", diff < 0, diff > 0)
+    add("btts", "yes", (home >= 1) & (away >= 1))
+    add("btts", "no", (home == 0) | (away == 0))
+
+    for line in TOTAL_LINES:
+        market = f"over_under_{_line(line)}"
+        add(market, "over", *_settle(total, -line))
+        add(market, "under", *_settle(-total, line))
+    for team, goals in (("home", home), ("away", away)):
+        for line in TEAM_TOTAL_LINES:
+            market = f"{team}_total_{_line(line)}"
+            add(market, "over", *_settle(goals, -line))
+            add(market, "under", *_settle(-goals, line))
+    for line in HANDICAP_LINES:
+        # home gets `line` goals, away the opposite
+        market = f"asian_handicap_{line:+g}"
+        add(market, "home", *_settle(diff, line))
+        add(market, "away", *_settle(-diff, -line))
+
+    in_grid = (home <= CORRECT_SCORE_MAX) & (away <= CORRECT_SCORE_MAX)
+    for h in range(CORRECT_SCORE_MAX + 1):
+        for a in range(CORRECT_SCORE_MAX + 1):
+            add("correct_score", f"{h}-{a}", (home == h) & (away == a))
+    add("correct_score", "other", ~in_grid)
+
+    return keys, np.column_stack(wins), np.column_stack(losses)
+
+
+def price_matrices(matrices: np.ndarray) -> Tuple[List[OutcomeKey], np.ndarray, np.ndarray]:
+    """(keys, win (N, K), lose (N, K)) for a stack of (N, G, G) score matrices."""
+
+    matrices = np.asarray(matrices, dtype=np.float64)
+    size = matrices.shape[-1]
+    keys, W, L = book_layout(size)
+    flat = matrices.reshape(-1, size * size)
+    return keys, flat @ W, flat @ L
+
+
+def market_book(matrix: np.ndarray) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """{market: {outcome: {"prob", "win", "lose"}}} for one score matrix.
+
+    `prob` is the win probability excluding pushes (win / (win + lose)), so
+    the fair price is 1 / prob for every market, including Asian lines.
+    """
+
+    keys, win, lose = price_matrices(matrix[None])
+    win, lose = win[0].tolist(), lose[0].tolist()
+    book: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for (market, outcome), w, l in zip(keys, win, lose):
+        decided = w + l
+        book.setdefault(market, {})[outcome] = {
+            "prob": w / decided if decided > 0 else 0.0,
+            "win": w,
+            "lose": l,
+        }
+    return book
+
+
+# ---------------------------------------------------------------------------
+# named markets (bookmaker / alert / coupon wording)
+# ---------------------------------------------------------------------------
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+_ONE_X_TWO = {"1": "home", "home": "home", "x": "draw", "draw": "draw", "2": "away", "away": "away"}
+_DOUBLE_CHANCE = {
+    "1x": "1x", "home/draw": "1x", "x2": "x2", "draw/away": "x2", "12": "12", "home/away": "12",
+}
+_YES_NO = {"yes": "yes", "gg": "yes", "no": "no", "ng": "no"}
+
+# Only full-time, goals-settled markets can be priced from the score matrix;
+# anything else (halves, cards, corners, 3-way handicaps, ...) must fall back
+# to the de-vigged market price rather than be mapped onto a look-alike key.
+_UNSUPPORTED = ("half", "1st", "2nd", "first", "last", "cards", "corners", "bookings", "handicap result")
+_MARKETS = {
+    "1x2": "1x2", "match winner": "1x2", "full time result": "1x2", "fulltime result": "1x2",
+    "match result": "1x2",
+    "double chance": "double_chance",
+    "draw no bet": "draw_no_bet", "dnb": "draw_no_bet",
+    "both teams score": "btts", "both teams to score": "btts", "btts": "btts",
+    "gg/ng": "btts", "gg": "btts", "ng": "btts",
+    "correct score": "correct_score", "exact score": "correct_score",
+    "asian handicap": "handicap", "handicap": "handicap", "ah": "handicap",
+    "over/under": "total", "goals over/under": "total", "over/under goals": "total",
+    "total goals": "total", "totals": "total",
+    "total - home": "home_total", "home total": "home_total", "home total goals": "home_total",
+    "home team total": "home_total", "home team total goals": "home_total",
+    "total - away": "away_total", "away total": "away_total", "away total goals": "away_total",
+    "away team total": "away_total", "away team total goals": "away_total",
+}
+
+
+def _number(text: str) -> Optional[float]:
+    match = _NUMBER.search(text)
+    return float(match.group()) if match else None
+
+
+def market_kind(market: str) -> Optional[str]:
+    """Whitelisted kind of a named market ("Goals Over/Under 2.5" -> "total"), else None."""
+
+    m = (market or "").strip().lower()
+    if any(token in m for token in _UNSUPPORTED):
+        return None
+    return _MARKETS.get(m) or _MARKETS.get(" ".join(_NUMBER.sub(" ", m).split()))
+
+
+def resolve_outcome(market: str, outcome: str) -> Optional[OutcomeKey]:
+    """Map a named market/outcome ("Over/Under 2.5" / "Over") to a book key.
+
+    Only whitelisted full-time markets resolve; anything else returns None.
+    """
+
+    kind = market_kind(market)
+    m = (market or "").strip().lower()
+    o = (outcome or "").strip().lower()
+    o_team = o.split()[0] if o else ""
+
+    if kind == "1x2":
+        key = _ONE_X_TWO.get(o)
+        return ("1x2", key) if key else None
+    if kind == "double_chance":
+        key = _DOUBLE_CHANCE.get(o)
+        return ("double_chance", key) if key else None
+    if kind == "draw_no_bet":
+        key = _ONE_X_TWO.get(o)
+        return ("draw_no_bet", key) if key in ("home", "away") else None
+    if kind == "btts":
+        key = _YES_NO.get(o)
+        return ("btts", key) if key else None
+    if kind == "correct_score":
+        score = o.replace(":", "-").replace(" ", "")
+        return ("correct_score", score)
+    if kind == "handicap":
+        side = _ONE_X_TWO.get(o_team)
+        line = _number(o)
+        if line is None:
+            line = _number(m)
+            if line is not None and side == "away":
+                line = -line  # market line is quoted for the home side
+        if side not in ("home", "away") or line is None:
+            return None
+        home_line = (line if side == "home" else -line) + 0.0  # no "-0" key
+        return (f"asian_handicap_{home_line:+g}", side)
+    if kind in ("total", "home_total", "away_total") and o_team in ("over", "under"):
+        line = _number(o)
+        if line is None:
+            line = _number(m)
+        if line is None:
+            return None
+        if kind == "total":
+            return (f"over_under_{_line(line)}", o_team)
+        return (f"{kind}_{_line(line)}", o_team)
+    return None
+
+
+def lambdas_from_context(ctx: Optional[dict]) -> Optional[Tuple[float, float]]:
+    """Expected goals from a `stats_context` Poisson context (None if empty)."""
+
+    if not ctx:
+        return None
+    lambda_home = ctx["avg_goals_home_league"] * ctx["home_attack"] * ctx["away_defense"]
+    lambda_away = ctx["avg_goals_away_league"] * ctx["away_attack"] * ctx["home_defense"]
+    return max(lambda_home, 0.05), max(lambda_away, 0.05)
+
+
+def _market_implied(selections: Mapping[str, float]) -> Dict[str, float]:
+    inverse = {o: 1.0 / odds for o, odds in selections.items() if odds and odds > 1.0}
+    if len(inverse) < 2:
+        # a lone price can't be de-vigged; its raw implied probability prices at EV 0
+        return inverse
+    total = sum(inverse.values())
+    return {o: v / total for o, v in inverse.items()}
+
+
+def predict_market(
+    market: str,
+    selections: Mapping[str, float],
+    ctx: Optional[dict],
+    rho: float = 0.0,
+) -> Dict[str, Dict[str, float]]:
+    """Price the selections of one named market.
+
+    Returns {outcome: {"prob", "ev", "fair_odds", "source"}}. With a Poisson
+    context the fixture's full book comes from the cached score matrix
+    ("model"); selections the book can't settle, or fixtures without
+    context, fall back to the de-vigged market prices ("market").
+    """
+
+    lambdas = lambdas_from_context(ctx)
+    book = score_matrix_cache.get(*lambdas, rho).markets if lambdas else None
+    implied: Optional[Dict[str, float]] = None
+
+    priced: Dict[str, Dict[str, float]] = {}
+    for outcome, odds in selections.items():
+        entry = None
+        key = resolve_outcome(market, outcome) if book is not None else None
+        if key is not None:
+            entry = book.get(key[0], {}).get(key[1])
+
+        if entry is not None and entry["prob"] > 0:
+            prob, source = entry["prob"], "model"
+            ev = entry["win"] * (odds - 1.0) - entry["lose"] if odds else 0.0
+        else:
+            if implied is None:
+                implied = _market_implied(selections)
+            prob, source = implied.get(outcome, 0.0), "market"
+            ev = prob * odds - 1.0 if odds else 0.0
+
+        priced[outcome] = {
+            "prob": prob,
+            "ev": ev,
+            "fair_odds": 1.0 / prob if prob > 0 else None,
+            "source": source,
+        }
+    return priced
+
+
+def price_fixtures(
+    lambdas: Sequence[Tuple[float, float]], rho: float = 0.0
+) -> List[Dict[str, Dict[str, Dict[str, float]]]]:
+    """Full market books for many fixtures, one cached matrix each."""
+
+    return [score_matrix_cache.get(lh, la, rho).markets for lh, la in lambdas]
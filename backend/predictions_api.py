@@ -1,18 +1,52 @@
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends
+import numpy as np
+from fastapi import APIRouter, Depends, Query
 
 from .auth_dependency import require_user
+from .http_cache import snapshot_etag
+from .downsample import lttb_indices
 from .live_state import live_state
 from .prediction_engine import generate_predictions
-from .snapshot_service import latest_snapshot_payload
+from .snapshot_service import latest_snapshot_payload, probability_history
 
 router = APIRouter(prefix="/predictions", tags=["predictions"])
 
 
-@router.get("", dependencies=[Depends(require_user)])
+@router.get("", dependencies=[Depends(require_user), Depends(snapshot_etag)])
 async def list_predictions() -> List[dict]:
     """Return predictions aligned to the desktop type."""
 
-    snapshot = latest_snapshot_payload() or live_state.snapshot()
+    snapshot = await latest_snapshot_payload() or live_state.snapshot()
     return generate_predictions(snapshot)
+
+
+@router.get("/{fixture_id}/history", dependencies=[Depends(require_user)])
+async def prediction_history(
+    fixture_id: str,
+    points: int = Query(200, ge=3, le=5000),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict:
+    """Probability path of one fixture, LTTB-downsampled to at most `points` rows."""
+
+    rows = await probability_history(fixture_id, since, until)
+    keep = range(len(rows))
+    if len(rows) > points:
+        ts = np.array([row[0].timestamp() for row in rows])
+        probs = np.array([row[1:] for row in rows])
+        keep = lttb_indices(ts, probs, points).tolist()
+    return {
+        "fixtureId": fixture_id,
+        "total": len(rows),
+        "points": [
+            {
+                "ts": rows[i][0].isoformat() + "Z",
+                "home": rows[i][1],
+                "draw": rows[i][2],
+                "away": rows[i][3],
+            }
+            for i in keep
+        ],
+    }
@@ -0,0 +1,180 @@
+"""
+Historical replay of persisted live snapshots.
+
+Streams `LiveSnapshotRecord` rows between two timestamps, paced by the
+original capture times divided by a speed multiplier, using the same
+`{"type": "snapshot", ...}` messages as `/ws/live-matches`. Rows are read
+in keyset pages of REPLAY_FETCH_SIZE and the session is closed between
+pages, so a long window never loads all payloads into memory and a slowly
+paced replay doesn't hold a database connection.
+
+The websocket takes the bearer token as a `token` query parameter or as
+the first message (`{"token": "..."}`) and streams nothing until it
+resolves to a user.
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+
+from .auth_dependency import Principal, get_user, require_user
+from .db import AsyncSessionLocal, SessionLocal
+from .models import LiveSnapshotRecord
+
+REPLAY_MAX_SPEED = float(os.getenv("REPLAY_MAX_SPEED", "3600"))
+# cap on the wall-clock wait between two frames (e.g. across retention gaps)
+REPLAY_MAX_GAP_SEC = float(os.getenv("REPLAY_MAX_GAP_SEC", "10"))
+REPLAY_FETCH_SIZE = int(os.getenv("REPLAY_FETCH_SIZE", "50"))
+# how long /ws/replay waits for the auth message when no token is in the URL
+REPLAY_AUTH_TIMEOUT_SEC = float(os.getenv("REPLAY_AUTH_TIMEOUT_SEC", "10"))
+
+router = APIRouter(tags=["replay"])
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _validate(start: datetime, end: datetime, speed: float) -> Optional[str]:
+    if _naive_utc(end) <= _naive_utc(start):
+        return "end must be after start"
+    if speed < 0 or speed > REPLAY_MAX_SPEED:
+        return f"speed must be between 0 and {REPLAY_MAX_SPEED:g} (0 = no pacing)"
+    return None
+
+
+async def _fetch_page(start: datetime, end: datetime, after: Optional[tuple]) -> list:
+    """Next REPLAY_FETCH_SIZE rows after the (created_at, id) key, in capture order."""
+
+    query = select(
+        LiveSnapshotRecord.id,
+        LiveSnapshotRecord.created_at,
+        LiveSnapshotRecord.reason,
+        LiveSnapshotRecord.payload,
+    ).where(
+        LiveSnapshotRecord.created_at >= start,
+        LiveSnapshotRecord.created_at < end,
+    )
+    if after is not None:
+        created_at, row_id = after
+        query = query.where(
+            or_(
+                LiveSnapshotRecord.created_at > created_at,
+                and_(LiveSnapshotRecord.created_at == created_at, LiveSnapshotRecord.id > row_id),
+            )
+        )
+    query = query.order_by(LiveSnapshotRecord.created_at, LiveSnapshotRecord.id).limit(REPLAY_FETCH_SIZE)
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(query)).all()
+
+
+async def replay_frames(start: datetime, end: datetime, speed: float) -> AsyncIterator[Dict]:
+    """Yield snapshot messages in capture order, sleeping between them.
+
+    `speed` is a multiplier on real time (60 = one minute of history per
+    second); 0 sends frames as fast as the client reads them.
+    """
+
+    start, end = _naive_utc(start), _naive_utc(end)
+    frames = 0
+    previous: Optional[datetime] = None
+    after: Optional[tuple] = None
+    while True:
+        page = await _fetch_page(start, end, after)
+        for row_id, created_at, reason, payload in page:
+            if speed > 0 and previous is not None:
+                delay = (created_at - previous).total_seconds() / speed
+                if delay > 0:
+                    await asyncio.sleep(min(delay, REPLAY_MAX_GAP_SEC))
+            previous = created_at
+            frames += 1
+            yield {
+                "type": "snapshot",
+                "replay": True,
+                "ts": created_at.isoformat(),
+                "reason": reason,
+                **(payload or {}),
+            }
+        if len(page) < REPLAY_FETCH_SIZE:
+            break
+        after = (page[-1].created_at, page[-1].id)
+
+    yield {"type": "replay_end", "frames": frames}
+
+
+@router.get("/replay", dependencies=[Depends(require_user)])
+async def replay(
+    start: datetime = Query(..., description="ISO timestamp (UTC if naive)"),
+    end: datetime = Query(...),
+    speed: float = Query(0.0, description="Real-time multiplier, 0 = unpaced"),
+):
+    """Stream snapshots as NDJSON, one message per line."""
+
+    error = _validate(start, end, speed)
+    if error:
+        raise HTTPException(400, error)
+
+    async def body() -> AsyncIterator[str]:
+        async for frame in replay_frames(start, end, speed):
+            yield json.dumps(frame, default=str) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+def _resolve_token(token: str) -> Principal:
+    with SessionLocal() as db:
+        return get_user(token, db)
+
+
+async def _ws_principal(websocket: WebSocket, token: Optional[str]) -> Optional[Principal]:
+    """Principal for the query token or the first message's token, None if invalid."""
+
+    try:
+        if not token:
+            message = await asyncio.wait_for(websocket.receive_json(), REPLAY_AUTH_TIMEOUT_SEC)
+            token = message.get("token") if isinstance(message, dict) else None
+        if not token:
+            return None
+        return await asyncio.to_thread(_resolve_token, token)
+    except (asyncio.TimeoutError, ValueError, HTTPException):
+        return None
+
+
+@router.websocket("/ws/replay")
+async def replay_ws(
+    websocket: WebSocket,
+    start: datetime,
+    end: datetime,
+    speed: float = 1.0,
+    token: Optional[str] = None,
+) -> None:
+    await websocket.accept()
+    try:
+        principal = await _ws_principal(websocket, token)
+    except WebSocketDisconnect:
+        return
+    if principal is None:
+        await websocket.send_json({"type": "error", "detail": "authentication required"})
+        await websocket.close(code=1008)
+        return
+
+    error = _validate(start, end, speed)
+    if error:
+        await websocket.send_json({"type": "error", "detail": error})
+        await websocket.close(code=1008)
+        return
+
+    try:
+        async for frame in replay_frames(start, end, speed):
+            await websocket.send_json(frame)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,248 @@
+"""
+Retention for persisted live snapshots.
+
+Snapshots are captured every minute and on every live_state change, so the
+history is thinned in tiers instead of kept forever:
+
+  * everything newer than RETENTION_RAW_HOURS is kept as-is
+  * up to RETENTION_HOURLY_DAYS, one keyframe (the first snapshot) per hour
+  * older than that, one keyframe per day
+  * optionally, nothing older than RETENTION_MAX_DAYS (0 = keep forever)
+
+Retention deletes data, so it is off unless RETENTION_ENABLED is set.
+Expired snapshots are found by scanning `(id, created_at)` in keyset pages
+(no transaction is held across pages) and deleted together with their
+prediction and value-bet rows in batches, each in its own short write
+transaction, without collecting all expired ids first.
+Probability points (already one row per change) are not thinned, only
+expired past RETENTION_MAX_DAYS.
+
+On Postgres, if `live_snapshots` and its child tables have been created as
+tables partitioned by month on `created_at` (see docs/DEPLOYMENT.md), the
+pruner also keeps future partitions created ahead of time and expires data
+past RETENTION_MAX_DAYS by dropping whole partitions instead of deleting rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from sqlalchemy import and_, delete, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import AsyncSessionLocal, IS_SQLITE, serialized_write
+from .models import (
+    LiveSnapshotRecord,
+    PredictionSnapshotRecord,
+    ProbabilityPoint,
+    ValueBetSnapshotRecord,
+)
+
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "false").lower() in ("1", "true", "yes")
+RETENTION_RAW_HOURS = float(os.getenv("RETENTION_RAW_HOURS", "24"))
+RETENTION_HOURLY_DAYS = float(os.getenv("RETENTION_HOURLY_DAYS", "30"))
+RETENTION_MAX_DAYS = float(os.getenv("RETENTION_MAX_DAYS", "0"))
+RETENTION_INTERVAL_SEC = int(os.getenv("RETENTION_INTERVAL_SEC", "900"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+RETENTION_PARTITIONS_AHEAD = int(os.getenv("RETENTION_PARTITIONS_AHEAD", "2"))
+
+SNAPSHOT_TABLES = ("prediction_snapshots", "value_bet_snapshots", "live_snapshots")
+# (id, created_at) rows read per scan query
+_SCAN_PAGE = 5000
+
+
+def _bucket(ts: datetime, hourly_cutoff: datetime) -> Union[datetime, date]:
+    if ts >= hourly_cutoff:
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.date()
+
+
+async def _expired_snapshot_batches(now: datetime, partitioned: bool) -> AsyncIterator[List[int]]:
+    """Ids of snapshots outside the retention policy, RETENTION_BATCH_SIZE at a time.
+
+    Only `(id, created_at)` pairs of rows older than the raw window are
+    read; after the first run that range holds little more than keyframes.
+    Batches may be deleted before the next one is requested.
+    """
+
+    raw_cutoff = now - timedelta(hours=RETENTION_RAW_HOURS)
+    hourly_cutoff = now - timedelta(days=RETENTION_HOURLY_DAYS)
+    max_cutoff = (
+        now - timedelta(days=RETENTION_MAX_DAYS)
+        if RETENTION_MAX_DAYS > 0 and not partitioned
+        else None
+    )
+
+    expired: List[int] = []
+    last_bucket = None
+    after = None
+    while True:
+        query = select(LiveSnapshotRecord.id, LiveSnapshotRecord.created_at).where(
+            LiveSnapshotRecord.created_at < raw_cutoff
+        )
+        if after is not None:
+            query = query.where(
+                or_(
+                    LiveSnapshotRecord.created_at > after.created_at,
+                    and_(
+                        LiveSnapshotRecord.created_at == after.created_at,
+                        LiveSnapshotRecord.id > after.id,
+                    ),
+                )
+            )
+        query = query.order_by(LiveSnapshotRecord.created_at, LiveSnapshotRecord.id).limit(_SCAN_PAGE)
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(query)).all()
+
+        for snapshot_id, created_at in rows:
+            if max_cutoff is not None and created_at < max_cutoff:
+                expired.append(snapshot_id)
+            else:
+                bucket = _bucket(created_at, hourly_cutoff)
+                if bucket == last_bucket:
+                    expired.append(snapshot_id)
+                else:
+                    last_bucket = bucket
+            if len(expired) >= RETENTION_BATCH_SIZE:
+                yield expired
+                expired = []
+        if len(rows) < _SCAN_PAGE:
+            break
+        after = rows[-1]
+
+    if expired:
+        yield expired
+
+
+async def _delete_batch(ids: List[int]) -> None:
+    async with serialized_write(), AsyncSessionLocal() as db:
+        for model in (PredictionSnapshotRecord, ValueBetSnapshotRecord):
+            await db.execute(delete(model).where(model.snapshot_id.in_(ids)))
+        await db.execute(delete(LiveSnapshotRecord).where(LiveSnapshotRecord.id.in_(ids)))
+        await db.commit()
+
+
+# -------------------------------------------------------------------
+# Postgres partition maintenance
+# -------------------------------------------------------------------
+def _month_start(d: date, offset: int = 0) -> date:
+    month = d.month - 1 + offset
+    return date(d.year + month // 12, month % 12 + 1, 1)
+
+
+async def _is_partitioned(db: AsyncSession) -> bool:
+    if IS_SQLITE:
+        return False
+    found = await db.scalar(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'live_snapshots'"
+        )
+    )
+    return bool(found)
+
+
+async def _maintain_partitions(db: AsyncSession, now: datetime) -> Dict[str, int]:
+    """Create upcoming monthly partitions and drop fully expired ones."""
+
+    created = dropped = 0
+    this_month = _month_start(now.date())
+    for offset in range(RETENTION_PARTITIONS_AHEAD + 1):
+        lo, hi = _month_start(this_month, offset), _month_start(this_month, offset + 1)
+        for table in SNAPSHOT_TABLES:
+            name = f"{table}_p{lo:%Y%m}"
+            exists = await db.scalar(text("SELECT to_regclass(:n)"), {"n": name})
+            if exists is None:
+                await db.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{lo}') TO ('{hi}')"
+                    )
+                )
+                created += 1
+
+    if RETENTION_MAX_DAYS > 0:
+        cutoff = (now - timedelta(days=RETENTION_MAX_DAYS)).date()
+        for table in SNAPSHOT_TABLES:
+            rows = await db.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :t"
+                ),
+                {"t": table},
+            )
+            for (name,) in rows.all():
+                suffix = name.rsplit("_p", 1)[-1]
+                if not (len(suffix) == 6 and suffix.isdigit()):
+                    continue
+                lo = date(int(suffix[:4]), int(suffix[4:]), 1)
+                if _month_start(lo, 1) <= cutoff:
+                    await db.execute(text(f"DROP TABLE {name}"))
+                    dropped += 1
+
+    await db.commit()
+    return {"created": created, "dropped": dropped}
+
+
+async def ensure_partitions(now: Optional[datetime] = None) -> None:
+    """Make sure partitions exist before the first write (no-op if unpartitioned)."""
+
+    async with AsyncSessionLocal() as db:
+        if await _is_partitioned(db):
+            async with serialized_write():
+                await _maintain_partitions(db, now or datetime.utcnow())
+
+
+# -------------------------------------------------------------------
+# Pruner
+# -------------------------------------------------------------------
+async def prune_snapshots(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Apply the retention policy once and return what was removed."""
+
+    now = now or datetime.utcnow()
+    stats = {"deleted": 0, "points_deleted": 0, "partitions_created": 0, "partitions_dropped": 0}
+
+    async with AsyncSessionLocal() as db:
+        partitioned = await _is_partitioned(db)
+        if partitioned:
+            async with serialized_write():
+                part = await _maintain_partitions(db, now)
+            stats["partitions_created"] = part["created"]
+            stats["partitions_dropped"] = part["dropped"]
+
+    async for batch in _expired_snapshot_batches(now, partitioned):
+        await _delete_batch(batch)
+        stats["deleted"] += len(batch)
+        # let snapshot writes and readers in between batches
+        await asyncio.sleep(0)
+
+    if RETENTION_MAX_DAYS > 0:
+        cutoff = now - timedelta(days=RETENTION_MAX_DAYS)
+        async with serialized_write(), AsyncSessionLocal() as db:
+            result = await db.execute(delete(ProbabilityPoint).where(ProbabilityPoint.ts < cutoff))
+            await db.commit()
+        stats["points_deleted"] = result.rowcount or 0
+
+    return stats
+
+
+async def retention_loop():
+    while True:
+        try:
+            stats = await prune_snapshots()
+            if any(stats.values()):
+                print(f"[retention] {stats}")
+        except Exception as exc:  # pragma: no cover - observability only
+            print(f"[retention] failed: {exc}")
+        await asyncio.sleep(RETENTION_INTERVAL_SEC)
+
+
+def start_retention_background(loop: asyncio.AbstractEventLoop) -> None:
+    if not RETENTION_ENABLED:
+        print("[retention] disabled")
+        return
+    loop.create_task(retention_loop())
@@ -5,12 +5,16 @@ from __future__ import annotations
 import asyncio
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from .db import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import AsyncSessionLocal, serialized_write
 from .models import (
     LiveSnapshotRecord,
     PredictionSnapshotRecord,
+    ProbabilityPoint,
     ValueBetSnapshotRecord,
 )
 from .prediction_engine import compute_value_bets, generate_predictions
@@ -21,32 +25,58 @@ SNAPSHOT_INTERVAL_SEC = int(os.getenv("SNAPSHOT_INTERVAL_SEC", "60"))
 
 _lock = asyncio.Lock()
 
-
-def _persist_live_snapshot(snapshot: Dict, reason: str) -> LiveSnapshotRecord:
-    with SessionLocal() as db:
-        rec = LiveSnapshotRecord(reason=reason, payload=snapshot)
-        db.add(rec)
-        db.commit()
-        db.refresh(rec)
-        return rec
-
-
-def _persist_predictions(snapshot_id: int, rows: List[Dict], model_version: str) -> None:
-    with SessionLocal() as db:
-        rec = PredictionSnapshotRecord(
-            snapshot_id=snapshot_id, payload=rows, model_version=model_version
+# last (home, draw, away) written per fixture; unchanged probabilities are skipped
+_last_points: Dict[str, Tuple[float, float, float]] = {}
+
+
+def _probability_points(predictions: List[Dict], ts: datetime) -> List[ProbabilityPoint]:
+    points = []
+    for p in predictions:
+        fixture_id = p.get("fixtureId")
+        if fixture_id is None:
+            continue
+        probs = (p["homeWinProbability"], p["drawProbability"], p["awayWinProbability"])
+        if _last_points.get(str(fixture_id)) == probs:
+            continue
+        points.append(
+            ProbabilityPoint(fixture_id=str(fixture_id), ts=ts, home=probs[0], draw=probs[1], away=probs[2])
         )
-        db.add(rec)
-        db.commit()
-
-
-def _persist_value_bets(snapshot_id: int, rows: List[Dict], model_version: str) -> None:
-    with SessionLocal() as db:
-        rec = ValueBetSnapshotRecord(
-            snapshot_id=snapshot_id, payload=rows, model_version=model_version
-        )
-        db.add(rec)
-        db.commit()
+    return points
+
+
+async def _persist_snapshot_bundle(
+    db: AsyncSession,
+    snapshot: Dict,
+    reason: str,
+    predictions: List[Dict],
+    value_bets: List[Dict],
+    model_version: str,
+) -> LiveSnapshotRecord:
+    """Write a snapshot and its derived rows in a single transaction."""
+
+    rec = LiveSnapshotRecord(reason=reason, payload=snapshot)
+    db.add(rec)
+    await db.flush()
+    points = _probability_points(predictions, datetime.utcnow())
+    db.add_all(
+        [
+            PredictionSnapshotRecord(
+                snapshot_id=rec.id, payload=predictions, model_version=model_version
+            ),
+            ValueBetSnapshotRecord(
+                snapshot_id=rec.id, payload=value_bets, model_version=model_version
+            ),
+            *points,
+        ]
+    )
+    await db.commit()
+    for point in points:
+        _last_points[point.fixture_id] = (point.home, point.draw, point.away)
+    # forget fixtures that left the snapshot so the dedup map stays bounded
+    current = {str(p.get("fixtureId")) for p in predictions}
+    for fixture_id in [f for f in _last_points if f not in current]:
+        del _last_points[fixture_id]
+    return rec
 
 
 async def capture_snapshot(reason: str = "manual", model_version: str = "demo") -> Dict:
@@ -54,19 +84,13 @@ async def capture_snapshot(reason: str = "manual", model_version: str = "demo")
 
     async with _lock:
         snapshot = live_state.snapshot()
-        rec = await asyncio.get_running_loop().run_in_executor(
-            None, _persist_live_snapshot, snapshot, reason
-        )
-
         predictions = generate_predictions(snapshot)
         value_bets = compute_value_bets(snapshot)
 
-        await asyncio.get_running_loop().run_in_executor(
-            None, _persist_predictions, rec.id, predictions, model_version
-        )
-        await asyncio.get_running_loop().run_in_executor(
-            None, _persist_value_bets, rec.id, value_bets, model_version
-        )
+        async with serialized_write(), AsyncSessionLocal() as db:
+            await _persist_snapshot_bundle(
+                db, snapshot, reason, predictions, value_bets, model_version
+            )
 
     return snapshot
 
@@ -86,27 +110,48 @@ def start_snapshot_scheduler(loop: asyncio.AbstractEventLoop) -> None:
     loop.create_task(periodic_capture_loop())
 
 
-def backfill_demo_if_empty() -> Optional[LiveSnapshotRecord]:
-    with SessionLocal() as db:
-        has_snapshot = db.query(LiveSnapshotRecord).first()
+async def backfill_demo_if_empty() -> Optional[LiveSnapshotRecord]:
+    async with AsyncSessionLocal() as db:
+        has_snapshot = await db.scalar(select(LiveSnapshotRecord).limit(1))
         if has_snapshot:
             return has_snapshot
 
-    # Use the in-memory defaults to seed the persistence layer for offline use
-    snapshot = live_state.snapshot()
-    rec = _persist_live_snapshot(snapshot, reason="seed")
-    _persist_predictions(rec.id, generate_predictions(snapshot), model_version="demo")
-    _persist_value_bets(rec.id, compute_value_bets(snapshot), model_version="demo")
-    return rec
-
-
-def latest_snapshot_payload() -> Optional[Dict]:
-    with SessionLocal() as db:
-        rec = (
-            db.query(LiveSnapshotRecord)
+        # Use the in-memory defaults to seed the persistence layer for offline use
+        snapshot = live_state.snapshot()
+        async with serialized_write():
+            return await _persist_snapshot_bundle(
+                db,
+                snapshot,
+                "seed",
+                generate_predictions(snapshot),
+                compute_value_bets(snapshot),
+                "demo",
+            )
+
+
+async def latest_snapshot_payload() -> Optional[Dict]:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(LiveSnapshotRecord.payload)
             .order_by(LiveSnapshotRecord.created_at.desc())
-            .first()
+            .limit(1)
         )
-        if not rec:
-            return None
-        return rec.payload
+
+
+async def probability_history(
+    fixture_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Tuple[datetime, float, float, float]]:
+    """(ts, home, draw, away) rows of one fixture in time order."""
+
+    q = select(ProbabilityPoint.ts, ProbabilityPoint.home, ProbabilityPoint.draw, ProbabilityPoint.away).where(
+        ProbabilityPoint.fixture_id == fixture_id
+    )
+    if since is not None:
+        q = q.where(ProbabilityPoint.ts >= since)
+    if until is not None:
+        q = q.where(ProbabilityPoint.ts <= until)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(q.order_by(ProbabilityPoint.ts, ProbabilityPoint.id))
+        return [tuple(row) for row in result.all()]
@@ -5,6 +5,7 @@ from sqlalchemy import select
 
 from .db import SessionLocal
 from .models import TeamStats
+from .stats_context import team_stats_cache
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
@@ -57,6 +58,7 @@ def upsert_team_stats(p: TeamStatsIn, db: Session = Depends(get_db)):
     db.add(row)
     db.commit()
     db.refresh(row)
+    team_stats_cache.invalidate(p.league_id, p.team_name, p.season)
     return {"ok": True, "id": row.id}
 
 
@@ -1,39 +1,140 @@
+"""
+Poisson context lookups backed by an in-process TeamStats cache.
+
+TeamStats rows change rarely (only through `/stats/team/upsert`) but are read
+per coupon selection and per alert market, so whole seasons are bulk-loaded
+into memory once and individual entries are invalidated on upsert.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 
 from .models import TeamStats
 
+DEFAULT_SEASON = "2024"
+
+# (home_attack, away_attack, home_defense, away_defense, avg_goals_for, avg_goals_against)
+StatsRow = Tuple[float, float, float, float, float, float]
+StatsKey = Tuple[str, str, str]  # (league_id, team_name, season)
+
+
+def _row_values(row: TeamStats) -> StatsRow:
+    return (
+        row.home_attack,
+        row.away_attack,
+        row.home_defense,
+        row.away_defense,
+        row.avg_goals_for,
+        row.avg_goals_against,
+    )
+
+
+class TeamStatsCache:
+    """Season-scoped, thread-safe cache of TeamStats values.
+
+    Values are stored as plain tuples (not ORM objects) so they can be shared
+    across sessions and threads. A missing team is cached as `None` so repeated
+    lookups for unknown teams don't hit the database either.
+    """
+
+    def __init__(self) -> None:
+        self._rows: Dict[StatsKey, Optional[StatsRow]] = {}
+        self._seasons: set = set()
+        self._lock = threading.Lock()
+
+    def load_season(self, db: Session, season: str = DEFAULT_SEASON) -> int:
+        rows = db.scalars(select(TeamStats).where(TeamStats.season == season)).all()
+        with self._lock:
+            for key in [k for k in self._rows if k[2] == season]:
+                del self._rows[key]
+            for row in rows:
+                self._rows[(row.league_id, row.team_name, season)] = _row_values(row)
+            self._seasons.add(season)
+        return len(rows)
+
+    def invalidate(self, league_id: str, team_name: str, season: str) -> None:
+        with self._lock:
+            self._rows.pop((league_id, team_name, season), None)
+            # force a targeted reload for this key on next lookup
+            self._seasons.discard(season)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self._seasons.clear()
+
+    def get_many(
+        self, db: Session, keys: Iterable[StatsKey]
+    ) -> Dict[StatsKey, Optional[StatsRow]]:
+        keys = set(keys)
+        with self._lock:
+            found = {k: self._rows[k] for k in keys if k in self._rows}
+            missing = [k for k in keys if k not in found and k[2] not in self._seasons]
+        # keys of fully loaded seasons that are not cached simply don't exist
+        for k in keys:
+            if k not in found and k[2] in self._seasons:
+                found[k] = None
+
+        if missing:
+            rows = db.scalars(
+                select(TeamStats).where(
+                    tuple_(TeamStats.league_id, TeamStats.team_name, TeamStats.season).in_(
+                        missing
+                    )
+                )
+            ).all()
+            loaded = {(r.league_id, r.team_name, r.season): _row_values(r) for r in rows}
+            with self._lock:
+                for k in missing:
+                    self._rows[k] = loaded.get(k)
+                    found[k] = loaded.get(k)
+        return found
+
+
+team_stats_cache = TeamStatsCache()
+
+
+def _context_from_rows(home: Optional[StatsRow], away: Optional[StatsRow]) -> dict:
+    ctx: dict = {}
+    if home and away:
+        ctx["home_attack"] = home[0]
+        ctx["away_attack"] = away[1]
+        ctx["home_defense"] = home[2]
+        ctx["away_defense"] = away[3]
+        ctx["avg_goals_home_league"] = home[4]
+        ctx["avg_goals_away_league"] = away[4]
+    return ctx
+
+
+def build_poisson_contexts(
+    db: Session,
+    fixtures: Iterable[Tuple[str, str, str]],
+    season: str = DEFAULT_SEASON,
+) -> List[dict]:
+    """Resolve Poisson contexts for many (league_id, home, away) triples.
+
+    Cache misses for all triples are fetched with a single query.
+    """
+    fixtures = [(str(lg), home, away) for lg, home, away in fixtures]
+    keys = set()
+    for league_id, home, away in fixtures:
+        keys.add((league_id, home, season))
+        keys.add((league_id, away, season))
+    rows = team_stats_cache.get_many(db, keys)
+    return [
+        _context_from_rows(rows.get((lg, home, season)), rows.get((lg, away, season)))
+        for lg, home, away in fixtures
+    ]
+
 
 def build_poisson_context(
     db: Session,
     league_id: str,
     home_team: str,
     away_team: str,
-    season: str = "2024",
+    season: str = DEFAULT_SEASON,
 ) -> dict:
-    ctx: dict = {}
-
-    home = db.scalar(
-        select(TeamStats).where(
-            TeamStats.league_id == league_id,
-            TeamStats.team_name == home_team,
-            TeamStats.season == season,
-        )
-    )
-    away = db.scalar(
-        select(TeamStats).where(
-            TeamStats.league_id == league_id,
-            TeamStats.team_name == away_team,
-            TeamStats.season == season,
-        )
-    )
-
-    if home and away:
-        ctx["home_attack"] = home.home_attack
-        ctx["away_attack"] = away.away_attack
-        ctx["home_defense"] = home.home_defense
-        ctx["away_defense"] = away.away_defense
-        ctx["avg_goals_home_league"] = home.avg_goals_for
-        ctx["avg_goals_away_league"] = away.avg_goals_for
-
-    return ctx
+    return build_poisson_contexts(db, [(league_id, home_team, away_team)], season)[0]
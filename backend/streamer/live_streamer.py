@@ -5,6 +5,7 @@ from typing import List
 import httpx
 
 from ..fixtures_api import _map_status
+from ..live_odds_api import refresh_live_odds
 
 from ..live_state import live_state
 
@@ -48,6 +49,7 @@ async def _fetch_live_fixtures() -> List[dict]:
             {
                 "id": str(fixture.get("id")),
                 "league": league.get("name"),
+                "leagueId": league.get("id"),
                 "homeTeam": teams.get("home", {}).get("name"),
                 "awayTeam": teams.get("away", {}).get("name"),
                 "startTime": fixture.get("date"),
@@ -104,6 +106,11 @@ async def _refresh_live_snapshot() -> bool:
             events_by_fixture[f.get("id", "")] = await _fetch_fixture_events(f.get("id"))
         if any(events_by_fixture.values()):
             await live_state.set_events(events_by_fixture)
+        try:
+            # odds updates drive the event-based alert engine
+            await refresh_live_odds()
+        except Exception as exc:  # pragma: no cover - network errors
+            print(f"[streamer] Odds refresh failed: {exc}")
         return True
 
     return False
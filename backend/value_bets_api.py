@@ -3,6 +3,7 @@ from typing import List
 from fastapi import APIRouter, Depends
 
 from .auth_dependency import require_user
+from .http_cache import snapshot_etag
 from .live_state import live_state
 from .prediction_engine import compute_value_bets
 from .snapshot_service import latest_snapshot_payload
@@ -10,9 +11,9 @@ from .snapshot_service import latest_snapshot_payload
 router = APIRouter(prefix="/value-bets", tags=["value-bets"])
 
 
-@router.get("", dependencies=[Depends(require_user)])
+@router.get("", dependencies=[Depends(require_user), Depends(snapshot_etag)])
 async def list_value_bets() -> List[dict]:
     """Return simplified value bet rows expected by the desktop client."""
 
-    snapshot = latest_snapshot_payload() or live_state.snapshot()
+    snapshot = await latest_snapshot_payload() or live_state.snapshot()
     return compute_value_bets(snapshot)
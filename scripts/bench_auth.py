@@ -0,0 +1,72 @@
+"""
+GFPS auth overhead benchmark
+
+Measures the per-request cost of resolving a bearer token into a user
+principal (`backend.auth_dependency.get_user`), with the principal cache
+disabled (JWT decode + User query every time) and enabled.
+
+Runs against a throwaway in-memory SQLite database unless --database-url
+is given.
+"""
+
+import argparse
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db import Base
+from backend.models import User
+from backend.auth_utils import create_token
+from backend.auth_dependency import get_user, principal_cache
+
+
+def _bench(session_factory, tokens, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        with session_factory() as db:
+            get_user(tokens[i % len(tokens)], db)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GFPS auth overhead benchmark")
+    parser.add_argument("--database-url", type=str, default="sqlite://")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        args.database_url,
+        poolclass=StaticPool if args.database_url == "sqlite://" else None,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    with session_factory() as db:
+        for i in range(args.users):
+            db.add(User(email=f"bench{i}@gfps.app", password_hash="x"))
+        db.commit()
+    tokens = [create_token(f"bench{i}@gfps.app") for i in range(args.users)]
+
+    ttl = principal_cache.ttl
+    principal_cache.ttl = 0
+    principal_cache.clear()
+    uncached = _bench(session_factory, tokens, args.requests)
+
+    principal_cache.ttl = ttl or 30
+    principal_cache.clear()
+    principal_cache.hits = principal_cache.misses = 0
+    cached = _bench(session_factory, tokens, args.requests)
+
+    print(f"[GFPS-BENCH] auth without cache: {uncached:8.1f} µs/request")
+    print(f"[GFPS-BENCH] auth with cache:    {cached:8.1f} µs/request")
+    print(
+        f"[GFPS-BENCH] cache hits={principal_cache.hits} misses={principal_cache.misses} "
+        f"speedup={uncached / cached:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
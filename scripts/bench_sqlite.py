@@ -0,0 +1,140 @@
+"""
+GFPS SQLite concurrency benchmark
+
+Measures read latency while a burst of snapshot writes is in flight, once
+with SQLite defaults (rollback journal, synchronous=FULL, writers racing for
+the lock) and once with the single-node profile from `backend.db` (WAL,
+synchronous=NORMAL, mmap, busy timeout, single-writer queue).
+
+Runs against a throwaway database file in a temp directory.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.db import Base, SQLiteWriter, apply_sqlite_pragmas
+from backend.models import LiveSnapshotRecord
+
+
+def _payload(i: int) -> Dict:
+    return {
+        "fixtures": [
+            {"id": f"{i}-{n}", "home": f"Home {n}", "away": f"Away {n}", "minute": n % 90}
+            for n in range(40)
+        ],
+        "odds": {f"{i}-{n}": {"home": 2.1, "draw": 3.3, "away": 3.6} for n in range(40)},
+    }
+
+
+def _run_profile(name: str, tuned: bool, readers: int, writers: int, writes: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(prefix="gfps-bench-"), "bench.db")
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 5}
+    )
+    if tuned:
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    writer = SQLiteWriter() if tuned else None
+
+    with session_factory() as db:
+        db.add_all(LiveSnapshotRecord(reason="seed", payload=_payload(i)) for i in range(200))
+        db.commit()
+
+    done = threading.Event()
+    read_latencies: List[float] = []
+    write_latencies: List[float] = []
+    errors = {"read": 0, "write": 0}
+    stats_lock = threading.Lock()
+
+    def write_one(i: int) -> None:
+        with session_factory() as db:
+            db.add(LiveSnapshotRecord(reason="bench", payload=_payload(i)))
+            db.commit()
+
+    def reader() -> None:
+        local: List[float] = []
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                with session_factory() as db:
+                    db.scalars(
+                        select(LiveSnapshotRecord.payload)
+                        .order_by(LiveSnapshotRecord.created_at.desc())
+                        .limit(5)
+                    ).all()
+                local.append(time.perf_counter() - start)
+            except OperationalError:
+                with stats_lock:
+                    errors["read"] += 1
+        with stats_lock:
+            read_latencies.extend(local)
+
+    def writer_thread(offset: int) -> None:
+        local: List[float] = []
+        for i in range(offset, writes, writers):
+            start = time.perf_counter()
+            try:
+                if writer is not None:
+                    writer.run(write_one, i)
+                else:
+                    write_one(i)
+                local.append(time.perf_counter() - start)
+            except OperationalError:
+                with stats_lock:
+                    errors["write"] += 1
+        with stats_lock:
+            write_latencies.extend(local)
+
+    read_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    write_threads = [threading.Thread(target=writer_thread, args=(w,)) for w in range(writers)]
+    for t in read_threads:
+        t.start()
+    start = time.perf_counter()
+    for t in write_threads:
+        t.start()
+    for t in write_threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for t in read_threads:
+        t.join()
+    engine.dispose()
+
+    reads = np.array(read_latencies or [0.0]) * 1000
+    wr = np.array(write_latencies or [0.0]) * 1000
+    print(
+        f"[GFPS-BENCH] {name:8s} burst={elapsed:6.2f}s | "
+        f"writes {len(write_latencies) / elapsed:7.1f}/s p99={np.percentile(wr, 99):7.1f} ms | "
+        f"reads {len(read_latencies) / elapsed:8.1f}/s "
+        f"p50={np.percentile(reads, 50):6.2f} ms p99={np.percentile(reads, 99):7.2f} ms | "
+        f"errors read={errors['read']} write={errors['write']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GFPS SQLite concurrency benchmark")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=400)
+    args = parser.parse_args()
+
+    print(
+        f"[GFPS-BENCH] readers={args.readers} writers={args.writers} "
+        f"writes={args.writes}"
+    )
+    _run_profile("default", False, args.readers, args.writers, args.writes)
+    _run_profile("wal", True, args.readers, args.writers, args.writes)
+
+
+if __name__ == "__main__":
+    main()
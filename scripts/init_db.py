@@ -3,12 +3,12 @@ Initialize GFPS database schema
 Creates all tables using SQLAlchemy metadata.
 """
 
-from backend.db import Base, engine
+from backend.db import ensure_schema
 from backend import models
 
 def main():
     print("[GFPS] Initializing database...")
-    Base.metadata.create_all(bind=engine)
+    ensure_schema()
     print("[GFPS] Done.")
 
 if __name__ == "__main__":
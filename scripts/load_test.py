@@ -0,0 +1,85 @@
+"""
+GFPS HTTP load test
+
+Fires concurrent GET requests at a running backend and reports throughput
+and latency percentiles per endpoint. Run it against two builds (e.g. before
+and after a DB-layer change) with the same settings to compare them.
+
+Example:
+  python -m scripts.load_test --url http://127.0.0.1:8000 \\
+      --token "$TOKEN" --concurrency 64 --duration 20 /predictions /value-bets
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    path: str,
+    deadline: float,
+    latencies: List[float],
+    errors: Dict[str, int],
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            r = await client.get(path)
+            if r.status_code >= 400:
+                errors[path] = errors.get(path, 0) + 1
+                continue
+        except httpx.HTTPError:
+            errors[path] = errors.get(path, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(url: str, token: str, paths: List[str], concurrency: int, duration: float) -> None:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=30) as client:
+        for path in paths:
+            latencies: List[float] = []
+            errors: Dict[str, int] = {}
+            deadline = time.perf_counter() + duration
+            await asyncio.gather(
+                *[_worker(client, path, deadline, latencies, errors) for _ in range(concurrency)]
+            )
+
+            if not latencies:
+                print(f"[GFPS-LOAD] {path}: no successful requests ({errors.get(path, 0)} errors)")
+                continue
+            arr = np.array(latencies) * 1000
+            print(
+                f"[GFPS-LOAD] {path}: {len(arr) / duration:8.1f} req/s | "
+                f"p50={np.percentile(arr, 50):6.1f} ms "
+                f"p95={np.percentile(arr, 95):6.1f} ms "
+                f"p99={np.percentile(arr, 99):6.1f} ms | "
+                f"errors={errors.get(path, 0)}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GFPS HTTP load test")
+    parser.add_argument("paths", nargs="*", default=["/predictions", "/value-bets"])
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8000")
+    parser.add_argument("--token", type=str, default="")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(
+        f"[GFPS-LOAD] {args.url} concurrency={args.concurrency} "
+        f"duration={args.duration:.0f}s per endpoint"
+    )
+    asyncio.run(run(args.url, args.token, args.paths, args.concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
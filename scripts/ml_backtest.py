@@ -0,0 +1,67 @@
+"""
+GFPS walk-forward backtest
+
+Refits the 1X2 model season by season per league and replays each season
+with the chosen staking strategy (see backend.evaluation.walk_forward):
+
+  python -m scripts.ml_backtest --strategy kelly --train-seasons 3 --workers 8
+"""
+
+import argparse
+import json
+
+from backend.evaluation.walk_forward import (
+    STAKING_STRATEGIES,
+    WALK_FORWARD_WORKERS,
+    WalkForwardConfig,
+    walk_forward,
+)
+from backend.ml.historical_loader import add_loader_arguments, loader_kwargs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GFPS walk-forward backtest")
+    add_loader_arguments(parser)
+    parser.add_argument("--strategy", choices=STAKING_STRATEGIES, default="kelly")
+    parser.add_argument("--kelly-fraction", type=float, default=0.25)
+    parser.add_argument("--cap", type=float, default=0.05)
+    parser.add_argument("--min-edge", type=float, default=0.02)
+    parser.add_argument("--train-seasons", type=int, default=3,
+                        help="Seasons per training window (0 = expanding)")
+    parser.add_argument("--season", type=int, action="append", dest="seasons", default=None)
+    parser.add_argument("--workers", type=int, default=WALK_FORWARD_WORKERS,
+                        help="Processes (1 = in-process, default one per core)")
+    parser.add_argument("--json", type=str, default=None, help="Write full results here")
+    args = parser.parse_args()
+
+    config = WalkForwardConfig(
+        strategy=args.strategy,
+        kelly_fraction=args.kelly_fraction,
+        cap=args.cap,
+        min_edge=args.min_edge,
+        train_seasons=args.train_seasons,
+    )
+    print("[GFPS-BT] Running walk-forward backtest...")
+    result = walk_forward(
+        config=config, seasons=args.seasons, workers=args.workers, **loader_kwargs(args)
+    )
+
+    for w in result["windows"]:
+        print(
+            f"[GFPS-BT] {w['league']:<24} {w['season']}  bets={w['bets']:<5} "
+            f"roi={w['roi']:+.3f}  dd={w['max_drawdown']:.2f}  clv={w['clv']:+.3f}"
+        )
+    s = result["summary"]
+    print(
+        f"[GFPS-BT] TOTAL {s['windows']} windows, {s['bets']} bets: "
+        f"pnl={s['pnl']:+.2f} roi={s['roi']:+.3f} dd={s['max_drawdown']:.2f} clv={s['clv']:+.3f}"
+    )
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"[GFPS-BT] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,18 @@ GFPS ML evaluation script
 
 Loads trained models from backend/ml_models and evaluates them
 on a fresh train/test split (or on a date-based split).
+
+With --version (repeatable) or --all-versions, scores those model versions
+side by side on the selected matches (log loss, Brier, RPS, ECE, CLV with
+bootstrap CIs) and caches the reports shown by /ml/models.
 """
 
+import argparse
+from datetime import datetime
+from typing import List, Optional
+
 import numpy as np
 import pandas as pd
-from pathlib import Path
 
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import (
@@ -19,97 +26,35 @@ from sklearn.metrics import (
 from joblib import load
 
 from backend.db import SessionLocal
-from backend.models import HistoricalMatch  # adjust if needed
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-MODELS_DIR = BASE_DIR / "backend" / "ml_models"
-
-
-def fetch_historical_matches() -> pd.DataFrame:
-    db = SessionLocal()
-    try:
-        rows = db.query(HistoricalMatch).all()
-    finally:
-        db.close()
-
-    if not rows:
+from backend.evaluation.reports import evaluate_versions
+from backend.ml.feature_store import get_feature_store
+from backend.ml.historical_loader import (
+    add_loader_arguments,
+    load_historical_matches,
+    loader_kwargs,
+)
+from backend.model_registry import MODELS_DIR
+from backend.models import ModelVersion
+
+
+def fetch_historical_matches(
+    leagues: Optional[List[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    df = load_historical_matches(leagues=leagues, start=start, end=end, use_cache=use_cache)
+    if df.empty:
         raise RuntimeError("No HistoricalMatch data found.")
-
-    data = []
-    for m in rows:
-        data.append(
-            {
-                "league": m.league,
-                "league_id": m.league_id,
-                "home": m.home,
-                "away": m.away,
-                "goals_home": m.goals_home,
-                "goals_away": m.goals_away,
-                "odds_1": m.odds_1,
-                "odds_x": m.odds_x,
-                "odds_2": m.odds_2,
-                "odds_over25": m.odds_over25,
-                "odds_under25": m.odds_under25,
-                "odds_gg": m.odds_gg,
-                "odds_ng": m.odds_ng,
-                "kickoff": m.kickoff,
-            }
-        )
-
-    df = pd.DataFrame(data)
-    df = df.dropna(
-        subset=[
-            "goals_home",
-            "goals_away",
-            "odds_1",
-            "odds_x",
-            "odds_2",
-            "odds_over25",
-            "odds_under25",
-            "odds_gg",
-            "odds_ng",
-        ]
-    )
-
-    df["result_1x2"] = np.where(
-        df["goals_home"] > df["goals_away"],
-        0,
-        np.where(df["goals_home"] == df["goals_away"], 1, 2),
-    )
-    df["total_goals"] = df["goals_home"] + df["goals_away"]
-    df["is_over25"] = (df["total_goals"] > 2.5).astype(int)
-    df["is_gg"] = ((df["goals_home"] >= 1) & (df["goals_away"] >= 1)).astype(int)
-
     return df
 
 
 def build_feature_matrix(df: pd.DataFrame, model_feature_cols=None) -> pd.DataFrame:
-    for col in ["odds_1", "odds_x", "odds_2", "odds_over25", "odds_under25", "odds_gg", "odds_ng"]:
-        df[f"imp_{col}"] = 1.0 / df[col].replace(0, np.nan)
-
-    top_leagues = df["league"].value_counts().head(10).index.tolist()
-    df["league_bucket"] = df["league"].where(df["league"].isin(top_leagues), "Other")
-    league_dummies = pd.get_dummies(df["league_bucket"], prefix="lg")
-
-    feature_cols = [
-        "imp_odds_1",
-        "imp_odds_x",
-        "imp_odds_2",
-        "imp_odds_over25",
-        "imp_odds_under25",
-        "imp_odds_gg",
-        "imp_odds_ng",
-    ]
-    X = pd.concat([df[feature_cols], league_dummies], axis=1)
-
-    if model_feature_cols is not None:
-        # align columns with what model expects
-        for c in model_feature_cols:
-            if c not in X.columns:
-                X[c] = 0.0
-        X = X[model_feature_cols]
-
-    return X
+    # features come from the feature store, aligned to what the model expects
+    X, columns = get_feature_store().matrix(
+        df["id"].to_numpy(), feature_columns=model_feature_cols
+    )
+    return pd.DataFrame(X, columns=columns, index=df.index)
 
 
 def eval_1x2(df: pd.DataFrame):
@@ -209,10 +154,47 @@ def eval_gg(df: pd.DataFrame):
     print(f"LogLoss:  {ll:.3f}")
 
 
+def eval_versions(df: pd.DataFrame, versions: List[str], n_boot: int, refresh: bool):
+    reports = evaluate_versions(versions, df, n_boot=n_boot, refresh=refresh)
+    for version in versions:
+        if version not in reports:
+            continue
+        print(f"\n[GFPS-ML][EVAL-{version}]")
+        for market, metrics in reports[version].items():
+            line = "  ".join(
+                f"{name}={m['value']:.4f}"
+                + (f" [{m['low']:.4f}, {m['high']:.4f}]" if "low" in m else "")
+                for name, m in metrics.items()
+            )
+            print(f"{market:<7} {line}")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="GFPS ML evaluation")
+    add_loader_arguments(parser)
+    parser.add_argument("--version", action="append", dest="versions", default=None)
+    parser.add_argument("--all-versions", action="store_true")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Resamples for CIs")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached reports")
+    args = parser.parse_args()
+
     print("[GFPS-ML][EVAL] Loading historical matches...")
-    df = fetch_historical_matches()
+    df = fetch_historical_matches(**loader_kwargs(args))
     print(f"[GFPS-ML][EVAL] Using {len(df)} matches.")
+    get_feature_store().sync()
+
+    versions = args.versions
+    if args.all_versions:
+        with SessionLocal() as db:
+            versions = [
+                v for (v,) in db.query(ModelVersion.version)
+                .filter(ModelVersion.status.in_(("ready", "active")))
+                .order_by(ModelVersion.id)
+            ]
+    if versions:
+        eval_versions(df, versions, args.bootstrap, args.refresh)
+        print("\n[GFPS-ML][EVAL] Done.")
+        return
 
     eval_1x2(df)
     eval_over25(df)
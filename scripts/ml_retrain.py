@@ -12,7 +12,8 @@ Requirements (add to backend/requirements.txt):
   scikit-learn
   joblib
 
-This script assumes you have a HistoricalMatch model in backend.models with fields:
+Training data comes from the HistoricalMatch table in backend.models, loaded
+through backend.ml.historical_loader (filters: --league, --since, --until):
   - id
   - league (str)
   - league_id (int)
@@ -30,10 +31,14 @@ This script assumes you have a HistoricalMatch model in backend.models with fiel
   - kickoff (datetime or date)
 """
 
+import argparse
 import os
+import shutil
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
 import numpy as np
 import pandas as pd
-from pathlib import Path
 
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
@@ -43,52 +48,34 @@ from sklearn.metrics import (
     log_loss,
     classification_report
 )
-from joblib import dump
-
-from backend.db import SessionLocal
-from backend.models import HistoricalMatch  # adjust import if needed
+from joblib import Parallel, delayed, dump
+
+from backend.ml.feature_encoder import FeatureEncoder
+from backend.ml.feature_store import get_feature_store
+from backend.ml.historical_loader import (
+    add_loader_arguments,
+    load_historical_matches,
+    loader_kwargs,
+)
+from backend.model_registry import MODELS_DIR
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-MODELS_DIR = BASE_DIR / "backend" / "ml_models"
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def fetch_historical_matches(min_matches: int = 2000) -> pd.DataFrame:
+def fetch_historical_matches(
+    min_matches: int = 2000,
+    leagues: Optional[List[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    use_cache: bool = True,
+) -> pd.DataFrame:
     """
-    Load historical matches from DB into a pandas DataFrame.
+    Load cleaned, labelled historical matches (see backend.ml.historical_loader).
     """
-    db = SessionLocal()
-    try:
-        q = db.query(HistoricalMatch)
-        rows = q.all()
-    finally:
-        db.close()
-
-    if not rows:
+    df = load_historical_matches(leagues=leagues, start=start, end=end, use_cache=use_cache)
+    if df.empty:
         raise RuntimeError("No HistoricalMatch data found in DB.")
 
-    data = []
-    for m in rows:
-        data.append(
-            {
-                "league": m.league,
-                "league_id": m.league_id,
-                "home": m.home,
-                "away": m.away,
-                "goals_home": m.goals_home,
-                "goals_away": m.goals_away,
-                "odds_1": m.odds_1,
-                "odds_x": m.odds_x,
-                "odds_2": m.odds_2,
-                "odds_over25": m.odds_over25,
-                "odds_under25": m.odds_under25,
-                "odds_gg": m.odds_gg,
-                "odds_ng": m.odds_ng,
-                "kickoff": m.kickoff,
-            }
-        )
-
-    df = pd.DataFrame(data)
     print(f"[GFPS-ML] Loaded {len(df)} matches.")
 
     if len(df) < min_matches:
@@ -97,187 +84,178 @@ def fetch_historical_matches(min_matches: int = 2000) -> pd.DataFrame:
             f"recommended minimum is {min_matches}."
         )
 
-    # basic cleaning: drop rows with missing key odds or goals
-    df = df.dropna(
-        subset=[
-            "goals_home",
-            "goals_away",
-            "odds_1",
-            "odds_x",
-            "odds_2",
-            "odds_over25",
-            "odds_under25",
-            "odds_gg",
-            "odds_ng",
-        ]
-    )
-
-    # compute result labels
-    df["result_1x2"] = np.where(
-        df["goals_home"] > df["goals_away"],
-        0,
-        np.where(df["goals_home"] == df["goals_away"], 1, 2),
-    )  # 0=1,1=X,2=2
-
-    df["total_goals"] = df["goals_home"] + df["goals_away"]
-    df["is_over25"] = (df["total_goals"] > 2.5).astype(int)
-    df["is_gg"] = ((df["goals_home"] >= 1) & (df["goals_away"] >= 1)).astype(int)
-
     return df
 
 
 def build_feature_matrix(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Build generic feature matrix from historical data.
-    Here we use:
-      - implied probabilities from odds
-      - league dummy encoding (optional simple)
+    Feature matrix for the given matches, read from the local feature store:
+      - implied probabilities from closing odds
+      - top-10 league dummies, rest as "Other"
     """
-    # implied probabilities from closing odds
-    for col in ["odds_1", "odds_x", "odds_2", "odds_over25", "odds_under25", "odds_gg", "odds_ng"]:
-        df[f"imp_{col}"] = 1.0 / df[col].replace(0, np.nan)
+    X, columns = get_feature_store().matrix(df["id"].to_numpy())
+    return pd.DataFrame(X, columns=columns, index=df.index)
 
-    # simple league encoding: top N leagues as dummies, rest as "other"
-    top_leagues = df["league"].value_counts().head(10).index.tolist()
-    df["league_bucket"] = df["league"].where(df["league"].isin(top_leagues), "Other")
 
-    league_dummies = pd.get_dummies(df["league_bucket"], prefix="lg")
+# target key -> (label column, bundle name, log tag, multiclass)
+TARGETS = {
+    "1x2": ("result_1x2", "model_1x2", "1X2", True),
+    "over25": ("is_over25", "model_over25", "O/U", False),
+    "gg": ("is_gg", "model_gg", "GG", False),
+}
 
-    feature_cols = [
-        "imp_odds_1",
-        "imp_odds_x",
-        "imp_odds_2",
-        "imp_odds_over25",
-        "imp_odds_under25",
-        "imp_odds_gg",
-        "imp_odds_ng",
-    ]
+DEFAULT_CS = (0.1, 1.0, 10.0)
 
-    X = pd.concat([df[feature_cols], league_dummies], axis=1)
-    return X
 
+class TrainingCancelled(Exception):
+    pass
 
-def train_1x2_model(df: pd.DataFrame):
-    print("[GFPS-ML] Training 1X2 model...")
-    X = build_feature_matrix(df)
-    y = df["result_1x2"].values
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.20, random_state=42, stratify=y
-    )
 
-    model = LogisticRegression(
-        multi_class="multinomial", max_iter=200, n_jobs=-1
-    )
+def _fit_candidate(X_train, y_train, X_test, y_test, C: float, multiclass: bool):
+    model = LogisticRegression(C=C, max_iter=200)
     model.fit(X_train, y_train)
 
     probs = model.predict_proba(X_test)
-    preds = probs.argmax(axis=1)
-
-    acc = accuracy_score(y_test, preds)
-    # multi-class Brier: average over classes
-    brier = np.mean(
-        [
-            brier_score_loss((y_test == k).astype(int), probs[:, k])
-            for k in range(probs.shape[1])
-        ]
-    )
-    ll = log_loss(y_test, probs)
-
-    print(f"[GFPS-ML][1X2] Accuracy: {acc:.3f}")
-    print(f"[GFPS-ML][1X2] Brier:    {brier:.3f}")
-    print(f"[GFPS-ML][1X2] LogLoss:  {ll:.3f}")
-    print("[GFPS-ML][1X2] Class report:")
-    print(classification_report(y_test, preds, digits=3))
-
-    path = MODELS_DIR / "model_1x2.joblib"
-    dump(
-        {
-            "model": model,
-            "feature_columns": X.columns.tolist(),
-        },
-        path,
-    )
-    print(f"[GFPS-ML][1X2] Saved model to {path}")
-
-
-def train_over25_model(df: pd.DataFrame):
-    print("[GFPS-ML] Training Over/Under 2.5 model...")
-    X = build_feature_matrix(df)
-    y = df["is_over25"].values
+    if multiclass:
+        preds = probs.argmax(axis=1)
+        # multi-class Brier: average over classes
+        brier = np.mean(
+            [
+                brier_score_loss((y_test == k).astype(int), probs[:, k])
+                for k in range(probs.shape[1])
+            ]
+        )
+    else:
+        preds = (probs[:, 1] >= 0.5).astype(int)
+        brier = brier_score_loss(y_test, probs[:, 1])
+
+    metrics = {
+        "C": C,
+        "accuracy": float(accuracy_score(y_test, preds)),
+        "brier": float(brier),
+        "logLoss": float(log_loss(y_test, probs)),
+    }
+    return model, metrics, preds
+
+
+def train_target(
+    X: pd.DataFrame,
+    df: pd.DataFrame,
+    target: str,
+    Cs=DEFAULT_CS,
+    n_jobs: int = -1,
+):
+    """
+    Fit one LogisticRegression per C in parallel (one process per candidate)
+    and keep the one with the lowest hold-out log loss.
+    """
+    label, _, tag, multiclass = TARGETS[target]
+    y = df[label].values
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.20, random_state=42, stratify=y
     )
 
-    model = LogisticRegression(max_iter=200, n_jobs=-1)
-    model.fit(X_train, y_train)
-
-    probs = model.predict_proba(X_test)[:, 1]
-    preds = (probs >= 0.5).astype(int)
-
-    acc = accuracy_score(y_test, preds)
-    brier = brier_score_loss(y_test, probs)
-    ll = log_loss(y_test, np.vstack([1 - probs, probs]).T)
-
-    print(f"[GFPS-ML][O/U] Accuracy: {acc:.3f}")
-    print(f"[GFPS-ML][O/U] Brier:    {brier:.3f}")
-    print(f"[GFPS-ML][O/U] LogLoss:  {ll:.3f}")
-
-    path = MODELS_DIR / "model_over25.joblib"
-    dump(
-        {
-            "model": model,
-            "feature_columns": X.columns.tolist(),
-        },
-        path,
-    )
-    print(f"[GFPS-ML][O/U] Saved model to {path}")
-
-
-def train_gg_model(df: pd.DataFrame):
-    print("[GFPS-ML] Training GG/NG model...")
-    X = build_feature_matrix(df)
-    y = df["is_gg"].values
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.20, random_state=42, stratify=y
+    results = Parallel(n_jobs=min(n_jobs, len(Cs)) if n_jobs > 0 else n_jobs)(
+        delayed(_fit_candidate)(X_train, y_train, X_test, y_test, C, multiclass) for C in Cs
     )
+    model, metrics, preds = min(results, key=lambda r: r[1]["logLoss"])
+
+    print(f"[GFPS-ML][{tag}] Best C:   {metrics['C']}")
+    print(f"[GFPS-ML][{tag}] Accuracy: {metrics['accuracy']:.3f}")
+    print(f"[GFPS-ML][{tag}] Brier:    {metrics['brier']:.3f}")
+    print(f"[GFPS-ML][{tag}] LogLoss:  {metrics['logLoss']:.3f}")
+    if multiclass:
+        print(f"[GFPS-ML][{tag}] Class report:")
+        print(classification_report(y_test, preds, digits=3))
+
+    metrics["candidates"] = [r[1]["logLoss"] for r in results]
+    return model, metrics
+
+
+def run_pipeline(
+    version: Optional[str] = None,
+    Cs=DEFAULT_CS,
+    n_jobs: int = -1,
+    progress: Optional[Callable[[str, float], None]] = None,
+    **loader,
+) -> Dict:
+    """
+    Full retraining: load matches, sync the feature store, fit the three
+    models (hyperparameter candidates in parallel) and write the bundles to
+    MODELS_DIR/<version>/ (or MODELS_DIR/ without a version).
 
-    model = LogisticRegression(max_iter=200, n_jobs=-1)
-    model.fit(X_train, y_train)
-
-    probs = model.predict_proba(X_test)[:, 1]
-    preds = (probs >= 0.5).astype(int)
+    `progress(stage, fraction)` is called between steps; it may raise
+    TrainingCancelled to abort, in which case nothing is written.
+    """
+    report = progress or (lambda stage, fraction: None)
+    Cs = tuple(Cs or DEFAULT_CS)
 
-    acc = accuracy_score(y_test, preds)
-    brier = brier_score_loss(y_test, probs)
-    ll = log_loss(y_test, np.vstack([1 - probs, probs]).T)
+    report("loading", 0.05)
+    df = fetch_historical_matches(**loader)
+    print(f"[GFPS-ML] Using {len(df)} cleaned matches for training.")
 
-    print(f"[GFPS-ML][GG] Accuracy: {acc:.3f}")
-    print(f"[GFPS-ML][GG] Brier:    {brier:.3f}")
-    print(f"[GFPS-ML][GG] LogLoss:  {ll:.3f}")
+    report("features", 0.15)
+    added = get_feature_store().sync()
+    print(f"[GFPS-ML] Feature store: {added} new matches appended.")
 
-    path = MODELS_DIR / "model_gg.joblib"
-    dump(
-        {
+    # one feature matrix and one encoder shared by all three models
+    X = build_feature_matrix(df)
+    encoder = FeatureEncoder(X.columns.tolist())
+
+    bundles = {}
+    metrics: Dict = {"samples": int(len(df)), "featureColumns": len(X.columns)}
+    for i, target in enumerate(TARGETS):
+        report(f"training {target}", 0.25 + 0.6 * i / len(TARGETS))
+        print(f"[GFPS-ML] Training {TARGETS[target][2]} model...")
+        model, target_metrics = train_target(X, df, target, Cs=Cs, n_jobs=n_jobs)
+        bundles[TARGETS[target][1]] = {
             "model": model,
             "feature_columns": X.columns.tolist(),
-        },
-        path,
-    )
-    print(f"[GFPS-ML][GG] Saved model to {path}")
+            "encoder": encoder,
+        }
+        metrics[target] = target_metrics
+
+    report("saving", 0.9)
+    out_dir = MODELS_DIR / version if version else MODELS_DIR
+    tmp_dir = MODELS_DIR / f".{version or 'legacy'}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for name, bundle in bundles.items():
+        # uncompressed, so the registry can memory-map the arrays
+        dump(bundle, tmp_dir / f"{name}.joblib")
+
+    if version:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.replace(tmp_dir, out_dir)
+    else:
+        for name in bundles:
+            os.replace(tmp_dir / f"{name}.joblib", out_dir / f"{name}.joblib")
+        tmp_dir.rmdir()
+    print(f"[GFPS-ML] Saved models to {out_dir}")
+
+    # headline number shown in /ml/models
+    metrics["logLoss"] = metrics["1x2"]["logLoss"]
+    return metrics
 
 
 def main():
-    print("[GFPS-ML] Starting ML retraining...")
-    df = fetch_historical_matches()
-    print(f"[GFPS-ML] Using {len(df)} cleaned matches for training.")
-
-    train_1x2_model(df)
-    train_over25_model(df)
-    train_gg_model(df)
+    parser = argparse.ArgumentParser(description="GFPS ML retraining")
+    add_loader_arguments(parser)
+    parser.add_argument("--version", type=str, default=None,
+                        help="Write artifacts to ml_models/<version>/")
+    parser.add_argument("--C", type=float, action="append", dest="Cs", default=None,
+                        help="Regularization candidate (repeatable)")
+    parser.add_argument("--jobs", type=int, default=-1)
+    args = parser.parse_args()
 
+    print("[GFPS-ML] Starting ML retraining...")
+    run_pipeline(
+        version=args.version,
+        Cs=args.Cs,
+        n_jobs=args.jobs,
+        **loader_kwargs(args),
+    )
     print("[GFPS-ML] All models trained and saved.")
 
 
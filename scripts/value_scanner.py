@@ -13,15 +13,35 @@ import argparse
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+import numpy as np
+from sqlalchemy import select
+
 from backend.db import SessionLocal
+from backend.ml.historical_loader import ODDS_COLUMNS
 from backend.models import LiveOdds, ValuePick  # adjust import if needed
 from backend import ml_predict
 
 
-def compute_ev(odds: float, prob: float) -> float:
-    if odds is None or odds <= 1.0 or prob <= 0.0:
-        return -999.0
-    return odds * prob - 1.0
+# (market, outcome, odds column, ml_predict.predict_batch key, complement)
+CANDIDATES = [
+    ("1X2", "1", "odds_1", "p1", False),
+    ("1X2", "X", "odds_x", "px", False),
+    ("1X2", "2", "odds_2", "p2", False),
+    ("O/U 2.5", "Over 2.5", "odds_over25", "over25", False),
+    ("O/U 2.5", "Under 2.5", "odds_under25", "over25", True),
+    ("GG/NG", "GG", "odds_gg", "gg", False),
+    ("GG/NG", "NG", "odds_ng", "gg", True),
+]
+
+META_COLUMNS = ("fixture_id", "league", "league_id", "home", "away", "bookmaker")
+
+
+def compute_ev(odds: np.ndarray, prob: np.ndarray) -> np.ndarray:
+    """EV ανά γραμμή· -999 όπου odds <= 1, prob <= 0 ή λείπουν τιμές."""
+    with np.errstate(invalid="ignore"):
+        ev = odds * prob - 1.0
+        ev[~((odds > 1.0) & (prob > 0.0))] = -999.0
+    return ev
 
 
 def scan_value_bets(
@@ -29,103 +49,60 @@ def scan_value_bets(
     league_filter: str | None = None,
     bookmaker_filter: str | None = None,
     limit: int = 100,
+    max_rows: int = 2000,
 ) -> List[Dict[str, Any]]:
     db = SessionLocal()
     try:
-        q = db.query(LiveOdds)
-        q = q.filter(LiveOdds.is_live == True)
+        q = select(
+            *[getattr(LiveOdds, c) for c in META_COLUMNS + ODDS_COLUMNS]
+        ).where(LiveOdds.is_live == True)  # noqa: E712
 
         if league_filter:
-            q = q.filter(LiveOdds.league.ilike(f"%{league_filter}%"))
+            q = q.where(LiveOdds.league.ilike(f"%{league_filter}%"))
         if bookmaker_filter:
-            q = q.filter(LiveOdds.bookmaker.ilike(f"%{bookmaker_filter}%"))
+            q = q.where(LiveOdds.bookmaker.ilike(f"%{bookmaker_filter}%"))
 
-        rows = q.limit(2000).all()
+        rows = db.execute(q.limit(max_rows)).all()
     finally:
         db.close()
 
     print(f"[GFPS-VALUE] Loaded {len(rows)} live odds rows from DB.")
+    if not rows:
+        return []
+
+    columns = list(zip(*rows))
+    meta = dict(zip(META_COLUMNS, columns[: len(META_COLUMNS)]))
+    odds = np.array(columns[len(META_COLUMNS):], dtype=np.float64).T
+
+    # ML probabilities, one pass per model for all rows
+    probs = ml_predict.predict_batch(meta["league"], odds)
+    skipped = int(np.isnan(probs["p1"]).sum())
+    if skipped:
+        print(f"[GFPS-VALUE] Skipped {skipped} rows with missing/invalid odds.")
 
     results: List[Dict[str, Any]] = []
 
-    for row in rows:
-        league = row.league or "Unknown"
-
-        try:
-            # ML probabilities
-            p1, px, p2 = ml_predict.predict_1x2_proba(
-                league,
-                row.odds_1,
-                row.odds_x,
-                row.odds_2,
-                row.odds_over25,
-                row.odds_under25,
-                row.odds_gg,
-                row.odds_ng,
-            )
-            pov = ml_predict.predict_over25_proba(
-                league,
-                row.odds_1,
-                row.odds_x,
-                row.odds_2,
-                row.odds_over25,
-                row.odds_under25,
-                row.odds_gg,
-                row.odds_ng,
+    for market, outcome, odds_col, key, complement in CANDIDATES:
+        o = odds[:, ODDS_COLUMNS.index(odds_col)]
+        p = 1.0 - probs[key] if complement else probs[key]
+        ev = compute_ev(o, p)
+
+        for i in np.nonzero(ev >= min_ev)[0]:
+            results.append(
+                {
+                    "fixture_id": str(meta["fixture_id"][i]),
+                    "league": meta["league"][i],
+                    "league_id": str(meta["league_id"][i]),
+                    "home": meta["home"][i],
+                    "away": meta["away"][i],
+                    "bookmaker": meta["bookmaker"][i],
+                    "market": market,
+                    "outcome": outcome,
+                    "odds": float(o[i]),
+                    "prob": float(p[i]),
+                    "ev": float(ev[i]),
+                }
             )
-            pgg = ml_predict.predict_gg_proba(
-                league,
-                row.odds_1,
-                row.odds_x,
-                row.odds_2,
-                row.odds_over25,
-                row.odds_under25,
-                row.odds_gg,
-                row.odds_ng,
-            )
-        except Exception as e:
-            print(f"[GFPS-VALUE] ML predict error on fixture {row.fixture_id}: {e}")
-            continue
-
-        candidates = []
-
-        ev_1 = compute_ev(row.odds_1, p1)
-        ev_x = compute_ev(row.odds_x, px)
-        ev_2 = compute_ev(row.odds_2, p2)
-        ev_over = compute_ev(row.odds_over25, pov)
-        ev_under = compute_ev(row.odds_under25, 1.0 - pov)
-        ev_gg = compute_ev(row.odds_gg, pgg)
-        ev_ng = compute_ev(row.odds_ng, 1.0 - pgg)
-
-        candidates.extend(
-            [
-                ("1X2", "1", row.odds_1, p1, ev_1),
-                ("1X2", "X", row.odds_x, px, ev_x),
-                ("1X2", "2", row.odds_2, p2, ev_2),
-                ("O/U 2.5", "Over 2.5", row.odds_over25, pov, ev_over),
-                ("O/U 2.5", "Under 2.5", row.odds_under25, 1.0 - pov, ev_under),
-                ("GG/NG", "GG", row.odds_gg, pgg, ev_gg),
-                ("GG/NG", "NG", row.odds_ng, 1.0 - pgg, ev_ng),
-            ]
-        )
-
-        for market, outcome, odds, prob, ev in candidates:
-            if ev >= min_ev:
-                results.append(
-                    {
-                        "fixture_id": str(row.fixture_id),
-                        "league": row.league,
-                        "league_id": str(row.league_id),
-                        "home": row.home,
-                        "away": row.away,
-                        "bookmaker": row.bookmaker,
-                        "market": market,
-                        "outcome": outcome,
-                        "odds": float(odds),
-                        "prob": float(prob),
-                        "ev": float(ev),
-                    }
-                )
 
     results.sort(key=lambda x: x["ev"], reverse=True)
     return results[:limit]
@@ -212,6 +189,12 @@ def main():
         default=50,
         help="Maximum number of results to keep/show",
     )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=2000,
+        help="Maximum number of live odds rows to scan",
+    )
 
     args = parser.parse_args()
 
@@ -225,6 +208,7 @@ def main():
         league_filter=args.league,
         bookmaker_filter=args.bookmaker,
         limit=args.limit,
+        max_rows=args.max_rows,
     )
     print_value_bets(bets)
     store_value_bets(bets)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# backend.db builds its engines at import time; point them at a throwaway file
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/gfps-test.db")
@@ -0,0 +1,60 @@
+from backend.alert_engine import AlertDeduper, PriceChangeTracker, candidates_from_snapshot
+from backend.models import AlertEvent
+
+
+def _event(odds, ev, rule_id=1, outcome="Home"):
+    return AlertEvent(
+        rule_id=rule_id, user_id=1, fixture_id="10", market="Match Winner",
+        outcome=outcome, odds=odds, prob=0.5, ev=ev, meta={},
+    )
+
+
+def _snapshot(home_odds=2.0):
+    return {
+        "fixtures": [
+            {"id": "10", "homeTeam": "Ajax", "awayTeam": "PSV", "league": "Eredivisie"},
+            {"id": "11", "homeTeam": "Ajax", "awayTeam": "PSV", "league": "Friendlies"},
+        ],
+        "odds": [
+            {"fixtureId": "10", "market": "Ajax vs PSV", "home": home_odds, "draw": 3.4, "away": 3.6, "source": "Book"},
+            {"market": "Ajax vs PSV", "home": 9.0, "draw": 9.0, "away": 9.0, "source": "Book"},
+        ],
+        "markets": {},
+    }
+
+
+def test_deduper_suppresses_repeats_until_price_or_ev_moves():
+    dedup = AlertDeduper(ev_delta=0.01)
+    first = [_event(2.0, 0.10)]
+    assert dedup.fresh(first) == first
+    dedup.record(first)
+
+    assert dedup.fresh([_event(2.0, 0.105)]) == []
+    moved = [_event(2.1, 0.105)]
+    assert dedup.fresh(moved) == moved
+    shifted = [_event(2.0, 0.2)]
+    assert dedup.fresh(shifted) == shifted
+    # another rule or selection is tracked on its own
+    assert len(dedup.fresh([_event(2.0, 0.10, rule_id=2), _event(2.0, 0.10, outcome="Draw")])) == 2
+
+    dedup.prune([])
+    assert dedup.fresh(first) == first
+
+
+def test_candidates_use_fixture_id_not_label():
+    candidates = candidates_from_snapshot(_snapshot())
+    assert [c["fixture_id"] for c in candidates] == ["10"]
+    odds = {s["outcome"]: s["odds"] for s in candidates[0]["markets"][0]["selections"]}
+    assert odds == {"Home": 2.0, "Draw": 3.4, "Away": 3.6}
+
+
+def test_tracker_records_only_after_processing():
+    tracker = PriceChangeTracker()
+    candidates = candidates_from_snapshot(_snapshot())
+    assert tracker.changed(candidates) == candidates
+    # nothing recorded yet (e.g. process_candidates raised): offered again
+    assert tracker.changed(candidates) == candidates
+
+    tracker.record(candidates)
+    assert tracker.changed(candidates) == []
+    assert tracker.changed(candidates_from_snapshot(_snapshot(home_odds=2.1)))
@@ -0,0 +1,18 @@
+import time
+
+from backend.auth_dependency import Principal, PrincipalCache
+
+PRINCIPAL = Principal(id=1, email="a@example.com", role="free", token_version=0)
+
+
+def test_entry_ttl_is_capped_at_token_expiry(monkeypatch):
+    cache = PrincipalCache(maxsize=8, ttl=30)
+    cache.put("soon", PRINCIPAL, expires_at=time.time() + 5)
+    cache.put("later", PRINCIPAL, expires_at=time.time() + 3600)
+    cache.put("expired", PRINCIPAL, expires_at=time.time() - 1)
+    assert cache.get("expired") is None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert cache.get("soon") is None
+    assert cache.get("later") == PRINCIPAL
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend import coupon_pricing
+from backend.coupon_pricing import _outcome_mask, price_coupon
+
+CONTEXT = {
+    "avg_goals_home_league": 1.5,
+    "avg_goals_away_league": 1.2,
+    "home_attack": 1.0,
+    "home_defense": 1.0,
+    "away_attack": 1.0,
+    "away_defense": 1.0,
+}
+
+
+def _leg(market, outcome, odds=2.0, fixture_id="f1", prob=None):
+    return SimpleNamespace(
+        fixture_id=fixture_id, league_id="39", home="A", away="B",
+        market=market, outcome=outcome, odds=odds, prob=prob,
+    )
+
+
+@pytest.fixture
+def contexts(monkeypatch):
+    monkeypatch.setattr(coupon_pricing, "build_poisson_contexts", lambda db, triples: [CONTEXT] * len(triples))
+
+
+def test_team_total_masks_use_team_goals():
+    home, away = np.indices((11, 11))
+    assert np.array_equal(_outcome_mask("Total - Home", "Over 1.5"), home > 1.5)
+    assert np.array_equal(_outcome_mask("Total - Away", "Under 0.5"), away < 0.5)
+    assert np.array_equal(_outcome_mask("Goals Over/Under", "Over 2.5"), home + away > 2.5)
+
+
+def test_match_masks():
+    home, away = np.indices((11, 11))
+    assert np.array_equal(_outcome_mask("Match Winner", "Home"), home > away)
+    assert np.array_equal(_outcome_mask("Double Chance", "X2"), home <= away)
+    assert np.array_equal(_outcome_mask("Both Teams To Score", "No"), (home == 0) | (away == 0))
+
+
+@pytest.mark.parametrize(
+    "market, outcome",
+    [
+        ("Goals Over/Under", "Over 2"),  # pushes
+        ("Asian Handicap", "Home -0.25"),  # half win / loss
+        ("Draw No Bet", "Home"),
+        ("Corners Over Under", "Over 9.5"),
+        ("First Half Winner", "Home"),
+    ],
+)
+def test_unmaskable_legs(market, outcome):
+    assert _outcome_mask(market, outcome) is None
+
+
+def test_price_coupon_prices_same_fixture_jointly(contexts):
+    single = price_coupon(None, [_leg("Match Winner", "Home")])
+    assert single.legs[0].source == "model"
+
+    legs = [_leg("Match Winner", "Home"), _leg("Total - Home", "Over 0.5")]
+    joint = price_coupon(None, legs)
+    # a home win implies the home side scored
+    assert joint.total_prob == pytest.approx(single.total_prob)
+    assert joint.total_odds == pytest.approx(4.0)
+
+
+def test_price_coupon_independent_fixtures_multiply(contexts):
+    legs = [_leg("Match Winner", "Home", fixture_id="f1"), _leg("Match Winner", "Home", fixture_id="f2")]
+    coupon = price_coupon(None, legs)
+    assert coupon.total_prob == pytest.approx(coupon.legs[0].prob * coupon.legs[1].prob)
+
+
+def test_price_coupon_user_probability_wins(contexts):
+    coupon = price_coupon(None, [_leg("Match Winner", "Home", odds=3.0, prob=0.4)])
+    assert coupon.legs[0].source == "user"
+    assert coupon.total_ev == pytest.approx(0.4 * 3.0 - 1.0)
+
+
+def test_price_coupon_user_probabilities_cannot_exceed_weakest_leg(contexts):
+    legs = [
+        _leg("Match Winner", "Home", prob=0.6),
+        _leg("Total - Home", "Over 0.5", prob=0.9),
+    ]
+    coupon = price_coupon(None, legs)
+    assert coupon.total_prob == pytest.approx(0.6)
+    assert coupon.total_ev == pytest.approx(0.6 * 4.0 - 1.0)
@@ -0,0 +1,18 @@
+import asyncio
+
+from backend.db import SQLiteWriter
+
+
+def test_cancelled_hold_does_not_leak_the_writer_lock():
+    writer = SQLiteWriter()
+
+    async def scenario():
+        async with writer.hold():
+            waiter = asyncio.ensure_future(writer.hold().__aenter__())
+            await asyncio.sleep(0.05)  # queued: the writer thread blocks on the held lock
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        # the cancelled waiter's acquire completes after the release and is handed back
+        return await asyncio.wait_for(writer.run_async(lambda: "written"), timeout=2)
+
+    assert asyncio.run(scenario()) == "written"
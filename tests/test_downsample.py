@@ -0,0 +1,25 @@
+import numpy as np
+
+from backend.downsample import lttb_indices
+
+
+def test_short_series_are_kept_whole():
+    x = np.arange(5)
+    assert lttb_indices(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+    assert lttb_indices(x, x, 2).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_keeps_endpoints_and_threshold_points_in_order():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    keep = lttb_indices(x, y, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_keeps_a_spike_in_any_series():
+    x = np.arange(500)
+    flat = np.full((500, 3), 1 / 3)
+    flat[321] = (0.9, 0.05, 0.05)
+    assert 321 in lttb_indices(x, flat, 20)
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.db import Base
+from backend.ml.feature_store import FeatureStore
+from backend.ml.historical_loader import ODDS_COLUMNS
+from backend.models import HistoricalMatch
+
+ODDS = [2.0, 3.4, 3.8, 1.9, 1.95, 1.8, 2.05]
+
+
+def _append(store, ids, league="EPL"):
+    ids = list(ids)
+    return store.append(ids, [ODDS] * len(ids), [league] * len(ids))
+
+
+def test_empty_store_positions(tmp_path):
+    store = FeatureStore(tmp_path)
+    assert store.positions([]).shape == (0,)
+    with pytest.raises(KeyError):
+        store.positions([1])
+    assert store.matrix()[0].shape[0] == 0
+
+
+def test_append_skips_stored_ids_and_accepts_older_ones(tmp_path):
+    store = FeatureStore(tmp_path)
+    assert _append(store, [5, 3, 3]) == 2
+    assert _append(store, [5, 4, 1], league="Serie A") == 2
+    assert store.rows == 4
+
+    pos = store.positions([1, 3, 4, 5])
+    assert store.ids[pos].tolist() == [1, 3, 4, 5]
+    _, leagues = store.lookup([4, 5])
+    assert leagues == ["Serie A", "EPL"]
+    with pytest.raises(KeyError):
+        store.positions([2])
+
+    # a second handle (another worker process) sees the rows and won't duplicate them
+    other = FeatureStore(tmp_path)
+    assert _append(other, [1, 2]) == 1
+    assert _append(store, [2]) == 0
+    assert store.rows == 5
+
+
+def test_sync_ingests_rows_completed_late(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hist.db'}")
+    Base.metadata.create_all(bind=engine, tables=[HistoricalMatch.__table__])
+    kickoff = datetime(2024, 1, 1)
+
+    def match(i, scored=True):
+        return HistoricalMatch(
+            id=i, league="EPL", home=f"H{i}", away=f"A{i}",
+            goals_home=1 if scored else None, goals_away=0 if scored else None,
+            kickoff=kickoff + timedelta(days=i), **dict(zip(ODDS_COLUMNS, ODDS)),
+        )
+
+    with Session(engine) as db:
+        db.add_all([match(1), match(2, scored=False), match(3)])
+        db.commit()
+
+    store = FeatureStore(tmp_path / "store")
+    assert store.sync(bind=engine) == 2
+    assert store.sync(bind=engine) == 0
+
+    with Session(engine) as db:
+        row = db.get(HistoricalMatch, 2)
+        row.goals_home, row.goals_away = 2, 2
+        db.commit()
+
+    assert store.sync(bind=engine) == 1
+    assert sorted(store.ids.tolist()) == [1, 2, 3]
+    assert np.allclose(store.lookup([2])[0], 1.0 / np.asarray(ODDS, dtype=np.float32))
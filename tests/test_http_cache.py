@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import fixtures_api
+from backend.auth_dependency import require_user
+from backend.http_cache import _matches
+from backend.live_state import live_state
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(fixtures_api.router)
+    app.dependency_overrides[require_user] = lambda: None
+    return TestClient(app)
+
+
+def test_matches_weak_and_listed_tags():
+    assert _matches('W/"a-1"', 'W/"a-1"')
+    assert _matches('"a-1"', 'W/"a-1"')
+    assert _matches('W/"a-0", W/"a-1"', 'W/"a-1"')
+    assert _matches("*", 'W/"a-1"')
+    assert not _matches('W/"a-2"', 'W/"a-1"')
+
+
+def test_snapshot_fixtures_answer_304_until_state_changes(client, monkeypatch):
+    monkeypatch.setattr(fixtures_api, "APIFOOTBALL_KEY", "")
+    first = client.get("/fixtures")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag == live_state.etag
+
+    cached = client.get("/fixtures", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    asyncio.run(live_state.set_fixtures([]))
+    fresh = client.get("/fixtures", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+
+def test_upstream_fixtures_carry_no_etag(client, monkeypatch):
+    monkeypatch.setattr(fixtures_api, "APIFOOTBALL_KEY", "key")
+    response = client.get("/fixtures", params={"date_str": "2024-05-01"}, headers={"If-None-Match": live_state.etag})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
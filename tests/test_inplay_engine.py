@@ -0,0 +1,112 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.live import inplay_engine
+from backend.live.inplay_engine import InPlayEngine, inplay_matrices, red_cards
+from backend.live.momentum_index import EVENT_WEIGHTS, MomentumTracker, event_weight, is_red_card
+from backend.live.time_decay import DecayTables, parse_clock
+
+
+def _fixture(timer, score=(0, 0), fixture_id="1"):
+    return {
+        "id": fixture_id, "status": "live", "leagueId": 39, "timer": timer,
+        "homeTeam": "A", "awayTeam": "B", "score": {"home": score[0], "away": score[1]},
+    }
+
+
+def _engine():
+    return InPlayEngine(tables=DecayTables({}), momentum=MomentumTracker())
+
+
+@pytest.mark.parametrize(
+    "timer, clock",
+    [("67'", (67.0, 0.0)), ("90+3'", (90.0, 3.0)), ("45+2", (45.0, 2.0)), ("HT", None), (None, None), ("", None)],
+)
+def test_parse_clock(timer, clock):
+    assert parse_clock(timer) == clock
+
+
+def test_unknown_clock_keeps_last_minute():
+    engine = _engine()
+    engine.sync([_fixture("44'")], {})
+    played = engine.played.copy()
+    engine.sync([_fixture(None)], {})
+    assert engine.ids == ["1"]
+    assert engine.played.tolist() == played.tolist()
+    assert engine.step()[0]["minute"] >= 44
+
+
+def test_fixture_without_a_clock_waits():
+    engine = _engine()
+    engine.sync([_fixture("HT", fixture_id="2"), _fixture("10'")], {})
+    assert engine.ids == ["1"]
+
+
+def test_publish_keeps_fixtures_key_for_state(monkeypatch):
+    sent = []
+
+    async def broadcast(payload):
+        sent.append(payload)
+
+    monkeypatch.setattr(inplay_engine.live_state, "broadcast", broadcast)
+    engine = _engine()
+    engine.sync([_fixture("10'")], {})
+    asyncio.run(inplay_engine._publish(engine))
+    assert sent[0]["type"] == "inplay"
+    assert "fixtures" not in sent[0]
+    assert sent[0]["prices"][0]["minute"] >= 10
+
+
+def test_score_shift():
+    matrices = inplay_matrices(np.array([[0.3, 0.2], [0.3, 0.2]]), np.array([[0, 0], [2, 1]]))
+    assert matrices[1, :2, :].sum() == pytest.approx(0.0)
+    assert matrices[1, :, :1].sum() == pytest.approx(0.0)
+    assert matrices[1].sum() == pytest.approx(matrices[0].sum())
+    assert matrices[1, 2:, 1:].sum() == pytest.approx(matrices[0].sum())
+
+
+def test_goal_and_red_card_move_home_probability():
+    engine = _engine()
+    engine.sync([_fixture("60'")], {})
+    level = engine.step()[0]["probabilities"]["home"]
+    engine.sync([_fixture("60'", score=(1, 0))], {})
+    ahead = engine.step()[0]["probabilities"]["home"]
+    red = [{"type": "card", "description": "B: Red Card"}]
+    engine.sync([_fixture("60'")], {"1": red})
+    opponent_red = engine.step()[0]["probabilities"]["home"]
+    assert ahead > level
+    assert opponent_red > level
+
+
+@pytest.mark.parametrize(
+    "description, red",
+    [
+        ("Red Bull Salzburg: Yellow Card", False),
+        ("Red Star Belgrade: Yellow Card", False),
+        ("Rapid Wien: Red Card", True),
+        ("Red Bull Salzburg: Second Yellow card", True),
+        ("Red Card", True),
+    ],
+)
+def test_is_red_card_reads_the_detail_only(description, red):
+    assert is_red_card({"type": "card", "description": description}) is red
+
+
+def test_red_cards_per_side():
+    events = [
+        {"type": "card", "description": "Red Bull Salzburg: Yellow Card"},
+        {"type": "card", "description": "Red Bull Salzburg: Red Card"},
+        {"type": "card", "description": "Sturm Graz: Second Yellow card"},
+        {"type": "goal", "description": "Sturm Graz: Normal Goal"},
+        {"type": "card", "description": "Sturm Graz: Red Card", "team": "away"},
+    ]
+    assert red_cards(events, "Red Bull Salzburg", "Sturm Graz") == (1, 2)
+
+
+def test_event_weights_cover_streamed_types_only():
+    assert set(EVENT_WEIGHTS) == {"goal", "card"}
+    assert event_weight({"type": "goal", "description": "A: Normal Goal"}) == EVENT_WEIGHTS["goal"]
+    assert event_weight({"type": "goal", "description": "A: Missed Penalty"}) == 0.0
+    assert event_weight({"type": "subst", "description": "A: Substitution 1"}) == 0.0
@@ -0,0 +1,55 @@
+import pytest
+
+from backend.prediction_engine.markets import book_layout, resolve_outcome
+
+
+@pytest.mark.parametrize(
+    "market, outcome, key",
+    [
+        ("1X2", "Home", ("1x2", "home")),
+        ("Match Winner", "Draw", ("1x2", "draw")),
+        ("Full Time Result", "2", ("1x2", "away")),
+        ("Double Chance", "Home/Away", ("double_chance", "12")),
+        ("Double Chance", "1X", ("double_chance", "1x")),
+        ("Draw No Bet", "Away", ("draw_no_bet", "away")),
+        ("Both Teams To Score", "Yes", ("btts", "yes")),
+        ("GG/NG", "NG", ("btts", "no")),
+        ("Correct Score", "2:1", ("correct_score", "2-1")),
+        ("Asian Handicap", "Home -0.5", ("asian_handicap_-0.5", "home")),
+        ("Asian Handicap -1", "Away", ("asian_handicap_-1", "away")),
+        ("Goals Over/Under", "Over 2.5", ("over_under_2.5", "over")),
+        ("Over/Under 2.5", "Under", ("over_under_2.5", "under")),
+        ("Total - Home", "Over 1.5", ("home_total_1.5", "over")),
+        ("Away Team Total Goals", "Under 0.5", ("away_total_0.5", "under")),
+    ],
+)
+def test_supported_markets_resolve(market, outcome, key):
+    assert resolve_outcome(market, outcome) == key
+    keys = set(book_layout(11)[0])
+    assert key in keys
+
+
+@pytest.mark.parametrize(
+    "market, outcome",
+    [
+        ("First Half Winner", "Home"),
+        ("1st Half Goals Over/Under", "Over 0.5"),
+        ("2nd Half Both Teams Score", "Yes"),
+        ("Goals Over/Under First Half", "Over 1.5"),
+        ("Halftime/Fulltime", "Home/Home"),
+        ("Team To Score First", "Home"),
+        ("Team To Score Last", "Away"),
+        ("Cards Over/Under", "Over 4.5"),
+        ("Corners Over Under", "Over 9.5"),
+        ("Total Bookings", "Over 40"),
+        ("Handicap Result", "Home -1"),
+        ("Home/Away", "Home"),
+        ("Exact Goals Number", "2"),
+        ("", "Home"),
+        ("1X2", "Home/Away"),
+        ("Match Winner", "Over 2.5"),
+        ("Goals Over/Under", "Home"),
+    ],
+)
+def test_unsupported_markets_fall_back(market, outcome):
+    assert resolve_outcome(market, outcome) is None
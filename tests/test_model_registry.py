@@ -0,0 +1,42 @@
+import pytest
+
+from backend import model_registry as registry_module
+from backend.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def broken(tmp_path, monkeypatch):
+    (tmp_path / "v-broken").mkdir()
+    (tmp_path / "v-broken" / "model_1x2.joblib").write_bytes(b"not a joblib file")
+    monkeypatch.setattr(registry_module, "MODELS_DIR", tmp_path)
+    monkeypatch.setattr(registry_module, "ML_REGISTRY_MAX_FAILURES", 2)
+    monkeypatch.setattr(ModelRegistry, "_db_active_version", staticmethod(lambda: "v-broken"))
+    return ModelRegistry()
+
+
+def test_broken_version_backs_off_then_gives_up(broken, monkeypatch):
+    with pytest.raises(Exception):
+        broken.current()
+    assert broken.stats()["failures"] == {"v-broken": 1}
+    # within the backoff window nothing is retried
+    assert broken.sync_with_db() is None
+    with pytest.raises(FileNotFoundError, match="unavailable"):
+        broken.current()
+
+    monkeypatch.setattr(registry_module, "ML_REGISTRY_POLL_SEC", 0)
+    broken._failures["v-broken"] = (1, 0.0)
+    with pytest.raises(Exception):
+        broken.sync_with_db().result()
+    assert broken.stats()["failures"] == {"v-broken": 2}
+    assert broken.sync_with_db() is None  # given up
+
+    # an explicit activation tries again
+    with pytest.raises(Exception):
+        broken.activate("v-broken").result()
+    assert broken.stats()["failures"] == {"v-broken": 1}
+
+
+def test_missing_version_dir_falls_back_to_legacy(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(registry_module, "MODELS_DIR", tmp_path)
+    assert registry_module.artifact_dir("v-missing") == tmp_path
+    assert "legacy layout" in capsys.readouterr().out
@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend import retention
+from backend.db import Base, SessionLocal, engine
+from backend.models import LiveSnapshotRecord
+
+
+def test_prune_keeps_one_keyframe_per_bucket_in_batches(monkeypatch):
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(retention, "RETENTION_BATCH_SIZE", 3)
+    monkeypatch.setattr(retention, "_SCAN_PAGE", 4)
+    now = datetime(2025, 3, 1, 12)
+    with SessionLocal() as db:
+        db.query(LiveSnapshotRecord).delete()
+        # 10 snapshots in one hour two days ago, 6 on one day 40 days ago, 2 fresh ones
+        hour = now - timedelta(days=2)
+        day = now - timedelta(days=40)
+        db.add_all(LiveSnapshotRecord(payload={}, created_at=hour + timedelta(minutes=i)) for i in range(10))
+        db.add_all(LiveSnapshotRecord(payload={}, created_at=day + timedelta(hours=i)) for i in range(6))
+        db.add_all(LiveSnapshotRecord(payload={}, created_at=now - timedelta(minutes=i)) for i in range(2))
+        db.commit()
+
+    batches = []
+    original = retention._delete_batch
+
+    async def record(ids):
+        batches.append(len(ids))
+        await original(ids)
+
+    monkeypatch.setattr(retention, "_delete_batch", record)
+    stats = asyncio.run(retention.prune_snapshots(now))
+
+    assert stats["deleted"] == 9 + 5
+    assert max(batches) <= 3
+    with SessionLocal() as db:
+        kept = sorted(r.created_at for r in db.query(LiveSnapshotRecord))
+    assert kept == sorted([hour, day, now, now - timedelta(minutes=1)])
@@ -0,0 +1,34 @@
+from sqlalchemy import create_engine, inspect, text
+
+from backend import models  # noqa: F401
+from backend.db import Base, ensure_schema
+
+ADDED_INDEXES = {
+    "team_stats": "ix_team_stats_league_team_season",
+    "coupons": "ix_coupons_user_id",
+    "coupon_selections": "ix_coupon_selections_coupon_id",
+    "live_snapshots": "ix_live_snapshots_created_at",
+    "prediction_snapshots": "ix_prediction_snapshots_snapshot_id",
+    "value_bet_snapshots": "ix_value_bet_snapshots_snapshot_id",
+    "probability_points": "ix_probability_points_fixture_ts",
+}
+
+
+def _indexes(engine, table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+
+def test_ensure_schema_adds_indexes_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # an older deployment: tables without the later indexes, no probability_points
+        for table, name in ADDED_INDEXES.items():
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("DROP TABLE probability_points"))
+
+    ensure_schema(engine)
+    ensure_schema(engine)  # idempotent
+
+    for table, name in ADDED_INDEXES.items():
+        assert name in _indexes(engine, table)
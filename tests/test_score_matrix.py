@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from backend.evaluation.score_matrix import (
+    _outcome_indices,
+    one_x_two_distribution,
+    poisson_score_matrices,
+    score_matrix_terms,
+)
+from backend.evaluation.rps import rps_per_row
+
+
+def test_out_of_grid_scores_keep_their_result():
+    size = 4
+    idx = _outcome_indices(np.array([5, 2, 7]), np.array([4, 6, 0]), size)
+    assert idx["1x2"].tolist() == [0, 2, 0]  # 5-4 is still a home win
+    assert idx["home"].tolist() == [3, 2, 3]
+    assert idx["total"].tolist() == [6, 6, 6]  # clipped to the 0..2G-2 support
+    assert idx["diff"].tolist() == [4, 0, 6]  # 5-4 = +1, not 3-3 = 0
+
+
+def test_score_matrix_terms_on_out_of_grid_scores():
+    matrices = poisson_score_matrices(np.array([[1.4, 1.1], [1.4, 1.1]]), max_goals=3)
+    terms = score_matrix_terms(matrices, np.array([5, 4]), np.array([4, 4]))
+    expected = rps_per_row(one_x_two_distribution(matrices), np.array([0, 1]))
+    assert terms["oneXTwoRps"] == pytest.approx(expected)
+    assert all(np.isfinite(v).all() for v in terms.values())
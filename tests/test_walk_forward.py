@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.evaluation.walk_forward import WalkForwardConfig, _combine, walk_forward
+from backend.ml.historical_loader import ODDS_COLUMNS, add_labels
+
+
+def _window(league, kickoffs, pnl):
+    pnl = np.asarray(pnl, dtype=np.float64)
+    return {
+        "league": league,
+        "season": 2023,
+        "_kickoff": np.array(kickoffs, dtype="datetime64[ns]"),
+        "_stakes": np.ones(len(pnl)),
+        "_pnl": pnl,
+        "_clv": np.zeros(len(pnl)),
+    }
+
+
+def test_combine_merges_concurrent_windows_by_kickoff():
+    # league A loses early and wins late, league B the opposite: in calendar
+    # order the losses are offset, back to back they'd stack into a -4 drawdown
+    a = _window("A", ["2023-08-01", "2023-08-08", "2024-04-01", "2024-04-08"], [-1, -1, 1, 1])
+    b = _window("B", ["2023-08-02", "2023-08-09", "2024-04-02", "2024-04-09"], [1, 1, -1, -1])
+    summary = _combine([a, b])
+    assert summary["bets"] == 8
+    assert summary["pnl"] == pytest.approx(0.0)
+    assert summary["roi"] == pytest.approx(0.0)
+    assert summary["max_drawdown"] == pytest.approx(1.0)
+
+
+def test_combine_empty():
+    summary = _combine([])
+    assert summary["bets"] == 0 and summary["max_drawdown"] == 0.0
+
+
+def test_walk_forward_in_process():
+    rng = np.random.default_rng(0)
+    n = 1200
+    kickoff = pd.Timestamp("2019-08-01") + pd.to_timedelta(np.sort(rng.uniform(0, 4 * 365, n)), unit="D")
+    df = pd.DataFrame(
+        {
+            "id": np.arange(n),
+            "league": rng.choice(["A", "B"], n),
+            "goals_home": rng.poisson(1.5, n),
+            "goals_away": rng.poisson(1.1, n),
+            "kickoff": kickoff,
+            **{col: rng.uniform(1.5, 4.0, n) for col in ODDS_COLUMNS},
+        }
+    )
+    result = walk_forward(add_labels(df), WalkForwardConfig(strategy="flat", min_train=100), workers=1)
+    windows = result["windows"]
+    assert windows and all("_kickoff" not in w for w in windows)
+    assert result["summary"]["bets"] == sum(w["bets"] for w in windows)
+    assert result["summary"]["pnl"] == pytest.approx(sum(w["pnl"] for w in windows))